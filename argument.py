@@ -78,5 +78,11 @@ def parse_args():
         action="store_true",
         help="【可选】强制重新生成（默认关闭；传入后即使已有产物也会重跑）",
     )
+    parser.add_argument(
+        "--preview",
+        "-p",
+        action="store_true",
+        help="【可选】预览渲染（低分辨率/低帧率/快速编码，输出 preview_video.mp4，不覆盖成片）",
+    )
     args = parser.parse_args()
     return args
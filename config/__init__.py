@@ -11,6 +11,7 @@ def setup(
     enable_subs: bool = False,
     voice_arg: str = None,
     emotion_arg: str = None,
+    preview: bool = False,
 ):
     """
     设置输出目录并配置图像风格。
@@ -21,6 +22,12 @@ def setup(
         C.ENABLE_SUBTITLES = True
         logger.info("📝 Subtitles Enabled via CLI")
 
+    if preview:
+        C.apply_preview()
+        logger.info(
+            f"👀 Preview mode: {C.VIDEO_SIZE[0]}x{C.VIDEO_SIZE[1]} @ {C.VIDEO_FPS}fps, preset {C.VIDEO_PRESET}"
+        )
+
     # 0. 解析分类别名
     final_category = category
     if category in C.CATEGORY_ALIASES:
@@ -50,6 +50,8 @@ class Config:
 
     # 默认为当前目录的输出，或者从 yaml 加载
     OUTPUT_DIR: str = os.path.join(os.getcwd(), "output")
+    # 跨项目共享的缓存目录（默认位于输出根目录下）
+    CACHE_DIR: str = os.path.join(os.getcwd(), "output", ".cache")
 
     # API 密钥（环境变量）
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
@@ -94,6 +96,9 @@ class Config:
     CATEGORY_LAYOUTS: dict = field(
         default_factory=dict
     )  # 映射：category -> layout_mode (movie/book)
+    CATEGORY_RENDER_BACKENDS: dict = field(
+        default_factory=dict
+    )  # 映射：category -> render_backend (moviepy/ffmpeg)
     SENSITIVE_WORDS: dict = field(default_factory=dict)  # 敏感词替换
 
     # 动画设置
@@ -103,12 +108,16 @@ class Config:
     TTS_PROVIDER: str = "edge"  # edge, azure
     AZURE_TTS_KEY: str = os.getenv("AZURE_TTS_KEY", "")
     AZURE_TTS_REGION: str = os.getenv("AZURE_TTS_REGION", "eastus")
+    # TTS 并发调度：{服务商: {concurrency, rate, burst, retries, backoff, backoff_max}}，未配置的项用默认值
+    TTS_LIMITS: dict = field(default_factory=dict)
 
     # 火山 TTS
     VOLC_TTS_APPID: str = os.getenv("VOLC_TTS_APPID", "")
     VOLC_TTS_TOKEN: str = os.getenv("VOLC_TTS_TOKEN", "")
     VOLC_TTS_VOICE_TYPE: str = "zh_male_dayi_saturn_bigtts"
     VOLC_TTS_CLUSTER: str = os.getenv("VOLC_TTS_CLUSTER", "volcano_tts")
+    # 火山 TTS 单次请求超时（秒，含读取整段音频）
+    VOLC_TTS_TIMEOUT: float = 30.0
 
     # 音频设置
     TTS_VOICE: str = "zh-CN-XiaoxiaoNeural"  # 默认语音
@@ -146,6 +155,64 @@ class Config:
     CAMERA_ENABLE_ROTATION: bool = False  # 启用旋转效果
     CAMERA_ROTATION_DEGREE: float = 1.5  # 旋转角度
     CAMERA_MOVEMENT_INTENSITY: float = 1.15  # 运动强度
+    CAMERA_RENDER_QUALITY: str = "lanczos"  # 重采样模式: lanczos(画质) / bilinear(速度)
+    FFMPEG_ZOOMPAN_UPSCALE: int = 2  # ffmpeg 后端 zoompan 前的放大倍数，减轻抖动
+
+    # 分段并行渲染
+    ENABLE_SEGMENT_RENDER: bool = False  # 按 clip 分段多进程渲染，再无损拼接
+    SEGMENT_RENDER_WORKERS: int = 0  # 并行进程数，0 = CPU 核数
+    ENABLE_SEGMENT_CACHE: bool = True  # 按内容哈希缓存片段，重跑时只渲染变化的场景
+    SEGMENT_CACHE_MAX_MB: float = 4096  # 片段缓存上限，超出后按最久未使用淘汰，<= 0 不限
+
+    # 渲染剖析：各阶段/各场景耗时写入成片旁的 render_profile.json
+    ENABLE_RENDER_PROFILE: bool = True
+
+    # 翻页转场帧序列按两页图片哈希 + 时长缓存到 CACHE_DIR/page_flip
+    ENABLE_PAGE_FLIP_CACHE: bool = True
+
+    # 封面标题等固定词表的拼音标注持久化到 CACHE_DIR/pinyin.json
+    ENABLE_PINYIN_CACHE: bool = True
+
+    # 封面图按内容哈希缓存到 CACHE_DIR/cover
+    ENABLE_COVER_CACHE: bool = True
+
+    # 全局 TTS 缓存（旁白、双语分段、封面朗读、片头配音）：CACHE_DIR/tts，按最久未使用淘汰到上限（MB）
+    ENABLE_TTS_CACHE: bool = True
+    TTS_CACHE_MAX_MB: float = 2048
+
+    # 品牌片尾（按平台）与缩放后的片头按编码参数预编码一次，缓存到 CACHE_DIR/brand
+    ENABLE_BRAND_CACHE: bool = True
+
+    # 图片入库：场景图预处理为渲染就绪的 RGB 副本（按镜头最大缩放预放大），缓存到 CACHE_DIR/ingest
+    ENABLE_IMAGE_INGEST: bool = True
+
+    # 图生视频片段的解码帧缓存上限（MB，进程内所有片段共享）；0 = 关闭，回退 VideoFileClip
+    FRAME_CACHE_MAX_MB: int = 1024
+
+    # 中间帧库：场景合成后的帧写入内存映射文件，转场/编码直接取帧，也便于离线检查
+    ENABLE_FRAME_STORE: bool = False
+    FRAME_STORE_DIR: str = ""  # 为空时使用 OUTPUT_DIR/frames
+
+    # 输出编码：帧率与 x264 preset（--preview 时被预览参数覆盖）
+    VIDEO_FPS: int = 24
+    VIDEO_PRESET: str = "medium"
+    VIDEO_CRF: int = 23  # x264 CRF，越小画质越高、文件越大
+    ENCODE_THREADS: int = 0  # x264 线程数，0 = ffmpeg 自动
+    VIDEO_TUNE: str = "auto"  # auto = 纯静态画面时间轴用 stillimage；也可填 film / animation / none
+    VIDEO_KEYINT: float = 0.0  # 关键帧间隔（秒），0 = x264 默认
+    VIDEO_RENDITIONS: dict = field(default_factory=dict)  # 额外输出：{名称: {scale, crf, preset, suffix}}
+
+    # 预览模式（--preview）：按比例缩小分辨率 + 低帧率 + 快速 preset，输出 preview_video.mp4
+    PREVIEW_MODE: bool = False
+    PREVIEW_SCALE: float = 0.5
+    PREVIEW_FPS: int = 12
+    PREVIEW_PRESET: str = "ultrafast"
+    PREVIEW_SOURCE_SIZE: tuple = None  # 进入预览前的原始 VIDEO_SIZE
+
+    # 流式写入：帧渲染进环形缓冲区后直接送入 ffmpeg 管道
+    ENABLE_STREAM_WRITER: bool = True
+    STREAM_WRITER_THREADS: int = 1  # 帧生产线程数（仅对纯图片时间轴生效）
+    STREAM_WRITER_RING_SIZE: int = 8  # 预分配帧缓冲区个数，决定内存上限
 
     # Logging Configuration
     LOG_LEVEL: str = "INFO"
@@ -247,11 +314,15 @@ class Config:
             self.CATEGORY_LAYOUTS = data["models"].get(
                 "category_layouts", {}
             )  # 加载布局
+            self.CATEGORY_RENDER_BACKENDS = data["models"].get(
+                "category_render_backends", {}
+            )  # 加载渲染后端
             self.CATEGORY_TRANSITIONS = data["models"].get(
                 "category_transitions", {}
             )  # 加载转场配置
             self.ANIMATOR_TYPE = data["models"].get("animator", self.ANIMATOR_TYPE)
             self.TTS_PROVIDER = data["models"].get("tts_provider", self.TTS_PROVIDER)
+            self.TTS_LIMITS = data["models"].get("tts_limits") or {}
             self.AZURE_TTS_KEY = data["models"].get("azure_tts_key", self.AZURE_TTS_KEY)
             self.AZURE_TTS_REGION = data["models"].get(
                 "azure_tts_region", self.AZURE_TTS_REGION
@@ -273,6 +344,9 @@ class Config:
             self.VOLC_TTS_CLUSTER = (
                 data["models"].get("volc_tts_cluster") or self.VOLC_TTS_CLUSTER
             )
+            self.VOLC_TTS_TIMEOUT = float(
+                data["models"].get("volc_tts_timeout", self.VOLC_TTS_TIMEOUT)
+            )
 
             logger.debug(
                 f"Volc Config Loaded -> appid: {self.VOLC_TTS_APPID}, cluster: {self.VOLC_TTS_CLUSTER}"
@@ -308,6 +382,10 @@ class Config:
             out_dir = data["project"].get("output_dir")
             if out_dir:
                 self.OUTPUT_DIR = os.path.abspath(out_dir)
+                self.CACHE_DIR = os.path.join(self.OUTPUT_DIR, ".cache")
+            cache_dir = data["project"].get("cache_dir")
+            if cache_dir:
+                self.CACHE_DIR = os.path.abspath(cache_dir)
 
         # 功能
         if "features" in data:
@@ -392,6 +470,96 @@ class Config:
                         "movement_intensity", self.CAMERA_MOVEMENT_INTENSITY
                     )
                 )
+                self.CAMERA_RENDER_QUALITY = camera_effects.get(
+                    "render_quality", self.CAMERA_RENDER_QUALITY
+                )
+                self.FFMPEG_ZOOMPAN_UPSCALE = int(
+                    camera_effects.get("zoompan_upscale", self.FFMPEG_ZOOMPAN_UPSCALE)
+                )
+
+            # 分段并行渲染
+            segment_render = data["features"].get("segment_render", {})
+            if segment_render:
+                self.ENABLE_SEGMENT_RENDER = bool(
+                    segment_render.get("enabled", self.ENABLE_SEGMENT_RENDER)
+                )
+                self.SEGMENT_RENDER_WORKERS = int(
+                    segment_render.get("workers", self.SEGMENT_RENDER_WORKERS)
+                )
+                self.ENABLE_SEGMENT_CACHE = bool(
+                    segment_render.get("cache", self.ENABLE_SEGMENT_CACHE)
+                )
+                self.SEGMENT_CACHE_MAX_MB = float(
+                    segment_render.get("cache_max_mb", self.SEGMENT_CACHE_MAX_MB)
+                )
+
+            self.ENABLE_RENDER_PROFILE = bool(
+                data["features"].get("render_profile", self.ENABLE_RENDER_PROFILE)
+            )
+            self.ENABLE_PAGE_FLIP_CACHE = bool(
+                data["features"].get("page_flip_cache", self.ENABLE_PAGE_FLIP_CACHE)
+            )
+            self.ENABLE_PINYIN_CACHE = bool(
+                data["features"].get("pinyin_cache", self.ENABLE_PINYIN_CACHE)
+            )
+            self.ENABLE_COVER_CACHE = bool(
+                data["features"].get("cover_cache", self.ENABLE_COVER_CACHE)
+            )
+            self.ENABLE_BRAND_CACHE = bool(
+                data["features"].get("brand_cache", self.ENABLE_BRAND_CACHE)
+            )
+            self.ENABLE_IMAGE_INGEST = bool(
+                data["features"].get("image_ingest", self.ENABLE_IMAGE_INGEST)
+            )
+            self.FRAME_CACHE_MAX_MB = int(
+                data["features"].get("frame_cache_mb", self.FRAME_CACHE_MAX_MB)
+            )
+
+            # 输出编码档位
+            encoding = data["features"].get("encoding", {})
+            if encoding:
+                self.VIDEO_PRESET = encoding.get("preset", self.VIDEO_PRESET)
+                self.VIDEO_CRF = int(encoding.get("crf", self.VIDEO_CRF))
+                self.ENCODE_THREADS = int(encoding.get("threads", self.ENCODE_THREADS))
+                self.VIDEO_TUNE = str(encoding.get("tune", self.VIDEO_TUNE) or "none")
+                self.VIDEO_KEYINT = float(encoding.get("keyint", self.VIDEO_KEYINT))
+                self.VIDEO_RENDITIONS = encoding.get("renditions") or {}
+
+            # 全局 TTS 缓存
+            tts_cache = data["features"].get("tts_cache", {})
+            if tts_cache:
+                self.ENABLE_TTS_CACHE = bool(tts_cache.get("enabled", self.ENABLE_TTS_CACHE))
+                self.TTS_CACHE_MAX_MB = float(
+                    tts_cache.get("max_mb", self.TTS_CACHE_MAX_MB)
+                )
+
+            # 中间帧库
+            frame_store = data["features"].get("frame_store", {})
+            if frame_store:
+                self.ENABLE_FRAME_STORE = bool(
+                    frame_store.get("enabled", self.ENABLE_FRAME_STORE)
+                )
+                self.FRAME_STORE_DIR = frame_store.get("dir", self.FRAME_STORE_DIR) or ""
+
+            # 预览模式
+            preview = data["features"].get("preview", {})
+            if preview:
+                self.PREVIEW_SCALE = float(preview.get("scale", self.PREVIEW_SCALE))
+                self.PREVIEW_FPS = int(preview.get("fps", self.PREVIEW_FPS))
+                self.PREVIEW_PRESET = preview.get("preset", self.PREVIEW_PRESET)
+
+            # 流式写入
+            stream_writer = data["features"].get("stream_writer", {})
+            if stream_writer:
+                self.ENABLE_STREAM_WRITER = bool(
+                    stream_writer.get("enabled", self.ENABLE_STREAM_WRITER)
+                )
+                self.STREAM_WRITER_THREADS = int(
+                    stream_writer.get("threads", self.STREAM_WRITER_THREADS)
+                )
+                self.STREAM_WRITER_RING_SIZE = int(
+                    stream_writer.get("ring_size", self.STREAM_WRITER_RING_SIZE)
+                )
 
         # 加载日志配置
         if "logging" in data:
@@ -410,6 +578,24 @@ class Config:
                 self.LOG_FILE_MAX_BYTES = log_config["file"].get("max_bytes", 10485760)
                 self.LOG_FILE_BACKUP_COUNT = log_config["file"].get("backup_count", 5)
 
+    def apply_preview(self):
+        """
+        切换到预览模式：分辨率按 PREVIEW_SCALE 缩小（取偶数，满足 yuv420p），
+        帧率与编码 preset 换成预览参数。场景时长与转场参数不受影响。
+        """
+        if self.PREVIEW_MODE:
+            return
+        w, h = self.VIDEO_SIZE
+        scale = min(1.0, max(0.1, self.PREVIEW_SCALE))
+        self.PREVIEW_SOURCE_SIZE = (w, h)
+        self.VIDEO_SIZE = (
+            max(2, int(w * scale) // 2 * 2),
+            max(2, int(h * scale) // 2 * 2),
+        )
+        self.VIDEO_FPS = self.PREVIEW_FPS
+        self.VIDEO_PRESET = self.PREVIEW_PRESET
+        self.PREVIEW_MODE = True
+
     def get_speech_rate(self, category: str) -> str:
         """获取指定类目的语速配置，默认-15%"""
         if not hasattr(self, "_category_speech_rates"):
@@ -15,6 +15,10 @@ class Scene:
     sfx: Optional[str] = None  # Sound effect keyword (e.g. "laugh", "rain")
     camera_action: Optional[str] = None
     narration_cn: Optional[str] = None  # Chinese translation for bilingual mode
+    # 音频步骤探测的旁白元数据（duration_seconds 为旁白时长），视频步骤据此规划时间轴
+    audio_sample_rate: Optional[int] = None
+    audio_channels: Optional[int] = None
+    audio_loudness: Optional[float] = None  # 整体响度 (LUFS)，静音为 None
 
 
 @dataclass
@@ -50,6 +54,9 @@ class VideoScript:
                         "emotion": s.emotion,
                         "sfx": s.sfx,
                         "camera_action": s.camera_action,
+                        "audio_sample_rate": s.audio_sample_rate,
+                        "audio_channels": s.audio_channels,
+                        "audio_loudness": s.audio_loudness,
                     }
                     for s in self.scenes
                 ],
@@ -93,6 +100,9 @@ class VideoScript:
                     emotion=s.get("emotion"),
                     sfx=s.get("sfx"),
                     camera_action=s.get("camera_action"),
+                    audio_sample_rate=s.get("audio_sample_rate"),
+                    audio_channels=s.get("audio_channels"),
+                    audio_loudness=s.get("audio_loudness"),
                 )
             )
             
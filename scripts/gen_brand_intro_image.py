@@ -10,6 +10,7 @@ PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 if PROJECT_ROOT not in sys.path:
     sys.path.insert(0, PROJECT_ROOT)
 
+from steps.image.background import linear_gradient, to_image
 from steps.image.font import font_manager
 
 
@@ -55,20 +56,7 @@ def _linear_gradient(
     horizontal: bool = True,
 ) -> Image.Image:
     """生成简单线性渐变（RGB）。"""
-    w, h = size
-    img = Image.new("RGB", (w, h), c1)
-    draw = ImageDraw.Draw(img)
-    steps = w if horizontal else h
-    if steps <= 1:
-        return img
-    for i in range(steps):
-        t = i / (steps - 1)
-        c = _mix(c1, c2, t)
-        if horizontal:
-            draw.line([(i, 0), (i, h)], fill=c)
-        else:
-            draw.line([(0, i), (w, i)], fill=c)
-    return img
+    return to_image(linear_gradient(tuple(size), c1, c2, horizontal, endpoint=True))
 
 
 def _paste_with_rounded_mask(
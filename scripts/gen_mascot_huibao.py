@@ -9,51 +9,21 @@ PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 if PROJECT_ROOT not in sys.path:
     sys.path.insert(0, PROJECT_ROOT)
 
+from steps.image.background import linear_gradient, radial_gradient, to_image
 from steps.image.font import font_manager
 
 
-def _clamp(x, lo, hi):
-    return max(lo, min(hi, x))
-
-
-def _mix(a, b, t: float):
-    t = _clamp(t, 0.0, 1.0)
-    return (
-        int(a[0] + (b[0] - a[0]) * t),
-        int(a[1] + (b[1] - a[1]) * t),
-        int(a[2] + (b[2] - a[2]) * t),
-        int(a[3] + (b[3] - a[3]) * t),
-    )
-
-
 def _radial_glow(size, center, radius, color_rgba):
-    w, h = size
-    cx, cy = center
-    base = Image.new("RGBA", (w, h), (0, 0, 0, 0))
-    px = base.load()
-    for y in range(h):
-        for x in range(w):
-            d = math.hypot(x - cx, y - cy)
-            if d > radius:
-                continue
-            a = int(color_rgba[3] * (1 - d / radius) ** 1.8)
-            if a <= 0:
-                continue
-            px[x, y] = (color_rgba[0], color_rgba[1], color_rgba[2], a)
-    return base.filter(ImageFilter.GaussianBlur(radius=8))
+    glow = to_image(radial_gradient(tuple(size), tuple(center), radius, color_rgba, 1.8))
+    return glow.filter(ImageFilter.GaussianBlur(radius=8))
 
 
 def _render_background(size=(1024, 1024)) -> Image.Image:
     """渲染背景（含网格与氛围光）。"""
     w, h = size
-    bg = Image.new("RGBA", (w, h), (8, 10, 18, 255))
-    draw = ImageDraw.Draw(bg)
     top = (14, 22, 40, 255)
     bottom = (22, 10, 28, 255)
-    for y in range(h):
-        t = y / (h - 1)
-        c = _mix(top, bottom, t)
-        draw.line([(0, y), (w, y)], fill=c)
+    bg = to_image(linear_gradient((w, h), top, bottom, endpoint=True))
 
     grid = Image.new("RGBA", (w, h), (0, 0, 0, 0))
     g = ImageDraw.Draw(grid)
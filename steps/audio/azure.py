@@ -1,92 +1,177 @@
+import asyncio
 import os
-from typing import List
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 from config.config import C
 from model.models import Scene
 from util.logger import logger
-from steps.audio.base import AudioStudioBase
+from steps.audio.base import AudioStudioBase, TTSThrottledError, is_throttling_error, tts_limits
+from steps.audio.cache import tts_cache
 
 try:
     import azure.cognitiveservices.speech as speechsdk
 except ImportError:
     speechsdk = None
 
+_CHUNK_SIZE = 32 * 1024
+
 class AzureAudioStudio(AudioStudioBase):
+    provider = "azure"
+
     def __init__(self):
         self.speech_key = getattr(C, "AZURE_TTS_KEY", "")
         self.service_region = getattr(C, "AZURE_TTS_REGION", "eastus")
         self.voice = getattr(C, "TTS_VOICE", "zh-CN-XiaoxiaoNeural")
+
+        # 长连接合成器池：SpeechConfig 共用，每个合成器同一时间只被一个线程使用
+        self._speech_config = None
+        self._synthesizers = queue.Queue()
+        self._pool_lock = threading.Lock()
+        self._pool_executor = None
         
         if not speechsdk:
             logger.error("Azure SDK not found. Please install `azure-cognitiveservices-speech`.")
         if not self.speech_key:
             logger.warning("AZURE_TTS_KEY not configured.")
 
+    def _style(self, emotion: str = None):
+        """生效的 SSML 情感风格（未开启情感语音或中性时为 None）"""
+        if C.ENABLE_EMOTIONAL_TTS and emotion and emotion not in ["neutral", "default"]:
+            return emotion
+        return None
+
+    def tts_cache_key(self, text: str, emotion: str = None):
+        rate = C.get_speech_rate(C.CURRENT_CATEGORY)
+        return tts_cache.key(self.provider, self.voice, rate, None, self._style(emotion), text)
+
+    def _ssml(self, text: str, emotion: str = None) -> str:
+        # Azure SSML structure: <speak ...><voice ...><mstts:express-as style="...">...</mstts:express-as></voice></speak>
+        ssml_style_tag_open = ""
+        ssml_style_tag_close = ""
+
+        if self._style(emotion):
+            # Azure supports many styles: cheerful, sad, angry, excited, friendly, etc.
+            # Assuming 'emotion' string matches Azure style names or mapping is simple.
+            ssml_style_tag_open = f'<mstts:express-as style="{emotion}">'
+            ssml_style_tag_close = '</mstts:express-as>'
+            logger.debug(f"🎭 Azure TTS using style: {emotion}")
+
+        # Apply speech rate (global setting), wrapped in <prosody rate="...">.
+        rate = C.get_speech_rate(C.CURRENT_CATEGORY)
+        ssml_prosody_open = f'<prosody rate="{rate}">' if rate else ""
+        ssml_prosody_close = '</prosody>' if rate else ""
+
+        return (
+            f'<speak version="1.0" xmlns="http://www.w3.org/2001/10/synthesis" '
+            f'xmlns:mstts="https://www.w3.org/2001/mstts" xml:lang="zh-CN">\n'
+            f'  <voice name="{self.voice}">\n'
+            f'    {ssml_style_tag_open}\n'
+            f'      {ssml_prosody_open}{text}{ssml_prosody_close}\n'
+            f'    {ssml_style_tag_close}\n'
+            f'  </voice>\n'
+            f'</speak>'
+        )
+
+    def _executor(self) -> ThreadPoolExecutor:
+        """SDK 调用是阻塞的，放到线程池里执行；线程数即并发上限"""
+        if self._pool_executor is None:
+            workers = max(1, int(tts_limits(self.provider)["concurrency"]))
+            self._pool_executor = ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="azure-tts"
+            )
+        return self._pool_executor
+
+    def _checkout(self):
+        """借出一个空闲合成器，没有时新建（个数不超过线程数）"""
+        try:
+            return self._synthesizers.get_nowait()
+        except queue.Empty:
+            pass
+        with self._pool_lock:
+            if self._speech_config is None:
+                self._speech_config = speechsdk.SpeechConfig(
+                    subscription=self.speech_key, region=self.service_region
+                )
+        # audio_config=None：音频不落到扬声器/固定文件，由 AudioDataStream 读出
+        synthesizer = speechsdk.SpeechSynthesizer(
+            speech_config=self._speech_config, audio_config=None
+        )
+        try:
+            # 预先建立连接，之后的请求复用这条连接
+            speechsdk.Connection.from_speech_synthesizer(synthesizer).open(True)
+        except Exception as e:
+            logger.debug(f"Azure TTS pre-connect skipped: {e}")
+        return synthesizer
+
+    def _speak(self, ssml: str, part_path: str):
+        """
+        在线程池中执行：用池中的合成器合成 ssml，音频边生成边写入 part_path。
+        成功返回 None，被取消时返回 cancellation_details。
+        """
+        synthesizer = self._checkout()
+        try:
+            result = synthesizer.start_speaking_ssml_async(ssml).get()
+            if result.reason == speechsdk.ResultReason.Canceled:
+                return result.cancellation_details
+            stream = speechsdk.AudioDataStream(result)
+            buffer = bytes(_CHUNK_SIZE)
+            with open(part_path, "wb") as f:
+                while True:
+                    n = stream.read_data(buffer)
+                    if not n:
+                        break
+                    f.write(buffer[:n])
+            if stream.status == speechsdk.StreamStatus.Canceled:
+                return stream.cancellation_details
+            return None
+        finally:
+            self._synthesizers.put(synthesizer)
+
+    async def aclose(self):
+        # 合成器持有长连接，一轮合成结束后释放；下次调用时重新创建
+        if self._pool_executor is not None:
+            # 不阻塞事件循环：已取消场景的在途请求在后台自行结束
+            self._pool_executor.shutdown(wait=False, cancel_futures=True)
+            self._pool_executor = None
+        self._synthesizers = queue.Queue()
+
     async def generate_tts(self, text: str, output_path: str, emotion: str = None) -> bool:
         """
         Generates TTS audio using Azure Speech SDK with SSML for emotion support.
+        合成在线程池中进行，不阻塞事件循环。
         """
         if not speechsdk:
             logger.error("Cannot generate audio: Azure SDK missing.")
             return False
 
         try:
-            speech_config = speechsdk.SpeechConfig(subscription=self.speech_key, region=self.service_region)
-            # Set audio output to file
-            audio_config = speechsdk.audio.AudioOutputConfig(filename=output_path)
-            
-            # Construct SSML
-            # Azure SSML structure: <speak ...><voice ...><mstts:express-as style="...">...</mstts:express-as></voice></speak>
-            
-            ssml_style_tag_open = ""
-            ssml_style_tag_close = ""
-            
-            if C.ENABLE_EMOTIONAL_TTS and emotion and emotion not in ["neutral", "default"]:
-                # Azure supports many styles: cheerful, sad, angry, excited, friendly, etc.
-                # Assuming 'emotion' string matches Azure style names or mapping is simple.
-                ssml_style_tag_open = f'<mstts:express-as style="{emotion}">'
-                ssml_style_tag_close = '</mstts:express-as>'
-                logger.debug(f"🎭 Azure TTS using style: {emotion}")
-
-            # Apply speech rate if needed (global setting)
-            # rate defined in C.TTS_RATE or C.get_speech_rate?
-            # Config has 'TTS_RATE' string like "+0%". 
-            # We can also wrap in <prosody rate="...">.
-            rate = C.get_speech_rate(C.CURRENT_CATEGORY)
-            ssml_prosody_open = f'<prosody rate="{rate}">' if rate else ""
-            ssml_prosody_close = '</prosody>' if rate else ""
-
-            ssml = (
-                f'<speak version="1.0" xmlns="http://www.w3.org/2001/10/synthesis" '
-                f'xmlns:mstts="https://www.w3.org/2001/mstts" xml:lang="zh-CN">\n'
-                f'  <voice name="{self.voice}">\n'
-                f'    {ssml_style_tag_open}\n'
-                f'      {ssml_prosody_open}{text}{ssml_prosody_close}\n'
-                f'    {ssml_style_tag_close}\n'
-                f'  </voice>\n'
-                f'</speak>'
-            )
+            ssml = self._ssml(text, emotion)
+            # 先写临时文件，成功后原子替换，失败不会留下残缺的音频
+            part_path = f"{output_path}.{os.getpid()}.{threading.get_ident()}.part"
+            loop = asyncio.get_running_loop()
+            try:
+                cancellation_details = await loop.run_in_executor(
+                    self._executor(), self._speak, ssml, part_path
+                )
+                if cancellation_details is None:
+                    os.replace(part_path, output_path)
+                    logger.debug(f"Azure TTS success: {output_path}")
+                    return True
+            finally:
+                if os.path.exists(part_path):
+                    os.remove(part_path)
 
-            synthesizer = speechsdk.SpeechSynthesizer(speech_config=speech_config, audio_config=audio_config)
-            
-            # Since generate_tts is async in base but Azure SDK is sync/callback based,
-            # we can run it in executor or just use the sync method provided by SDK (speak_ssml_async returns strict future).
-            # speak_ssml_async().get() blocks.
-            
-            result = synthesizer.speak_ssml_async(ssml).get()
-
-            if result.reason == speechsdk.ResultReason.SynthesizingAudioCompleted:
-                logger.debug(f"Azure TTS success: {output_path}")
-                return True
-            elif result.reason == speechsdk.ResultReason.Canceled:
-                cancellation_details = result.cancellation_details
-                logger.error(f"Azure TTS canceled: {cancellation_details.reason}")
-                if cancellation_details.reason == speechsdk.CancellationReason.Error:
-                    logger.error(f"Error details: {cancellation_details.error_details}")
-                return False
-            else:
-                logger.error(f"Azure TTS failed with reason: {result.reason}")
-                return False
+            logger.error(f"Azure TTS canceled: {cancellation_details.reason}")
+            if cancellation_details.reason == speechsdk.CancellationReason.Error:
+                logger.error(f"Error details: {cancellation_details.error_details}")
+                if is_throttling_error(Exception(cancellation_details.error_details)):
+                    raise TTSThrottledError(cancellation_details.error_details)
+            return False
 
+        except TTSThrottledError:
+            raise
         except Exception as e:
             logger.traceback_and_raise(Exception(f"Azure TTS Exception: {e}"))
             return False
@@ -105,7 +190,7 @@ class AzureAudioStudio(AudioStudioBase):
         
         try:
             emotion = getattr(scene, "emotion", None)
-            success = await self.generate_tts(text, output_path, emotion)
+            success = await self._synthesize(text, output_path, emotion)
             
             if not success:
                  raise Exception("Azure TTS returned false")
@@ -116,8 +201,3 @@ class AzureAudioStudio(AudioStudioBase):
             logger.traceback_and_raise(
                 Exception(f"Failed to generate audio for Scene {scene.scene_id}: {e}")
             )
-
-    async def generate_audio(self, scenes: List[Scene], force: bool = False):
-        logger.info(f"Starting Azure audio generation for {len(scenes)} scenes...")
-        for scene in scenes:
-            await self._generate_one_audio(scene, force)
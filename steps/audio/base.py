@@ -1,12 +1,180 @@
+import asyncio
+import random
+import time
 from abc import ABC, abstractmethod
-from typing import List
+from typing import Awaitable, Callable, List, Optional
+
+from config.config import C
 from model.models import Scene
+from steps.audio.cache import tts_cache
+from steps.audio.probe import probe_scene_audio
+from util.logger import logger
+
+# 各服务商的默认调度参数，config.yaml 的 models.tts_limits 按服务商覆盖
+# concurrency: 同时在途的请求数；rate/burst: 令牌桶（每秒请求数 / 突发容量，rate <= 0 不限速）
+# retries: 被限流时的最大重试次数；backoff/backoff_max: 指数退避的基数与上限（秒，带随机抖动）
+DEFAULT_TTS_LIMITS = {
+    "edge": {"concurrency": 4, "rate": 4.0, "burst": 4, "retries": 4, "backoff": 1.0, "backoff_max": 20.0},
+    "azure": {"concurrency": 8, "rate": 10.0, "burst": 10, "retries": 4, "backoff": 1.0, "backoff_max": 20.0},
+    "volc": {"concurrency": 2, "rate": 2.0, "burst": 2, "retries": 4, "backoff": 1.0, "backoff_max": 20.0},
+}
+
+_THROTTLE_MARKERS = ("429", "too many requests", "throttl", "rate limit", "quota")
+
+
+class TTSThrottledError(Exception):
+    """服务商限流（HTTP 429 / 配额超限），调度器会退避后重试"""
+
+
+def is_throttling_error(e: Exception) -> bool:
+    if isinstance(e, TTSThrottledError) or getattr(e, "status", None) == 429:
+        return True
+    message = str(e).lower()
+    return any(marker in message for marker in _THROTTLE_MARKERS)
+
+
+def tts_limits(provider: str) -> dict:
+    limits = dict(DEFAULT_TTS_LIMITS.get(provider, DEFAULT_TTS_LIMITS["edge"]))
+    limits.update((getattr(C, "TTS_LIMITS", None) or {}).get(provider) or {})
+    return limits
+
+
+class TokenBucket:
+    """异步令牌桶：平均每秒 rate 个请求，最多突发 burst 个"""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.capacity = max(1, int(burst))
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class TTSScheduler:
+    """
+    TTS 并发调度：所有场景同时排队，每次合成请求先占用并发名额、再取令牌；
+    被限流时释放名额，按带抖动的指数退避等待后重试。
+
+    异步原语绑定在创建时的事件循环上，每次 generate_audio 新建一个调度器。
+    """
+
+    def __init__(self, provider: str):
+        self.provider = provider
+        self.limits = tts_limits(provider)
+        self.concurrency = max(1, int(self.limits["concurrency"]))
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._bucket = TokenBucket(float(self.limits["rate"]), self.limits["burst"])
+
+    def _backoff(self, attempt: int) -> float:
+        cap = min(float(self.limits["backoff_max"]), float(self.limits["backoff"]) * 2**attempt)
+        return random.uniform(cap / 2, cap)
+
+    async def call(self, fn: Callable[..., Awaitable], *args, **kwargs):
+        """执行一次合成请求（受并发名额与令牌桶约束），限流时退避重试"""
+        retries = int(self.limits["retries"])
+        attempt = 0
+        while True:
+            async with self._semaphore:
+                await self._bucket.acquire()
+                try:
+                    return await fn(*args, **kwargs)
+                except Exception as e:
+                    if attempt >= retries or not is_throttling_error(e):
+                        raise
+                    error = e
+            delay = self._backoff(attempt)
+            attempt += 1
+            logger.warning(
+                f"⏳ {self.provider} TTS throttled, retry {attempt}/{retries} in {delay:.1f}s: {error}"
+            )
+            await asyncio.sleep(delay)
+
+    async def map(self, items: list, fn: Callable[..., Awaitable]) -> list:
+        """
+        并发处理 items，结果按 items 顺序返回。
+        任一项失败时取消其余未完成的项，抛出（按 items 顺序）最靠前的异常。
+        """
+        tasks = [asyncio.ensure_future(fn(item)) for item in items]
+        if not tasks:
+            return []
+        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        for task in tasks:
+            if task in done and task.exception() is not None:
+                raise task.exception()
+        return [task.result() for task in tasks]
+
 
 class AudioStudioBase(ABC):
-    @abstractmethod
+    # 对应 config.yaml 的 tts_provider，用于选择调度参数
+    provider = "edge"
+    scheduler: Optional[TTSScheduler] = None
+
     async def generate_audio(self, scenes: List[Scene], force: bool = False):
+        """
+        所有场景并发合成（受服务商并发/限速约束）。每个场景只写自己的 scene_{id}.mp3 和 scene.audio_path，
+        结果与完成顺序无关。合成后逐个探测音频，把时长/采样率/声道/响度记入场景。
+        """
+        self.scheduler = TTSScheduler(self.provider)
+        logger.info(
+            f"Starting {self.provider} audio generation for {len(scenes)} scenes "
+            f"(concurrency {self.scheduler.concurrency})..."
+        )
+        try:
+            await self.scheduler.map(
+                scenes, lambda scene: self._generate_one_audio(scene, force)
+            )
+        finally:
+            self.scheduler = None
+            await self.aclose()
+
+        # 跳过合成的场景也重新探测，保证元数据与磁盘上的音频一致
+        await asyncio.gather(
+            *(asyncio.to_thread(probe_scene_audio, scene) for scene in scenes if scene.audio_path)
+        )
+
+    async def aclose(self):
+        """释放本轮合成占用的连接等资源（在同一事件循环内调用）"""
+
+    async def _synthesize(self, text: str, output_path: str, emotion: str = None, **kwargs) -> bool:
+        """
+        先查全局 TTS 缓存，未命中时经调度器调用 generate_tts 并写入缓存；
+        单独调用 _generate_one_audio 时临时创建调度器。
+        """
+        key = self.tts_cache_key(text, emotion, **kwargs)
+        if key and tts_cache.fetch(key, output_path):
+            return True
+        tts_cache.discard(output_path)
+        scheduler = self.scheduler or TTSScheduler(self.provider)
+        success = await scheduler.call(self.generate_tts, text, output_path, emotion, **kwargs)
+        if success and key:
+            tts_cache.store(key, output_path)
+        return success
+
+    def tts_cache_key(self, text: str, emotion: str = None, **kwargs) -> Optional[str]:
+        """本次合成的 TTS 缓存键（由实际请求参数决定）；返回 None 表示不缓存"""
+        return None
+
+    @abstractmethod
+    async def _generate_one_audio(self, scene: Scene, force: bool = False):
         pass
-    
+
     @abstractmethod
     async def generate_tts(self, text: str, output_path: str, emotion: str = None) -> bool:
         pass
@@ -0,0 +1,119 @@
+import os
+import shutil
+import threading
+from typing import Optional
+
+from config.config import C
+from util.logger import logger
+from util.utils import content_key
+
+# 缓存键或音频格式变化时递增，使旧缓存失效
+TTS_CACHE_VERSION = 1
+
+
+def apply_pronunciation_fixes(text: str) -> str:
+    """按 PRONUNCIATION_FIXES 替换易读错的词（缓存键取替换后的文本）"""
+    for target, replacement in (getattr(C, "PRONUNCIATION_FIXES", None) or {}).items():
+        if target in text:
+            text = text.replace(target, replacement)
+    return text
+
+
+class TTSCache:
+    """
+    跨项目共享的 TTS 缓存：CACHE_DIR/tts/<key>.mp3，key 为
+    (服务商, 音色, 语速, 音调, 情感, 实际合成的文本) 的内容哈希。
+
+    命中时以硬链接（跨文件系统时退化为拷贝）放到目标路径，文件修改时间记录最近使用时间，
+    总大小超过 TTS_CACHE_MAX_MB 时按最久未使用淘汰。
+    硬链接与缓存共享同一份数据，写入目标路径前必须先 discard，不能原地覆盖。
+    """
+
+    @property
+    def root(self) -> Optional[str]:
+        if not C.ENABLE_TTS_CACHE or not C.CACHE_DIR:
+            return None
+        return os.path.join(C.CACHE_DIR, "tts")
+
+    def key(self, provider, voice, rate=None, pitch=None, emotion=None, text="") -> str:
+        return content_key(TTS_CACHE_VERSION, provider, voice, rate, pitch, emotion, text)
+
+    def path(self, key: str) -> Optional[str]:
+        root = self.root
+        return os.path.join(root, f"{key}.mp3") if root else None
+
+    def discard(self, output_path: str):
+        """删除目标文件（可能是缓存的硬链接），之后的写入不会改到缓存"""
+        try:
+            os.remove(output_path)
+        except FileNotFoundError:
+            pass
+
+    def fetch(self, key: str, output_path: str) -> bool:
+        """缓存命中时把音频放到 output_path 并返回 True"""
+        path = self.path(key)
+        if not path or not os.path.exists(path):
+            return False
+        try:
+            self.discard(output_path)
+            try:
+                os.link(path, output_path)
+            except OSError:
+                shutil.copyfile(path, output_path)
+            os.utime(path)
+        except OSError as e:
+            logger.warning(f"⚠️ TTS cache unreadable, synthesizing: {e}")
+            return False
+        logger.debug(f"🗃️ TTS cache hit: {os.path.basename(output_path)}")
+        return True
+
+    def store(self, key: str, src_path: str):
+        """合成结果写入缓存（拷贝后原子替换），随后按容量上限淘汰"""
+        path = self.path(key)
+        if not path or not os.path.exists(src_path) or not os.path.getsize(src_path):
+            return
+        part_path = f"{path}.{os.getpid()}.{threading.get_ident()}.part"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            shutil.copyfile(src_path, part_path)
+            os.replace(part_path, path)
+        except OSError as e:
+            logger.warning(f"⚠️ Failed to write TTS cache: {e}")
+            if os.path.exists(part_path):
+                os.remove(part_path)
+            return
+        self.evict()
+
+    def evict(self):
+        """总大小超过上限时删除最久未使用的条目"""
+        root = self.root
+        max_bytes = int(C.TTS_CACHE_MAX_MB * 1024 * 1024)
+        if not root or max_bytes <= 0 or not os.path.isdir(root):
+            return
+        entries = []
+        total = 0
+        for entry in os.scandir(root):
+            if not entry.name.endswith(".mp3"):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total += stat.st_size
+        if total <= max_bytes:
+            return
+        entries.sort()
+        for _, size, path in entries:
+            if total <= max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+        logger.debug(f"🗃️ TTS cache evicted to {total / 1e6:.1f} MB")
+
+
+# 全局实例
+tts_cache = TTSCache()
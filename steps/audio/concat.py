@@ -0,0 +1,142 @@
+import os
+import shutil
+import subprocess
+import tempfile
+from typing import List
+
+from moviepy.config import get_setting
+
+from steps.audio.probe import stream_info
+from util.logger import logger
+
+# 能生成同参数静音、直接拷贝拼接的编码
+_ENCODERS = {"mp3": "libmp3lame", "aac": "aac"}
+
+
+def _run(cmd: List[str]):
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip()[-2000:])
+
+
+def write_silence(path: str, duration: float, info: dict):
+    """按 info 的编码/采样率/声道/码率生成一段静音，可与同参数的音频直接拷贝拼接"""
+    cmd = [
+        get_setting("FFMPEG_BINARY"),
+        "-y",
+        "-hide_banner",
+        "-loglevel",
+        "error",
+        "-f",
+        "lavfi",
+        "-i",
+        f"anullsrc=r={info['sample_rate']}:cl={'mono' if info['channels'] == 1 else 'stereo'}",
+        "-t",
+        f"{duration:.3f}",
+        "-ac",
+        str(info["channels"]),
+        "-c:a",
+        _ENCODERS[info["codec"]],
+    ]
+    if info.get("bitrate"):
+        cmd += ["-b:a", f"{info['bitrate']}k"]
+    _run(cmd + [path])
+
+
+def _concat_copy(paths, output_path, gap, info, work_dir):
+    parts = list(paths)
+    if gap > 0:
+        silence_path = os.path.join(work_dir, f"silence{os.path.splitext(output_path)[1]}")
+        write_silence(silence_path, gap, info)
+        parts = [p for path in paths for p in (path, silence_path)][:-1]
+
+    list_path = os.path.join(work_dir, "parts.txt")
+    with open(list_path, "w", encoding="utf-8") as f:
+        for path in parts:
+            f.write(f"file '{os.path.abspath(path)}'\n")
+    _run(
+        [
+            get_setting("FFMPEG_BINARY"),
+            "-y",
+            "-hide_banner",
+            "-loglevel",
+            "error",
+            "-f",
+            "concat",
+            "-safe",
+            "0",
+            "-i",
+            list_path,
+            "-c",
+            "copy",
+            output_path,
+        ]
+    )
+
+
+def _concat_reencode(paths, output_path, gap, info, work_dir):
+    """参数不一致时的回退：统一重采样到第一段的格式后用 concat 滤镜拼接"""
+    sample_rate = info["sample_rate"] if info else 44100
+    layout = "mono" if info and info["channels"] == 1 else "stereo"
+    cmd = [get_setting("FFMPEG_BINARY"), "-y", "-hide_banner", "-loglevel", "error"]
+    for path in paths:
+        cmd += ["-i", path]
+    if gap > 0:
+        cmd += ["-f", "lavfi", "-t", f"{gap:.3f}", "-i", f"anullsrc=r={sample_rate}:cl={layout}"]
+
+    chains, labels = [], []
+    for i in range(len(paths)):
+        chains.append(f"[{i}:a]aformat=sample_rates={sample_rate}:channel_layouts={layout}[a{i}]")
+        labels.append(f"[a{i}]")
+        if gap > 0 and i < len(paths) - 1:
+            labels.append(f"[{len(paths)}:a]")
+    # 同一路静音要多次使用时先拆分
+    silence_uses = labels.count(f"[{len(paths)}:a]")
+    if silence_uses > 1:
+        chains.append(
+            f"[{len(paths)}:a]asplit={silence_uses}"
+            + "".join(f"[s{j}]" for j in range(silence_uses))
+        )
+        j = 0
+        for k, label in enumerate(labels):
+            if label == f"[{len(paths)}:a]":
+                labels[k] = f"[s{j}]"
+                j += 1
+    chains.append(f"{''.join(labels)}concat=n={len(labels)}:v=0:a=1[out]")
+    _run(cmd + ["-filter_complex", ";".join(chains), "-map", "[out]", output_path])
+
+
+def concat_audio(paths: List[str], output_path: str, gap: float = 0.0):
+    """
+    按顺序拼接音频，相邻两段之间插入 gap 秒静音。
+    各段编码/采样率/声道一致时（同一 TTS 服务的输出）用 concat demuxer 直接拷贝码流，
+    静音按真实采样率单独编码一小段；参数不一致或拷贝失败时回退为一次 ffmpeg 重编码。
+    结果先写到临时目录再原子替换 output_path（目标若是 TTS 缓存的硬链接，缓存不受影响）。
+    """
+    infos = [stream_info(path) for path in paths]
+    info = infos[0]
+    copyable = (
+        info is not None
+        and info["codec"] in _ENCODERS
+        and all(
+            other
+            and (other["codec"], other["sample_rate"], other["channels"])
+            == (info["codec"], info["sample_rate"], info["channels"])
+            for other in infos[1:]
+        )
+    )
+
+    work_dir = tempfile.mkdtemp(dir=os.path.dirname(os.path.abspath(output_path)))
+    temp_output = os.path.join(work_dir, os.path.basename(output_path))
+    try:
+        if copyable:
+            try:
+                _concat_copy(paths, temp_output, gap, info, work_dir)
+            except RuntimeError as e:
+                logger.warning(f"⚠️ Audio stream-copy concat failed, re-encoding: {e}")
+                copyable = False
+        if not copyable:
+            _concat_reencode(paths, temp_output, gap, info, work_dir)
+        os.replace(temp_output, output_path)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
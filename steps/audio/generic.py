@@ -1,19 +1,60 @@
+import asyncio
 import os
 import edge_tts
-from typing import List
-import numpy as np
-from moviepy.editor import AudioFileClip, concatenate_audioclips
-from moviepy.audio.AudioClip import AudioArrayClip
 
 from config.config import C
 from model.models import Scene
 from util.logger import logger
 from steps.audio.base import AudioStudioBase
+from steps.audio.cache import apply_pronunciation_fixes, tts_cache
+from steps.audio.concat import concat_audio
 
 class GenericAudioStudio(AudioStudioBase):
+    provider = "edge"
+
     def __init__(self):
         self.voice = C.TTS_VOICE
 
+    # 情感 -> (音调, 语速) 的韵律模拟
+    EMOTION_PROSODY = {
+        "cheerful": {"pitch": "+15Hz", "rate": "+3%"},
+        "excited": {"pitch": "+20Hz", "rate": "+8%"},
+        "sad": {"pitch": "-15Hz", "rate": "-5%"},
+        "fearful": {"pitch": "+10Hz", "rate": "+10%"},
+        "affectionate": {"pitch": "-8Hz", "rate": "-8%"},
+        "angry": {"pitch": "+5Hz", "rate": "+5%"},
+        "greedy": {"pitch": "+8Hz", "rate": "+5%"},
+        "confident": {"pitch": "+5Hz", "rate": "+0%"},
+        "surprised": {"pitch": "+18Hz", "rate": "+12%"},
+        "gentle": {"pitch": "-5Hz", "rate": "-5%"},
+    }
+
+    def _request(self, text: str, emotion: str = None, voice_override: str = None) -> dict:
+        """实际发给 edge-tts 的参数（发音修正后的文本、音色、语速、音调、生效的情感）"""
+        # Use voice_override if provided, else default
+        voice = voice_override if voice_override else self.voice
+        if (
+            C.ENABLE_EMOTIONAL_TTS
+            and emotion
+            and emotion != "neutral"
+            and emotion != "serious"
+        ):
+            prosody = self.EMOTION_PROSODY.get(emotion, {"pitch": "+0Hz", "rate": "+0%"})
+            rate, pitch = prosody["rate"], prosody["pitch"]
+        else:
+            emotion = None
+            rate, pitch = C.get_speech_rate(C.CURRENT_CATEGORY), "+0Hz"
+        return {
+            "text": apply_pronunciation_fixes(text),
+            "voice": voice,
+            "rate": rate,
+            "pitch": pitch,
+            "emotion": emotion,
+        }
+
+    def tts_cache_key(self, text: str, emotion: str = None, voice_override: str = None):
+        return tts_cache.key(self.provider, **self._request(text, emotion, voice_override))
+
     async def generate_tts(
         self,
         text: str,
@@ -25,44 +66,18 @@ class GenericAudioStudio(AudioStudioBase):
         Generates TTS audio with optional emotion simulation using prosody.
         """
         try:
-            # 0. Apply Pronunciation Fixes
-            if hasattr(C, "PRONUNCIATION_FIXES") and C.PRONUNCIATION_FIXES:
-                for target, replacement in C.PRONUNCIATION_FIXES.items():
-                    if target in text:
-                        text = text.replace(target, replacement)
-
-            # Use voice_override if provided, else default
-            voice = voice_override if voice_override else self.voice
-
-            if (
-                C.ENABLE_EMOTIONAL_TTS
-                and emotion
-                and emotion != "neutral"
-                and emotion != "serious"
-            ):
-                emotion_map = {
-                    "cheerful": {"pitch": "+15Hz", "rate": "+3%"},
-                    "excited": {"pitch": "+20Hz", "rate": "+8%"},
-                    "sad": {"pitch": "-15Hz", "rate": "-5%"},
-                    "fearful": {"pitch": "+10Hz", "rate": "+10%"},
-                    "affectionate": {"pitch": "-8Hz", "rate": "-8%"},
-                    "angry": {"pitch": "+5Hz", "rate": "+5%"},
-                    "greedy": {"pitch": "+8Hz", "rate": "+5%"},
-                    "confident": {"pitch": "+5Hz", "rate": "+0%"},
-                    "surprised": {"pitch": "+18Hz", "rate": "+12%"},
-                    "gentle": {"pitch": "-5Hz", "rate": "-5%"},
-                }
-                
-                prosody = emotion_map.get(emotion, {"pitch": "+0Hz", "rate": "+0%"})
-                
-                communicate = edge_tts.Communicate(
-                    text, voice, pitch=prosody["pitch"], rate=prosody["rate"]
+            request = self._request(text, emotion, voice_override)
+            communicate = edge_tts.Communicate(
+                request["text"],
+                request["voice"],
+                rate=request["rate"],
+                pitch=request["pitch"],
+            )
+            if request["emotion"]:
+                logger.debug(
+                    f"🎭 Using emotion '{emotion}' (pitch:{request['pitch']}, rate:{request['rate']})"
                 )
-                logger.debug(f"🎭 Using emotion '{emotion}' (pitch:{prosody['pitch']}, rate:{prosody['rate']})")
-            else:
-                speech_rate = C.get_speech_rate(C.CURRENT_CATEGORY)
-                communicate = edge_tts.Communicate(text, voice, rate=speech_rate)
-                
+
             await communicate.save(output_path)
             return True
         except Exception as e:
@@ -91,41 +106,28 @@ class GenericAudioStudio(AudioStudioBase):
 
                 logger.info(f"  - Generating Bilingual Audio (EN + CN)")
 
-                # 1. Generate English
-                await self.generate_tts(scene.narration, path_en, emotion)
-                # 2. Generate Chinese (use configured voice if available)
+                # EN / CN 同时合成（CN 使用配置的音色）
                 cn_voice = C.BILINGUAL_CN_VOICE if C.BILINGUAL_CN_VOICE else None
-                await self.generate_tts(
-                    scene.narration_cn, path_cn, emotion, voice_override=cn_voice
+                results = await asyncio.gather(
+                    self._synthesize(scene.narration, path_en, emotion),
+                    self._synthesize(
+                        scene.narration_cn, path_cn, emotion, voice_override=cn_voice
+                    ),
                 )
 
-                if os.path.exists(path_en) and os.path.exists(path_cn):
-                    # 3. Concatenate using MoviePy
-                    clip_en = AudioFileClip(path_en)
-                    clip_cn = AudioFileClip(path_cn)
-
-                    # Silence (Pause)
-                    # Create 2 channels of silence
-                    # Assuming 44100Hz default from edge-tts usually
-                    silence_duration = C.BILINGUAL_AUDIO_PAUSE
-                    sr = 44100
-                    silence_array = np.zeros((int(sr * silence_duration), 2))
-                    silence_clip = AudioArrayClip(silence_array, fps=sr)
-
-                    final_clip = concatenate_audioclips(
-                        [clip_en, silence_clip, clip_cn]
+                if all(results) and os.path.exists(path_en) and os.path.exists(path_cn):
+                    # EN -> 停顿 -> CN，直接拷贝码流拼接
+                    await asyncio.to_thread(
+                        concat_audio,
+                        [path_en, path_cn],
+                        output_path,
+                        C.BILINGUAL_AUDIO_PAUSE,
                     )
-                    final_clip.write_audiofile(output_path, logger=None)
-
-                    clip_en.close()
-                    clip_cn.close()
-                    final_clip.close()
 
                     # Cleanup separate files
-                    if os.path.exists(path_en):
-                        os.remove(path_en)
-                    if os.path.exists(path_cn):
-                        os.remove(path_cn)
+                    for path in (path_en, path_cn):
+                        if os.path.exists(path):
+                            os.remove(path)
 
                     scene.audio_path = output_path
                 else:
@@ -133,7 +135,7 @@ class GenericAudioStudio(AudioStudioBase):
 
             else:
                 # Normal Mode
-                success = await self.generate_tts(text, output_path, emotion)
+                success = await self._synthesize(text, output_path, emotion)
 
                 if not success:
                     raise Exception("TTS Generation returned false")
@@ -144,8 +146,3 @@ class GenericAudioStudio(AudioStudioBase):
             logger.traceback_and_raise(
                 Exception(f"Failed to generate audio for Scene {scene.scene_id}: {e}")
             )
-
-    async def generate_audio(self, scenes: List[Scene], force: bool = False):
-        logger.info(f"Starting audio generation for {len(scenes)} scenes...")
-        for scene in scenes:
-            await self._generate_one_audio(scene, force)
@@ -0,0 +1,102 @@
+import re
+import subprocess
+from typing import Optional
+
+from moviepy.config import get_setting
+
+from model.models import Scene
+from util.logger import logger
+
+# ffmpeg -i 输出中的音轨行，如 "Stream #0:0: Audio: mp3 (mp3float), 24000 Hz, mono, fltp, 48 kb/s"
+_AUDIO_STREAM = re.compile(r"Stream #\d+:\d+.*?: Audio: (\w+)[^,]*, (\d+) Hz, ([^,\n]+)(.*)")
+_BITRATE = re.compile(r"(\d+) kb/s")
+_CHANNEL_LAYOUTS = {"mono": 1, "stereo": 2}
+# 与 moviepy 读取时长的方式一致（文件头的 Duration 行），时间轴不因改用元数据而变化
+_DURATION = re.compile(r"Duration: (\d+):(\d+):(\d+(?:\.\d+)?)")
+# ebur128 汇总中的整体响度
+_LOUDNESS = re.compile(r"Integrated loudness:\s*I:\s*(-?[\d.]+|-inf) LUFS")
+
+
+def _parse_header(stderr: str) -> Optional[dict]:
+    """从 ffmpeg 输出解析首个音轨的编码、采样率、声道数、码率和时长"""
+    m = _AUDIO_STREAM.search(stderr)
+    if not m:
+        return None
+    layout = m.group(3).strip()
+    count = re.match(r"(\d+) channels", layout)
+    bitrate = _BITRATE.search(m.group(4))
+    duration = _DURATION.search(stderr)
+    return {
+        "codec": m.group(1),
+        "sample_rate": int(m.group(2)),
+        "channels": _CHANNEL_LAYOUTS.get(layout) or (int(count.group(1)) if count else 2),
+        "bitrate": int(bitrate.group(1)) if bitrate else None,
+        "duration": (
+            int(duration.group(1)) * 3600
+            + int(duration.group(2)) * 60
+            + float(duration.group(3))
+            if duration
+            else None
+        ),
+    }
+
+
+def stream_info(path: str) -> Optional[dict]:
+    """首个音轨的编码、采样率、声道数、码率、时长（只读文件头，不解码）"""
+    result = subprocess.run(
+        [get_setting("FFMPEG_BINARY"), "-hide_banner", "-i", path],
+        capture_output=True,
+        text=True,
+    )
+    return _parse_header(result.stderr)
+
+
+def probe_audio(path: str) -> Optional[dict]:
+    """
+    一次 ffmpeg 解码同时取得时长、采样率、声道数与整体响度（EBU R128 Integrated Loudness，LUFS；
+    全静音时为 None）。无法读取时返回 None。
+    """
+    result = subprocess.run(
+        [
+            get_setting("FFMPEG_BINARY"),
+            "-hide_banner",
+            "-nostats",
+            "-i",
+            path,
+            "-vn",
+            "-af",
+            "ebur128=framelog=quiet",
+            "-f",
+            "null",
+            "-",
+        ],
+        capture_output=True,
+        text=True,
+    )
+    info = _parse_header(result.stderr)
+    if result.returncode != 0 or not info or info["duration"] is None:
+        return None
+    loudness = _LOUDNESS.search(result.stderr)
+    # ebur128 的门限下限是 -70 LUFS，低于它视为静音
+    info["loudness"] = (
+        float(loudness.group(1))
+        if loudness and loudness.group(1) != "-inf" and float(loudness.group(1)) > -70
+        else None
+    )
+    return info
+
+
+def probe_scene_audio(scene: Scene) -> bool:
+    """探测场景音频，写入 duration_seconds / audio_sample_rate / audio_channels / audio_loudness"""
+    info = probe_audio(scene.audio_path) if scene.audio_path else None
+    if not info:
+        # 清掉旧值，视频步骤回退为读取文件头
+        scene.duration_seconds = 0.0
+        scene.audio_sample_rate = scene.audio_channels = scene.audio_loudness = None
+        logger.warning(f"⚠️ Failed to probe audio for Scene {scene.scene_id}: {scene.audio_path}")
+        return False
+    scene.duration_seconds = info["duration"]
+    scene.audio_sample_rate = info["sample_rate"]
+    scene.audio_channels = info["channels"]
+    scene.audio_loudness = info["loudness"]
+    return True
@@ -1,15 +1,79 @@
+import asyncio
+import base64
+import json
 import os
+import re
+import threading
 import uuid
-import requests
-import base64
-from typing import List
+
+import aiohttp
+
 from config.config import C
 from model.models import Scene
 from util.logger import logger
-from steps.audio.base import AudioStudioBase
+from steps.audio.base import AudioStudioBase, TTSThrottledError, tts_limits
+from steps.audio.cache import tts_cache
+
+# 响应中音频字段的起始位置
+_DATA_FIELD = re.compile(rb'"data"\s*:\s*"')
+# 并发超限 / 服务繁忙，视为限流
+_THROTTLE_CODES = {3003, 3005}
+_CHUNK_SIZE = 64 * 1024
+
+
+class _Base64Sink:
+    """
+    边读边解码：从 JSON 响应流中把 "data" 字段的 base64 按 4 字符对齐解码写入文件，
+    其余字段（code / message 等，很小）保留下来供 json 解析。整段音频不需要在内存里出现两次。
+    """
+
+    def __init__(self, f):
+        self.f = f
+        self.meta = bytearray()
+        self.state = "head"  # head -> data -> tail
+        self.pending = b""
+        self.nbytes = 0
+
+    def feed(self, chunk: bytes):
+        if self.state == "head":
+            self.meta += chunk
+            m = _DATA_FIELD.search(self.meta)
+            if not m:
+                return
+            chunk = bytes(self.meta[m.end():])
+            del self.meta[m.end():]
+            self.state = "data"
+        if self.state == "data":
+            end = chunk.find(b'"')
+            if end < 0:
+                self._decode(chunk)
+                return
+            self._decode(chunk[:end], final=True)
+            self.state = "tail"
+            chunk = chunk[end:]
+        self.meta += chunk
+
+    def _decode(self, data: bytes, final: bool = False):
+        # JSON 可能把 "/" 转义成 "\/"
+        buf = self.pending + data.replace(b"\\", b"")
+        n = len(buf) if final else len(buf) // 4 * 4
+        if n:
+            decoded = base64.b64decode(buf[:n])
+            self.f.write(decoded)
+            self.nbytes += len(decoded)
+        self.pending = buf[n:]
+
+    def payload(self) -> dict:
+        """除音频外的响应字段（音频字段置为空串）"""
+        try:
+            return json.loads(bytes(self.meta))
+        except ValueError:
+            return {"message": bytes(self.meta[:500]).decode("utf-8", "replace")}
 
 
 class VolcAudioStudio(AudioStudioBase):
+    provider = "volc"
+
     def __init__(self):
         self.appid = getattr(C, "VOLC_TTS_APPID", "")
         self.token = getattr(C, "VOLC_TTS_TOKEN", "")
@@ -18,9 +82,79 @@ class VolcAudioStudio(AudioStudioBase):
         self.host = "openspeech.bytedance.com"
         self.api_url = f"https://{self.host}/api/v1/tts"
 
+        # 连接池会话（keep-alive），绑定在创建时的事件循环上
+        self._session = None
+        self._session_loop = None
+
         if not self.appid or not self.token:
             logger.warning("VOLC_TTS_APPID or VOLC_TTS_TOKEN not configured.")
 
+    async def _get_session(self) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            connector = aiohttp.TCPConnector(
+                limit=max(1, int(tts_limits(self.provider)["concurrency"])),
+                keepalive_timeout=60,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=C.VOLC_TTS_TIMEOUT),
+            )
+            self._session_loop = loop
+        return self._session
+
+    async def aclose(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def _audio_params(self, emotion: str = None, voice_type: str = None) -> dict:
+        """请求中的 audio 参数（音色、语速、情感等），同时决定 TTS 缓存键"""
+        # Determine effective voice type
+        effective_voice = voice_type if voice_type else self.voice_type
+        audio = {
+            "voice_type": effective_voice,
+            "encoding": "mp3",
+            "speed_ratio": 1.0,
+            "volume_ratio": 1.0,
+            "pitch_ratio": 1.0,
+        }
+
+        # Apply speed ratio from config
+        rate_str = C.get_speech_rate(C.CURRENT_CATEGORY)
+        # rate_str is like "+15%" or "-10%". Convert to ratio 1.15 / 0.9.
+        if rate_str:
+            try:
+                val = float(rate_str.replace("%", ""))
+                audio["speed_ratio"] = 1.0 + (val / 100.0)
+            except:
+                pass
+
+        # Apply emotion if applicable
+        # Note: Not all voices support emotion parameter directly in V1 API this way without specific voice configuration.
+        # Usually you just specific voice_type that IS emotional (e.g. story specific voice).
+        # But "emotion" param exists for some voices.
+        if (
+            C.ENABLE_EMOTIONAL_TTS
+            and emotion
+            and emotion not in ["neutral", "default"]
+        ):
+            # Map standard emotions to Volcengine emotions if needed.
+            # Common volc emotions: happy, sad, angry, fear, surprise
+            audio["emotion"] = emotion
+        return audio
+
+    def tts_cache_key(self, text: str, emotion: str = None, voice_type: str = None):
+        audio = self._audio_params(emotion, voice_type)
+        return tts_cache.key(
+            self.provider,
+            f"{self.cluster}/{audio['voice_type']}",
+            audio["speed_ratio"],
+            audio["pitch_ratio"],
+            audio.get("emotion"),
+            text,
+        )
+
     async def generate_tts(
         self, text: str, output_path: str, emotion: str = None, voice_type: str = None
     ) -> bool:
@@ -34,10 +168,6 @@ class VolcAudioStudio(AudioStudioBase):
         try:
             # Prepare request
             # Ref: https://www.volcengine.com/docs/6561/96752
-
-            # Determine effective voice type
-            effective_voice = voice_type if voice_type else self.voice_type
-
             header = {"Authorization": f"Bearer;{self.token}"}
 
             request_json = {
@@ -47,13 +177,7 @@ class VolcAudioStudio(AudioStudioBase):
                     "cluster": self.cluster,
                 },
                 "user": {"uid": "auto_ai_video_user"},
-                "audio": {
-                    "voice_type": effective_voice,
-                    "encoding": "mp3",
-                    "speed_ratio": 1.0,
-                    "volume_ratio": 1.0,
-                    "pitch_ratio": 1.0,
-                },
+                "audio": self._audio_params(emotion, voice_type),
                 "request": {
                     "reqid": str(uuid.uuid4()),
                     "text": text,
@@ -61,50 +185,39 @@ class VolcAudioStudio(AudioStudioBase):
                     "operation": "query",
                 },
             }
-
-            # Apply speed ratio from config
-            rate_str = C.get_speech_rate(C.CURRENT_CATEGORY)
-            # rate_str is like "+15%" or "-10%". Convert to ratio 1.15 / 0.9.
-            if rate_str:
-                try:
-                    val = float(rate_str.replace("%", ""))
-                    ratio = 1.0 + (val / 100.0)
-                    request_json["audio"]["speed_ratio"] = ratio
-                except:
-                    pass
-
-            # Apply emotion if applicable
-            # Note: Not all voices support emotion parameter directly in V1 API this way without specific voice configuration.
-            # Usually you just specific voice_type that IS emotional (e.g. story specific voice).
-            # But "emotion" param exists for some voices.
-            if (
-                C.ENABLE_EMOTIONAL_TTS
-                and emotion
-                and emotion not in ["neutral", "default"]
-            ):
-                # Map standard emotions to Volcengine emotions if needed.
-                # Common volc emotions: happy, sad, angry, fear, surprise
-                request_json["audio"]["emotion"] = emotion
+            if "emotion" in request_json["audio"]:
                 logger.debug(f"🌋 Volc TTS using emotion: {emotion}")
 
-            resp = requests.post(self.api_url, json=request_json, headers=header)
-
-            if "data" in resp.json():
-                data = resp.json()["data"]
-                # data is base64 encoded audio
-                if data:
-                    audio_bytes = base64.b64decode(data)
-                    with open(output_path, "wb") as f:
-                        f.write(audio_bytes)
-                    logger.debug(f"Volc TTS success: {output_path}")
-                    return True
-                else:
-                    logger.error(f"Volc TTS response has no data: {resp.text}")
+            session = await self._get_session()
+            # 先写临时文件，成功后原子替换，失败不会留下残缺的音频
+            part_path = f"{output_path}.{os.getpid()}.{threading.get_ident()}.part"
+            try:
+                async with session.post(
+                    self.api_url, json=request_json, headers=header
+                ) as resp:
+                    with open(part_path, "wb") as f:
+                        sink = _Base64Sink(f)
+                        async for chunk in resp.content.iter_chunked(_CHUNK_SIZE):
+                            sink.feed(chunk)
+                    status = resp.status
+                payload = sink.payload()
+                if status == 429 or payload.get("code") in _THROTTLE_CODES:
+                    raise TTSThrottledError(
+                        f"Volc TTS throttled ({status}): {payload.get('message')}"
+                    )
+                if sink.nbytes == 0:
+                    logger.error(f"Volc TTS failed ({status}): {payload}")
                     return False
-            else:
-                logger.error(f"Volc TTS failed: {resp.text}")
-                return False
+                os.replace(part_path, output_path)
+            finally:
+                if os.path.exists(part_path):
+                    os.remove(part_path)
+
+            logger.debug(f"Volc TTS success: {output_path}")
+            return True
 
+        except TTSThrottledError:
+            raise
         except Exception as e:
             logger.traceback_and_raise(Exception(f"Volc TTS Exception: {e}"))
             return False
@@ -163,7 +276,7 @@ class VolcAudioStudio(AudioStudioBase):
             # Hack: Pass it via a private method or modify generate_tts now.
             # I will modify generate_tts signature in this same file.
 
-            success = await self.generate_tts(
+            success = await self._synthesize(
                 text, output_path, emotion, voice_type=current_voice_type
             )
 
@@ -176,8 +289,3 @@ class VolcAudioStudio(AudioStudioBase):
             logger.traceback_and_raise(
                 Exception(f"Failed to generate audio for Scene {scene.scene_id}: {e}")
             )
-
-    async def generate_audio(self, scenes: List[Scene], force: bool = False):
-        logger.info(f"Starting Volcengine audio generation for {len(scenes)} scenes...")
-        for scene in scenes:
-            await self._generate_one_audio(scene, force)
@@ -0,0 +1,114 @@
+from functools import lru_cache
+from typing import Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+Color = Tuple[int, ...]
+
+
+def _freeze(a: np.ndarray) -> np.ndarray:
+    a = np.ascontiguousarray(a, dtype=np.uint8)
+    a.setflags(write=False)
+    return a
+
+
+def _ramp(n: int, endpoint: bool) -> np.ndarray:
+    """0 -> 1 的插值系数；endpoint=True 时最后一个像素取到终点色"""
+    if endpoint:
+        return np.arange(n, dtype=np.float64) / max(n - 1, 1)
+    return np.arange(n, dtype=np.float64) / n
+
+
+@lru_cache(maxsize=16)
+def linear_gradient(
+    size: Tuple[int, int],
+    start: Color,
+    end: Color,
+    horizontal: bool = False,
+    endpoint: bool = False,
+) -> np.ndarray:
+    """
+    线性渐变背景 (H, W, C) uint8，C 与颜色的通道数一致（RGB 或 RGBA）。
+
+    与逐行 draw.line 填充 int(a + (b - a) * t) 的结果逐像素相同，一次向量化计算完成；
+    按 (尺寸, 配色, 方向) 缓存，结果只读共享。
+    """
+    w, h = size
+    t = _ramp(w if horizontal else h, endpoint)
+    a = np.asarray(start, dtype=np.float64)
+    b = np.asarray(end, dtype=np.float64)
+    # 逐通道截断取整，与 int() 一致
+    line = np.trunc(a[None, :] + (b - a)[None, :] * t[:, None])
+    if horizontal:
+        frame = np.broadcast_to(line[None, :, :], (h, w, len(start)))
+    else:
+        frame = np.broadcast_to(line[:, None, :], (h, w, len(start)))
+    return _freeze(frame)
+
+
+@lru_cache(maxsize=16)
+def radial_gradient(
+    size: Tuple[int, int],
+    center: Tuple[float, float],
+    radius: float,
+    color: Color,
+    falloff: float = 1.0,
+) -> np.ndarray:
+    """
+    径向光晕 (H, W, 4) uint8：中心 alpha 为 color[3]，按 (1 - d / radius) ** falloff 衰减到 radius 处为 0，
+    圈外完全透明（RGB 也为 0，便于直接 alpha_composite）。
+    """
+    w, h = size
+    cx, cy = center
+    xs = np.arange(w, dtype=np.float64)[None, :]
+    ys = np.arange(h, dtype=np.float64)[:, None]
+    d = np.hypot(xs - cx, ys - cy)
+    alpha = np.trunc(color[3] * np.clip(1 - d / radius, 0.0, None) ** falloff)
+    frame = np.zeros((h, w, 4), dtype=np.uint8)
+    visible = alpha > 0
+    frame[visible, :3] = color[:3]
+    frame[..., 3] = alpha
+    return _freeze(frame)
+
+
+@lru_cache(maxsize=16)
+def vignette(
+    size: Tuple[int, int],
+    strength: int = 120,
+    inner: float = 0.5,
+    color: Color = (0, 0, 0),
+) -> np.ndarray:
+    """
+    暗角遮罩 (H, W, 4) uint8：椭圆半径比例 inner 以内透明，向四角平滑过渡到 alpha = strength。
+    """
+    w, h = size
+    xs = (np.arange(w, dtype=np.float64)[None, :] + 0.5) / w * 2 - 1
+    ys = (np.arange(h, dtype=np.float64)[:, None] + 0.5) / h * 2 - 1
+    # 归一化到画面角点处 r = 1
+    r = np.sqrt((xs**2 + ys**2) / 2)
+    p = np.clip((r - inner) / max(1 - inner, 1e-6), 0.0, 1.0)
+    alpha = np.trunc(strength * p * p * (3 - 2 * p))  # smoothstep
+    frame = np.empty((h, w, 4), dtype=np.uint8)
+    frame[..., :3] = color[:3]
+    frame[..., 3] = alpha
+    return _freeze(frame)
+
+
+@lru_cache(maxsize=16)
+def noise(size: Tuple[int, int], amount: int = 12, seed: int = 0) -> np.ndarray:
+    """
+    颗粒噪点层 (H, W, 4) uint8：随机灰度、alpha = amount，同一 seed 结果固定（缓存和重跑都一致）。
+    """
+    w, h = size
+    rng = np.random.default_rng(seed)
+    frame = np.empty((h, w, 4), dtype=np.uint8)
+    frame[..., :3] = rng.integers(0, 256, size=(h, w, 1), dtype=np.uint8)
+    frame[..., 3] = amount
+    return _freeze(frame)
+
+
+def to_image(frame: np.ndarray, mode: Optional[str] = None) -> Image.Image:
+    """转为 PIL 图片（拷贝一份，调用方可以随意修改）"""
+    image = Image.fromarray(np.array(frame))
+    return image.convert(mode) if mode and image.mode != mode else image
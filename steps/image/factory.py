@@ -7,6 +7,7 @@ from model.models import Scene
 from util.logger import logger
 from config.config import C
 from config import config
+from steps.image.ingest import image_ingest
 
 try:
     import google.generativeai as genai
@@ -83,6 +84,9 @@ class ImageFactory:
                 logger.traceback_and_raise(Exception("Image generation failed"))
 
         results = await asyncio.gather(*tasks)
+
+        # 入库：生成渲染就绪副本，组装阶段不再逐场景缩放
+        await asyncio.to_thread(image_ingest.ingest_scenes, scenes)
         return results
 
     async def _generate_one_image(self, scene: Scene, force: bool = False) -> str:
@@ -26,6 +26,20 @@ class FontManager:
             ]
         }
 
+    def _candidates(self, font_type: str) -> list:
+        """候选字体路径（已展开 ~）：优先 config.yaml 配置，未配置时使用硬编码默认值"""
+        candidates = C.FONTS.get(font_type, [])
+        if not candidates:
+            candidates = self.default_fallbacks.get(font_type, [])
+        # 确保它是列表
+        if isinstance(candidates, str):
+            candidates = [candidates]
+        return [os.path.expanduser(path) for path in candidates]
+
+    def resolve_path(self, font_type: str) -> str:
+        """get_font 实际会使用的字体文件路径；没有可用字体时返回空字符串（PIL 默认字体）"""
+        return next((p for p in self._candidates(font_type) if os.path.exists(p)), "")
+
     def get_font(self, font_type: str, size: int) -> ImageFont.FreeTypeFont:
         """
         获取已加载的 ImageFont 对象。
@@ -37,22 +51,8 @@ class FontManager:
         Returns:
             ImageFont: 加载的字体，或者如果全部失败则返回默认 PIL 字体。
         """
-        # 1. 从配置中获取候选路径
-        candidates = C.FONTS.get(font_type, [])
-        
-        # 2. 如果列表为空或未配置特定类型，则追加硬编码默认值
-        if not candidates:
-            candidates = self.default_fallbacks.get(font_type, [])
-        
-        # 确保它是列表
-        if isinstance(candidates, str):
-            candidates = [candidates]
-            
-        # 3. 尝试加载
-        for path in candidates:
-            # 展开 ~
-            path = os.path.expanduser(path)
-            
+        # 按候选顺序尝试加载
+        for path in self._candidates(font_type):
             if not os.path.exists(path):
                 continue
                 
@@ -71,7 +71,7 @@ class FontManager:
                 )
                 continue
         
-        # 4. 回退到默认值
+        # 回退到默认值
         if font_type != "default":
             # 如果没办法了，是否尝试用英文回退代替中文，反之亦然？不，直接用默认。
             logger.warning(f"No suitable font found for '{font_type}'. Using system default.")
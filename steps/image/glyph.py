@@ -0,0 +1,202 @@
+import math
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+
+def _div255(a: np.ndarray) -> np.ndarray:
+    """与 PIL 的 DIV255 宏一致的整数除 255（四舍五入）"""
+    a = a + 128
+    return (a + (a >> 8)) >> 8
+
+
+def _ink(color) -> Tuple[int, ...]:
+    if isinstance(color, int):
+        return (color, color, color, 255)
+    return tuple(color) + (255,) * (4 - len(color))
+
+
+class GlyphAtlas:
+    """
+    字形图集。
+
+    按 (字体文件, 字号, 描边宽度, 文本, 亚像素起点) 缓存 FreeType 栅格化出的 alpha 遮罩，
+    按 (字体文件, 字号, 文本) 缓存 textbbox 度量，两者都按最近最少使用淘汰。绘制时把遮罩直接混合进 RGBA NumPy 缓冲区，
+    混合规则与 ImageDraw.text 画在 RGBA 图上完全一致（逐像素相同）。
+
+    字幕里同一个汉字/拼音反复出现，一个视频只需栅格化几百个不同的字形。
+    """
+
+    def __init__(self, max_glyphs: int = 8192, max_metrics: int = 8192):
+        self.max_glyphs = max_glyphs
+        self.max_metrics = max_metrics
+        self._glyphs = OrderedDict()
+        self._metrics = OrderedDict()
+        self._measure_draw = ImageDraw.Draw(Image.new("RGBA", (1, 1)))
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _font_key(font) -> tuple:
+        if isinstance(font, ImageFont.FreeTypeFont):
+            return (font.path, font.size, font.index)
+        return (id(font),)
+
+    # ==================== 度量 ====================
+
+    def bbox(self, text: str, font) -> Tuple[int, int, int, int]:
+        """等价于 draw.textbbox((0, 0), text, font=font)"""
+        key = (self._font_key(font), text)
+        box = self._metrics.get(key)
+        if box is not None:
+            self._metrics.move_to_end(key)
+            return box
+        box = self._metrics[key] = self._measure_draw.textbbox((0, 0), text, font=font)
+        if len(self._metrics) > self.max_metrics:
+            self._metrics.popitem(last=False)
+        return box
+
+    def width(self, text: str, font) -> int:
+        box = self.bbox(text, font)
+        return box[2] - box[0]
+
+    def height(self, text: str, font) -> int:
+        box = self.bbox(text, font)
+        return box[3] - box[1]
+
+    # ==================== 栅格化 ====================
+
+    def _mask(
+        self, text: str, font, stroke_width: int, fx: float, fy: float
+    ) -> Tuple[Optional[np.ndarray], int, int]:
+        """
+        返回 (alpha 遮罩, dx, dy)：遮罩左上角相对绘制坐标整数部分的偏移。
+        全透明时遮罩为 None。
+        """
+        key = (self._font_key(font), text, stroke_width, fx, fy)
+        glyph = self._glyphs.get(key)
+        if glyph is not None:
+            self.hits += 1
+            self._glyphs.move_to_end(key)
+            return glyph
+
+        self.misses += 1
+        mask, dx, dy = self._rasterize(text, font, stroke_width, fx, fy)
+        rows = np.flatnonzero(mask.any(axis=1))
+        cols = np.flatnonzero(mask.any(axis=0))
+        if rows.size == 0:
+            glyph = (None, 0, 0)
+        else:
+            # 裁掉全透明的边（遮罩为 0 的像素混合后不变）
+            y0, y1, x0, x1 = rows[0], rows[-1] + 1, cols[0], cols[-1] + 1
+            glyph = (
+                np.ascontiguousarray(mask[y0:y1, x0:x1]).astype(np.int32),
+                dx + int(x0),
+                dy + int(y0),
+            )
+
+        self._glyphs[key] = glyph
+        if len(self._glyphs) > self.max_glyphs:
+            self._glyphs.popitem(last=False)
+        return glyph
+
+    def _rasterize(self, text: str, font, stroke_width: int, fx: float, fy: float):
+        """栅格化遮罩，参数与 ImageDraw.text 内部调用 getmask2 的方式一致"""
+        if isinstance(font, ImageFont.FreeTypeFont):
+            kwargs = dict(stroke_width=stroke_width, start=(fx, fy))
+            try:
+                core, (dx, dy) = font.getmask2(text, "L", stroke_filled=True, **kwargs)
+            except TypeError:  # 旧版 Pillow 没有 stroke_filled 参数
+                core, (dx, dy) = font.getmask2(text, "L", **kwargs)
+            return np.asarray(Image.Image()._new(core)), dx, dy
+
+        # 位图字体：在 L 图上以 255 绘制，像素值即遮罩
+        left, top, right, bottom = self._measure_draw.textbbox(
+            (0, 0), text, font=font, stroke_width=stroke_width
+        )
+        ox, oy = 2 - min(0, left), 2 - min(0, top)
+        canvas = Image.new("L", (max(1, right) + ox + 2, max(1, bottom) + oy + 2), 0)
+        ImageDraw.Draw(canvas).text(
+            (ox, oy),
+            text,
+            fill=255,
+            font=font,
+            stroke_width=stroke_width,
+            stroke_fill=255 if stroke_width else None,
+        )
+        return np.asarray(canvas), -ox, -oy
+
+    # ==================== 绘制 ====================
+
+    def draw_text(
+        self,
+        buf: np.ndarray,
+        xy: Tuple[float, float],
+        text: str,
+        font,
+        fill=(255, 255, 255, 255),
+        stroke_width: int = 0,
+        stroke_fill=None,
+    ):
+        """
+        等价于 ImageDraw.Draw(img).text(xy, text, fill, font, stroke_width=..., stroke_fill=...)，
+        直接写入 (H, W, 4) uint8 缓冲区 buf。
+        """
+        if not text:
+            return
+        x, y = xy
+        fx, ix = math.modf(x)
+        fy, iy = math.modf(y)
+        ix, iy = int(ix), int(iy)
+
+        if stroke_width:
+            stroke_ink = _ink(stroke_fill if stroke_fill is not None else fill)
+            self._blend(buf, self._mask(text, font, stroke_width, fx, fy), ix, iy, stroke_ink)
+            if _ink(fill) != stroke_ink:
+                self._blend(buf, self._mask(text, font, 0, fx, fy), ix, iy, _ink(fill))
+        else:
+            self._blend(buf, self._mask(text, font, 0, fx, fy), ix, iy, _ink(fill))
+
+    @staticmethod
+    def _blend(buf: np.ndarray, glyph, x: int, y: int, ink: Tuple[int, ...]):
+        mask, dx, dy = glyph
+        if mask is None:
+            return
+        H, W = buf.shape[:2]
+        x0, y0 = x + dx, y + dy
+        x1, y1 = x0 + mask.shape[1], y0 + mask.shape[0]
+        cx0, cy0, cx1, cy1 = max(x0, 0), max(y0, 0), min(x1, W), min(y1, H)
+        if cx0 >= cx1 or cy0 >= cy1:
+            return
+
+        m = mask[cy0 - y0 : cy1 - y0, cx0 - x0 : cx1 - x0]
+        region = buf[cy0:cy1, cx0:cx1]
+        out = region.astype(np.int32)
+        ink_arr = np.asarray(ink[: out.shape[2]], dtype=np.int32)
+
+        if out.shape[2] == 4:
+            # 颜色通道：目标像素完全透明时直接取墨色（对应 PIL fill_mask_L 的 alpha 处理）
+            cm = np.where((m != 0) & (out[..., 3] == 0), 255, m)[..., None]
+            out[..., :3] = _div255(out[..., :3] * (255 - cm) + ink_arr[:3] * cm)
+            out[..., 3] = _div255(out[..., 3] * (255 - m) + ink_arr[3] * m)
+        else:
+            m3 = m[..., None]
+            out = _div255(out * (255 - m3) + ink_arr * m3)
+        region[...] = out
+
+
+def fill_rectangle(buf: np.ndarray, box, fill):
+    """等价于 ImageDraw.rectangle(box, fill=fill)（RGBA 图上不做混合，直接覆盖，含右/下边界）"""
+    x0, y0, x1, y1 = (int(v) for v in box)
+    H, W = buf.shape[:2]
+    x0, y0 = max(x0, 0), max(y0, 0)
+    x1, y1 = min(x1, W - 1), min(y1, H - 1)
+    if x0 > x1 or y0 > y1:
+        return
+    buf[y0 : y1 + 1, x0 : x1 + 1] = _ink(fill)[: buf.shape[2]]
+
+
+# 全局实例
+glyph_atlas = GlyphAtlas()
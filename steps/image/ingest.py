@@ -0,0 +1,139 @@
+import math
+import os
+import threading
+from typing import List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+from config.config import C
+from model.models import Scene
+from util.logger import logger
+from util.utils import content_key, file_digest
+
+if hasattr(Image, "Resampling"):
+    _LANCZOS = Image.Resampling.LANCZOS
+else:
+    _LANCZOS = getattr(Image, "LANCZOS", getattr(Image, "ANTIALIAS", 1))
+
+# 预处理算法变化时递增，使旧的磁盘缓存失效
+INGEST_VERSION = 1
+
+
+def aspect_fill_size(src_size: Tuple[int, int], target_size: Tuple[int, int]) -> Tuple[int, int]:
+    """Aspect-Fill：按最大比例缩放到能覆盖目标尺寸后的大小（随后居中裁剪）"""
+    src_w, src_h = src_size
+    target_w, target_h = target_size
+    scale = max(target_w / src_w, target_h / src_h)
+    return int(src_w * scale), int(src_h * scale)
+
+
+def aspect_fill(image: Image.Image, target_size: Tuple[int, int]) -> Image.Image:
+    """缩放 + 居中裁剪到 target_size（Lanczos，一次完成）"""
+    target_w, target_h = target_size
+    new_w, new_h = aspect_fill_size(image.size, target_size)
+    x_offset = (new_w - target_w) // 2
+    y_offset = (new_h - target_h) // 2
+    if (new_w, new_h) == image.size and (x_offset, y_offset) == (0, 0):
+        return image
+    # 先按缩放比例换算出源图上的裁剪框，再用带 box 的 resize 一次完成缩放与裁剪
+    sx, sy = image.width / new_w, image.height / new_h
+    box = (
+        x_offset * sx,
+        y_offset * sy,
+        (x_offset + target_w) * sx,
+        (y_offset + target_h) * sy,
+    )
+    return image.resize((target_w, target_h), resample=_LANCZOS, box=box)
+
+
+def render_ready_size(
+    src_size: Tuple[int, int], video_size: Tuple[int, int], scale_factor: float
+) -> Tuple[int, int]:
+    """
+    渲染就绪图的尺寸：VIDEO_SIZE 乘以镜头最大放大倍率，
+    这样放大到最大时裁剪框内仍是 1:1 的源像素；源图不够大时不做无意义的放大。
+    """
+    W, H = video_size
+    # 源图 Aspect-Fill 到 VIDEO_SIZE 的缩放比例的倒数，即源图自身还能提供的细节倍数
+    native = 1.0 / max(W / src_size[0], H / src_size[1])
+    scale = max(1.0, min(scale_factor, native))
+    return int(math.ceil(W * scale)), int(math.ceil(H * scale))
+
+
+class ImageIngest:
+    """
+    图片入库：为每张场景图生成“渲染就绪”的 RGB 副本（.npy，np.load 直接读入，无需解码）。
+
+    副本已经按 VIDEO_SIZE 做好 Aspect-Fill，并预放大到镜头最大缩放的覆盖范围，
+    组装阶段只剩镜头运动本身的一次重采样。按源图内容哈希 + 目标尺寸缓存到 CACHE_DIR/ingest，重跑直接命中。
+    """
+
+    def _cache_path(self, source_path: str, size: Tuple[int, int]) -> Optional[str]:
+        if not C.ENABLE_IMAGE_INGEST or not C.CACHE_DIR:
+            return None
+        key = content_key(INGEST_VERSION, file_digest(source_path), list(size))
+        return os.path.join(C.CACHE_DIR, "ingest", f"{key}.npy")
+
+    def load(
+        self,
+        source_path: str,
+        video_size: Optional[Tuple[int, int]] = None,
+        scale_factor: Optional[float] = None,
+    ) -> np.ndarray:
+        """
+        读取渲染就绪图 (H, W, 3) uint8；缓存缺失时现场生成并写入缓存。
+
+        Args:
+            video_size: 目标分辨率，默认 C.VIDEO_SIZE
+            scale_factor: 镜头最大放大倍率，默认 C.CAMERA_MOVEMENT_INTENSITY；封面等静态画面传 1.0
+        """
+        video_size = tuple(video_size or C.VIDEO_SIZE)
+        if scale_factor is None:
+            scale_factor = C.CAMERA_MOVEMENT_INTENSITY
+
+        with Image.open(source_path) as img:
+            size = render_ready_size(img.size, video_size, scale_factor)
+            path = self._cache_path(source_path, size)
+            if path and os.path.exists(path):
+                try:
+                    return np.load(path)
+                except (OSError, ValueError) as e:
+                    logger.warning(f"⚠️ Ingest cache unreadable, rebuilding: {e}")
+            frame = np.asarray(aspect_fill(img.convert("RGB"), size))
+
+        if path:
+            self._save(path, frame)
+        return frame
+
+    def _save(self, path: str, frame: np.ndarray):
+        # 以进程 + 线程区分临时文件，分段渲染的多个进程并发写入时互不覆盖
+        part_path = f"{path}.{os.getpid()}.{threading.get_ident()}.part.npy"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            np.save(part_path, frame)
+            os.replace(part_path, path)
+        except OSError as e:
+            logger.warning(f"⚠️ Failed to write ingest cache: {e}")
+            if os.path.exists(part_path):
+                os.remove(part_path)
+
+    def ingest_scenes(self, scenes: List[Scene]) -> int:
+        """为所有场景图生成渲染就绪副本，返回处理的图片数"""
+        if not C.ENABLE_IMAGE_INGEST:
+            return 0
+        count = 0
+        for scene in scenes:
+            if not scene.image_path or not os.path.exists(scene.image_path):
+                continue
+            try:
+                self.load(scene.image_path)
+                count += 1
+            except Exception as e:
+                logger.warning(f"⚠️ Failed to ingest {scene.image_path}: {e}")
+        logger.info(f"📥 Ingested {count} render-ready images")
+        return count
+
+
+# 全局实例
+image_ingest = ImageIngest()
@@ -0,0 +1,161 @@
+import json
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+import pypinyin
+
+from config.config import C
+from steps.image.glyph import glyph_atlas
+from util.logger import logger
+
+# 磁盘缓存格式变化时递增
+PINYIN_CACHE_VERSION = 1
+
+
+@dataclass(frozen=True)
+class PinyinCell:
+    """一个“拼音 + 汉字”单元格及其预先测量好的尺寸"""
+
+    char: str
+    pinyin: str
+    w_char: int
+    h_char: int
+    w_pin: int
+    h_pin: int
+
+    @property
+    def cell_width(self) -> int:
+        return max(self.w_char, self.w_pin)
+
+
+def _split_non_hanzi(chars: str) -> List[List[str]]:
+    # 非汉字逐字符返回自身，保证读音与文本逐字对齐（pypinyin 默认会把连续非汉字合成一项）
+    return [[c] for c in chars]
+
+
+class PinyinService:
+    """
+    拼音标注服务（封面、字幕、图书布局共用）。
+
+    - readings：按 (文本, 风格) 做 LRU 缓存，返回与文本逐字对齐的读音
+    - cells：在读音基础上附带字形图集测量好的汉字/拼音宽高，测量与绘制共用一次结果
+    - persist=True 的查询（封面成语标题等固定词表）额外写入 CACHE_DIR/pinyin.json，跨运行复用
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._readings = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk = None
+        self._disk_path = None
+
+    # ==================== 读音 ====================
+
+    def readings(
+        self,
+        text: str,
+        style: pypinyin.Style = pypinyin.Style.TONE,
+        persist: bool = False,
+    ) -> Tuple[str, ...]:
+        """与 text 逐字对齐的读音（非汉字为字符本身）"""
+        key = (text, int(style))
+        with self._lock:
+            result = self._readings.get(key)
+            if result is not None:
+                self._readings.move_to_end(key)
+                return result
+
+        disk = self._load_disk() if persist else None
+        disk_key = f"{int(style)}:{text}"
+        if disk is not None and disk_key in disk:
+            result = tuple(disk[disk_key])
+        else:
+            result = tuple(
+                item[0] if item else ""
+                for item in pypinyin.pinyin(text, style=style, errors=_split_non_hanzi)
+            )
+            if disk is not None:
+                disk[disk_key] = list(result)
+                self._save_disk()
+
+        with self._lock:
+            self._readings[key] = result
+            if len(self._readings) > self.max_entries:
+                self._readings.popitem(last=False)
+        return result
+
+    def cells(
+        self,
+        text: str,
+        font_hanzi,
+        font_pinyin,
+        style: pypinyin.Style = pypinyin.Style.TONE,
+        persist: bool = False,
+    ) -> List[PinyinCell]:
+        """逐字的拼音单元格（宽高等价于 textbbox 的测量结果）"""
+        readings = self.readings(text, style, persist)
+        cells = []
+        for char, p_str in zip(text, readings):
+            box_c = glyph_atlas.bbox(char, font_hanzi)
+            box_p = glyph_atlas.bbox(p_str, font_pinyin)
+            cells.append(
+                PinyinCell(
+                    char=char,
+                    pinyin=p_str,
+                    w_char=box_c[2] - box_c[0],
+                    h_char=box_c[3] - box_c[1],
+                    w_pin=box_p[2] - box_p[0],
+                    h_pin=box_p[3] - box_p[1],
+                )
+            )
+        return cells
+
+    # ==================== 磁盘缓存 ====================
+
+    def _cache_path(self) -> Optional[str]:
+        if not C.ENABLE_PINYIN_CACHE or not C.CACHE_DIR:
+            return None
+        return os.path.join(C.CACHE_DIR, "pinyin.json")
+
+    def _load_disk(self) -> Optional[dict]:
+        path = self._cache_path()
+        if path is None:
+            return None
+        if self._disk is not None and self._disk_path == path:
+            return self._disk
+
+        entries = {}
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get("version") == PINYIN_CACHE_VERSION:
+                    entries = data.get("entries", {})
+            except (OSError, ValueError) as e:
+                logger.warning(f"⚠️ Failed to read pinyin cache, rebuilding: {e}")
+        self._disk, self._disk_path = entries, path
+        return self._disk
+
+    def _save_disk(self):
+        path = self._disk_path
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(
+                    {"version": PINYIN_CACHE_VERSION, "entries": self._disk},
+                    f,
+                    ensure_ascii=False,
+                )
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"⚠️ Failed to write pinyin cache: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+
+# 全局实例
+pinyin_service = PinyinService()
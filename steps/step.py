@@ -19,6 +19,9 @@ AUDIO = "audio"
 VIDEO = "video"
 ALL = "all"
 
+# --preview 产物单独命名，避免覆盖成片
+PREVIEW_FILENAME = "preview_video.mp4"
+
 
 async def run_step_script(
     topic: str, subtitle: str = "", force: bool = False, context_topic: str = None
@@ -182,8 +185,11 @@ async def run_step_video(topic: str, subtitle: str = ""):
         ),
         category=C.CURRENT_CATEGORY,
         intro_hook=script.intro_hook,
+        output_filename=PREVIEW_FILENAME if C.PREVIEW_MODE else "final_video.mp4",
     )
-    if output_path:
+    if output_path and C.PREVIEW_MODE:
+        logger.info(f"👀 Preview available at: {output_path}")
+    elif output_path:
         logger.info(f"SUCCESS! Video available at: {output_path}")
 
         # 生成作品发布信息
@@ -1,11 +1,9 @@
 import os
 import numpy as np
-import pypinyin
-import math
 import asyncio
 import edge_tts
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import List, Optional, Tuple, Union
 from PIL import Image, ImageDraw
 
 if not hasattr(Image, "ANTIALIAS"):
@@ -24,15 +22,77 @@ from moviepy.editor import (
 from moviepy.audio.AudioClip import CompositeAudioClip
 import moviepy.audio.fx.all as afx
 import moviepy.video.fx.all as vfx
+import shutil
 import subprocess
+import threading
+import time
 
 from config.config import C
 from model.models import Scene
 from util.logger import logger
+from util.profiler import RenderProfiler
+from util.utils import content_key, file_digest
+from steps.audio.cache import tts_cache
+from steps.audio.probe import stream_info
+from steps.image.background import linear_gradient
 from steps.image.font import font_manager
+from steps.image.ingest import aspect_fill_size, image_ingest
+from steps.image.pinyin import pinyin_service
+from steps.video.brand import brand_assets
+from steps.video.camera import KenBurnsRenderer
+from steps.video.encoding import (
+    encode_renditions,
+    is_static_timeline,
+    rendition_outputs,
+    x264_params,
+)
+from steps.video.framesource import load_video_clip
+from steps.video.framestore import FrameStore
+from steps.video.mask import MASK_TRANSITIONS, MaskTransition
+from steps.video.pageflip import create_page_flip_clip
+from steps.video.segment import SegmentRenderer
+from steps.video.writer import StreamingVideoWriter
+
+# 封面绘制逻辑变化时递增，使旧的封面缓存失效
+COVER_CACHE_VERSION = 1
+
+# 品牌片尾背景渐变（上 -> 下）
+OUTRO_BG_TOP = (224, 247, 255)
+OUTRO_BG_BOTTOM = (255, 240, 245)
+
+# 品牌片尾文案
+OUTRO_THANKS_TEXT = "感谢观看"
+OUTRO_LIKE_TEXT = "记得点赞关注哦"
+OUTRO_SLOGAN_TEXT = "用智慧为孩子绘制梦想"
+OUTRO_PLATFORM_ACCOUNTS = {
+    "douyin": "抖音: @智绘童梦",
+    "xiaohongshu": "小红书: @智绘童梦",
+    "youtube": "YouTube: @SmartArtKids",
+    "general": "智绘童梦 · 陪伴成长每一刻",
+}
+
+# 脚本中的镜头动作 -> 实际运镜
+CAMERA_ACTION_MAP = {
+    "static": "static",
+    "zoom_in": "zoom_in",
+    "zoom_out": "zoom_out",
+    "pan_left": "pan_left",
+    "pan_right": "pan_right",
+    "pan_up": "pan_up",
+    "pan_down": "pan_down",
+    "follow": "pan_right",
+    "track": "pan_left",
+}
 
 
 class VideoAssemblerBase(ABC):
+    # assemble_video 开始时替换为本次渲染的剖析器；默认空操作
+    profiler = RenderProfiler(enabled=False)
+    # 整段渲染且开启 features.frame_store 时为本次渲染的中间帧库
+    frame_store = None
+    # 本次使用的编译片头（未配音时才有，分段渲染可直接拼接该片段）
+    brand_intro_path = None
+
     def __init__(self):
         pass
 
@@ -42,12 +102,27 @@ class VideoAssemblerBase(ABC):
     ) -> VideoClip:
         pass
 
+    def render_overlays(
+        self, scene: Scene, duration: float, video_size: tuple
+    ) -> List[Tuple[np.ndarray, float, float, Tuple[int, int]]]:
+        """
+        将场景的静态叠加层（字幕、文字面板等）栅格化为 RGBA 图片，
+        供不经过 moviepy 合成的渲染后端使用。
+
+        Returns:
+            list: [(rgba_array, start, end, (x, y)), ...]
+        """
+        return []
+
     def _load_visual(self, scene: Scene, duration: float) -> Optional[VideoClip]:
         if C.ENABLE_ANIMATION and scene.video_path and os.path.exists(scene.video_path):
             try:
-                v_clip = VideoFileClip(scene.video_path)
-                if v_clip.duration < duration:
-                    v_clip = vfx.loop(v_clip, duration=duration)
+                # 帧源只解码一次，循环与转场重叠区直接读缓存帧
+                v_clip = load_video_clip(scene.video_path, duration)
+                if v_clip is None:
+                    v_clip = VideoFileClip(scene.video_path)
+                    if v_clip.duration < duration:
+                        v_clip = vfx.loop(v_clip, duration=duration)
                 return v_clip.set_duration(duration)
             except Exception as e:
                 logger.traceback_and_raise(
@@ -56,33 +131,8 @@ class VideoAssemblerBase(ABC):
 
         if scene.image_path and os.path.exists(scene.image_path):
             try:
-                img_clip = ImageClip(scene.image_path)
-                # Aspect Fill: Scale to cover target size, then center crop
-                if hasattr(C, "VIDEO_SIZE"):
-                    target_w, target_h = C.VIDEO_SIZE
-                    src_w, src_h = img_clip.size
-                    # Calculate scale to cover (use max ratio)
-                    scale_w = target_w / src_w
-                    scale_h = target_h / src_h
-                    scale = max(scale_w, scale_h)
-
-                    # Calculate new dimensions after scaling
-                    new_w = int(src_w * scale)
-                    new_h = int(src_h * scale)
-
-                    # Resize with aspect fill - use newsize parameter
-                    img_clip = img_clip.resize(newsize=(new_w, new_h))
-
-                    # Center crop to exact target size
-                    if new_w != target_w or new_h != target_h:
-                        x_offset = (new_w - target_w) // 2
-                        y_offset = (new_h - target_h) // 2
-                        img_clip = img_clip.crop(
-                            x1=x_offset,
-                            y1=y_offset,
-                            x2=x_offset + target_w,
-                            y2=y_offset + target_h,
-                        )
+                # 渲染就绪图：已 Aspect-Fill 到 VIDEO_SIZE 并按镜头最大缩放预放大（按源图哈希缓存）
+                frame = image_ingest.load(scene.image_path)
 
                 # Use camera action from scene, default to 'zoom_in' or 'pan_right' etc.
                 # If parsed script has action, use it.
@@ -92,7 +142,7 @@ class VideoAssemblerBase(ABC):
                     action = "zoom_in"
 
                 return self.apply_camera_movement(
-                    img_clip, duration=duration, action=action
+                    frame, duration=duration, action=action
                 )
             except Exception as e:
                 logger.traceback_and_raise(
@@ -101,108 +151,9 @@ class VideoAssemblerBase(ABC):
                 return None
         return None
 
-    # ==================== Easing Functions ====================
-    @staticmethod
-    def _ease_in_out_cubic(t):
-        """三次缓动函数，平滑加速和减速"""
-        if t < 0.5:
-            return 4 * t * t * t
-        else:
-            return 1 - pow(-2 * t + 2, 3) / 2
-
-    @staticmethod
-    def _ease_out_quad(t):
-        """二次缓动函数，快速开始，缓慢结束"""
-        return 1 - (1 - t) * (1 - t)
-
-    @staticmethod
-    def _ease_in_out_sine(t):
-        """正弦缓动函数，非常平滑"""
-        return -(math.cos(math.pi * t) - 1) / 2
-
-    def _calculate_zoom_transform(self, w, h, progress, scale_factor, is_zoom_in):
-        """计算缩放变换参数"""
-        if is_zoom_in:
-            current_scale = 1.0 + (scale_factor - 1.0) * progress
-        else:
-            current_scale = scale_factor - (scale_factor - 1.0) * progress
-
-        crop_w = w / current_scale
-        crop_h = h / current_scale
-        x1 = (w - crop_w) / 2
-        y1 = (h - crop_h) / 2
-
-        return current_scale, x1, y1, crop_w, crop_h
-
-    def _calculate_pan_transform(self, w, h, progress, pan_scale, direction):
-        """计算平移变换参数"""
-        current_scale = pan_scale
-        crop_w = w / current_scale
-        crop_h = h / current_scale
-        max_x = w - crop_w
-        max_y = h - crop_h
-
-        if direction == "left":
-            x1 = max_x * (1 - progress)
-            y1 = max_y / 2
-        elif direction == "right":
-            x1 = max_x * progress
-            y1 = max_y / 2
-        elif direction == "up":
-            x1 = max_x / 2
-            y1 = max_y * (1 - progress)
-        elif direction == "down":
-            x1 = max_x / 2
-            y1 = max_y * progress
-        else:
-            x1 = (w - crop_w) / 2
-            y1 = (h - crop_h) / 2
-
-        return current_scale, x1, y1, crop_w, crop_h
-
-    def _calculate_combined_transform(
-        self, w, h, progress, scale_factor, pan_scale, action_parts
-    ):
-        """计算组合运动变换参数"""
-        # 解析zoom部分
-        if "zoom" in action_parts:
-            if "in" in action_parts:
-                current_scale = 1.0 + (scale_factor - 1.0) * progress
-            elif "out" in action_parts:
-                current_scale = scale_factor - (scale_factor - 1.0) * progress
-            else:
-                current_scale = pan_scale
-        else:
-            current_scale = pan_scale
-
-        crop_w = w / current_scale
-        crop_h = h / current_scale
-        max_x = w - crop_w
-        max_y = h - crop_h
-
-        # 解析pan部分
-        if "left" in action_parts:
-            x1, y1 = max_x * (1 - progress), max_y / 2
-        elif "right" in action_parts:
-            x1, y1 = max_x * progress, max_y / 2
-        elif "up" in action_parts:
-            x1, y1 = max_x / 2, max_y * (1 - progress)
-        elif "down" in action_parts:
-            x1, y1 = max_x / 2, max_y * progress
-        else:
-            x1, y1 = (w - crop_w) / 2, (h - crop_h) / 2
-
-        return current_scale, x1, y1, crop_w, crop_h
-
-    def _apply_rotation_if_enabled(self, img, rotation_angle):
-        """应用旋转效果（如果启用）"""
-        if abs(rotation_angle) > 0.01:
-            return img.rotate(rotation_angle, resample=Image.BICUBIC, expand=False)
-        return img
-
     def apply_camera_movement(
         self,
-        clip: ImageClip,
+        clip: Union[ImageClip, np.ndarray],
         duration: float,
         action: str = "zoom_in",
         scale_factor: float = None,
@@ -210,85 +161,28 @@ class VideoAssemblerBase(ABC):
         """
         应用增强的肯·伯恩斯（Ken Burns）风格镜头运动。
         支持缓动函数、组合运动和可选旋转效果。
+        源图只解码一次，逐帧轨迹预计算，渲染由 KenBurnsRenderer 完成，直接输出 VIDEO_SIZE。
         """
-        w, h = clip.size
-
-        # 从配置获取参数
-        enable_easing = getattr(C, "CAMERA_ENABLE_EASING", True)
-        enable_rotation = getattr(C, "CAMERA_ENABLE_ROTATION", False)
-        rotation_degree = getattr(C, "CAMERA_ROTATION_DEGREE", 1.5)
-
         if scale_factor is None:
             scale_factor = getattr(C, "CAMERA_MOVEMENT_INTENSITY", 1.15)
 
-        pan_scale = scale_factor
-
-        def make_frame(t):
-            raw_progress = t / duration
-            progress = (
-                self._ease_in_out_cubic(raw_progress) if enable_easing else raw_progress
-            )
-
-            rotation_angle = 0
-
-            # 根据不同的action类型调用对应的变换计算方法
-            if action == "zoom_in":
-                current_scale, x1, y1, crop_w, crop_h = self._calculate_zoom_transform(
-                    w, h, progress, scale_factor, is_zoom_in=True
-                )
-                if enable_rotation:
-                    rotation_angle = rotation_degree * progress
-
-            elif action == "zoom_out":
-                current_scale, x1, y1, crop_w, crop_h = self._calculate_zoom_transform(
-                    w, h, progress, scale_factor, is_zoom_in=False
-                )
-                if enable_rotation:
-                    rotation_angle = -rotation_degree * progress
-
-            elif action.startswith("pan_"):
-                direction = action.replace("pan_", "")
-                current_scale, x1, y1, crop_w, crop_h = self._calculate_pan_transform(
-                    w, h, progress, pan_scale, direction
-                )
-
-            elif "_" in action and not action.startswith("pan_"):
-                # 组合运动
-                action_parts = action.split("_")
-                current_scale, x1, y1, crop_w, crop_h = (
-                    self._calculate_combined_transform(
-                        w, h, progress, scale_factor, pan_scale, action_parts
-                    )
-                )
-                if enable_rotation:
-                    rotation_angle = rotation_degree * math.sin(progress * math.pi)
-            else:
-                # 静止或未知动作
-                return clip.get_frame(t)
-
-            # 渲染帧
-            frame = clip.get_frame(0)
-            img_pil = Image.fromarray(frame)
-            img_cropped = img_pil.crop((x1, y1, x1 + crop_w, y1 + crop_h))
-
-            # 应用旋转
-            if enable_rotation:
-                img_cropped = self._apply_rotation_if_enabled(
-                    img_cropped, rotation_angle
-                )
-
-            # 缩放回原始尺寸
-            if hasattr(Image, "Resampling"):
-                resample_method = Image.Resampling.LANCZOS
-            else:
-                resample_method = getattr(
-                    Image, "LANCZOS", getattr(Image, "ANTIALIAS", 1)
-                )
-
-            img_resized = img_cropped.resize((w, h), resample=resample_method)
-            return np.array(img_resized)
+        source = clip if isinstance(clip, np.ndarray) else clip.get_frame(0)
+        renderer = KenBurnsRenderer(
+            source,
+            duration=duration,
+            action=action,
+            scale_factor=scale_factor,
+            fps=C.VIDEO_FPS,
+            enable_easing=getattr(C, "CAMERA_ENABLE_EASING", True),
+            enable_rotation=getattr(C, "CAMERA_ENABLE_ROTATION", False),
+            rotation_degree=getattr(C, "CAMERA_ROTATION_DEGREE", 1.5),
+            quality=getattr(C, "CAMERA_RENDER_QUALITY", "lanczos"),
+            output_size=tuple(C.VIDEO_SIZE),
+        )
 
-        return VideoClip(make_frame=make_frame, duration=duration).set_fps(24)
+        return VideoClip(make_frame=renderer.make_frame, duration=duration).set_fps(
+            C.VIDEO_FPS
+        )
 
     def create_page_flip_transition(
         self,
@@ -302,6 +196,7 @@ class VideoAssemblerBase(ABC):
         - 页面主体随翻页角度做水平收缩（模拟绕书脊旋转）
         - 页面形状做轻微透视梯形（上下边缘随翻页倾斜）
         - 增加页边高光、背后投影渐变（增强立体感）
+        - 帧序列按两页图片哈希 + 时长缓存到 CACHE_DIR/page_flip（见 steps/video/pageflip.py）
         """
         if not from_image_path or not to_image_path:
             return None
@@ -311,75 +206,14 @@ class VideoAssemblerBase(ABC):
             return None
 
         try:
-            img_page = Image.open(from_image_path).convert("RGBA")
-            img_next = Image.open(to_image_path).convert("RGBA")
-            if img_page.size != img_next.size:
-                img_next = img_next.resize(img_page.size)
-            w, h = img_page.size
-
-            # 兼容不同 PIL 版本的 resample 常量
-            if hasattr(Image, "Resampling"):
-                resample_method = Image.Resampling.LANCZOS
-            else:
-                resample_method = getattr(
-                    Image, "LANCZOS", getattr(Image, "ANTIALIAS", 1)
-                )
-
-            def make_frame(t):
-                p = 0.0 if duration <= 0 else max(0.0, min(1.0, t / duration))
-                theta = p * (math.pi / 2.0)  # 0 -> 90deg
-                cos_t = max(0.02, math.cos(theta))
-                sin_t = math.sin(theta)
-
-                # 页面可见宽度（以左侧为书脊）
-                page_w = max(1, int(w * cos_t))
-                # 透视倾斜幅度（越翻越明显）
-                skew = int(h * 0.06 * sin_t)
-
-                frame = img_next.copy()
-
-                # 右侧被翻开的区域投影（落在 next 页面上）
-                shadow_w = min(140, w - page_w)
-                if shadow_w > 0:
-                    shadow = Image.new("RGBA", (w, h), (0, 0, 0, 0))
-                    sdraw = ImageDraw.Draw(shadow)
-                    base_alpha = int(140 * sin_t)
-                    for i in range(shadow_w):
-                        a = int(base_alpha * (1 - i / shadow_w))
-                        if a <= 0:
-                            continue
-                        x = page_w + i
-                        sdraw.line([(x, 0), (x, h)], fill=(0, 0, 0, a))
-                    frame = Image.alpha_composite(frame, shadow)
-
-                # 页面主体：先水平缩放，再用梯形 mask 做“透视页形”
-                page_rect = img_page.resize(
-                    (page_w, h), resample=resample_method
-                ).copy()
-                mask = Image.new("L", (page_w, h), 0)
-                mdraw = ImageDraw.Draw(mask)
-                # 梯形：右边缘上下分别向内偏移 skew
-                mdraw.polygon(
-                    [(0, 0), (page_w, skew), (page_w, h - skew), (0, h)], fill=255
-                )
-                page_rect.putalpha(mask)
-
-                # 页边高光（右边缘一条白色渐变）
-                hl_w = min(24, page_w)
-                if hl_w > 2:
-                    highlight = Image.new("RGBA", (page_w, h), (0, 0, 0, 0))
-                    hdraw = ImageDraw.Draw(highlight)
-                    hl_alpha = int(120 * sin_t)
-                    for i in range(hl_w):
-                        a = int(hl_alpha * (1 - i / hl_w))
-                        x = page_w - 1 - i
-                        hdraw.line([(x, 0), (x, h)], fill=(255, 255, 255, a))
-                    page_rect = Image.alpha_composite(page_rect, highlight)
-
-                frame.paste(page_rect, (0, 0), page_rect)
-                return np.array(frame.convert("RGB"))
-
-            return VideoClip(make_frame=make_frame, duration=duration).set_fps(24)
+            cache_dir = C.CACHE_DIR if C.ENABLE_PAGE_FLIP_CACHE else None
+            clip = create_page_flip_clip(
+                from_image_path, to_image_path, duration, cache_dir=cache_dir
+            )
+            # 缓存按原图分辨率保存，输出尺寸不同（如预览模式）时再缩放
+            if hasattr(C, "VIDEO_SIZE") and tuple(clip.size) != tuple(C.VIDEO_SIZE):
+                clip = clip.resize(newsize=C.VIDEO_SIZE)
+            return clip
         except Exception as e:
             logger.traceback_and_raise(
                 Exception(f"Failed to create page flip transition: {e}")
@@ -390,30 +224,18 @@ class VideoAssemblerBase(ABC):
         """
         Apply a Circle Open transition (iris in) effect to the START of the clip.
         """
-        w, h = clip.w, clip.h
-        # Calculate max radius to cover screen
-        max_r = (w**2 + h**2) ** 0.5 / 2 * 1.2
-
-        def make_mask_frame(t):
-            # If t > duration, fully transparent mask (white) = fully visible
-            if t >= duration:
-                return np.ones((h, w), dtype=float)
-
-            progress = t / duration
-            # Ease out
-            progress = 1 - (1 - progress) ** 2
-            r = int(max_r * progress)
-
-            mask_img = Image.new("L", (w, h), 0)
-            draw = ImageDraw.Draw(mask_img)
-            cx, cy = w // 2, h // 2
-            draw.ellipse((cx - r, cy - r, cx + r, cy + r), fill=255)
-
-            return np.array(mask_img) / 255.0
+        return self.apply_mask_transition(clip, duration, shape="circle")
 
+    def apply_mask_transition(
+        self, clip: VideoClip, duration: float = 1.0, shape: str = "circle"
+    ) -> VideoClip:
+        """
+        在片段开头应用遮罩入场转场（circle / diamond / rect / wipe_*，见 steps/video/mask.py）。
+        """
+        mask = MaskTransition(clip.w, clip.h, duration, shape=shape)
         # Create mask clip with same duration as content
         mask_clip = VideoClip(
-            make_frame=make_mask_frame, ismask=True, duration=clip.duration
+            make_frame=mask.make_frame, ismask=True, duration=clip.duration
         )
         return clip.set_mask(mask_clip)
 
@@ -427,6 +249,25 @@ class VideoAssemblerBase(ABC):
     # 品牌片头已与 Hook Voice 合并：当开启 enable_hook_voice 且有文案时，
     # 将使用 assets/image/brand_intro.png 作为片头画面并播放引导语音。
 
+    def _outro_canvas_size(self) -> Tuple[int, int]:
+        """片尾按绝对像素排版：预览时按原始分辨率合成再整体缩小，缓存素材与成片共用"""
+        if C.PREVIEW_MODE and C.PREVIEW_SOURCE_SIZE:
+            return tuple(C.PREVIEW_SOURCE_SIZE)
+        return tuple(C.VIDEO_SIZE)
+
+    def _outro_text_key(self, platform: str = "general") -> str:
+        """片尾文字图层的内容键：文案 + 实际使用的字体文件 + 画布宽度"""
+        font_path = font_manager.resolve_path("chinese")
+        return content_key(
+            OUTRO_THANKS_TEXT,
+            OUTRO_LIKE_TEXT,
+            OUTRO_PLATFORM_ACCOUNTS.get(platform, OUTRO_PLATFORM_ACCOUNTS["general"]),
+            OUTRO_SLOGAN_TEXT,
+            font_path,
+            file_digest(font_path),
+            self._outro_canvas_size()[0],
+        )
+
     def create_brand_outro(self, duration: float = 4.0, platform: str = "general"):
         try:
             # Modified to use existing asset
@@ -436,26 +277,21 @@ class VideoAssemblerBase(ABC):
                 logger.warning(f"⚠️ Brand Outro Skipped: Logo not found at {logo_path}")
                 return None
 
-            width, height = C.VIDEO_SIZE
+            width, height = self._outro_canvas_size()
 
             # Use separate brand dir for generated cache to avoid polluting assets
             brand_dir = os.path.join(C.OUTPUT_DIR, "brand_cache")
             os.makedirs(brand_dir, exist_ok=True)
 
-            bg_path = os.path.join(brand_dir, "outro_bg.png")
-            text_path = os.path.join(brand_dir, f"outro_text_{platform}.png")
-
-            if not os.path.exists(bg_path):
-                bg_img = Image.new("RGB", (width, height), (255, 255, 255))
-                draw = ImageDraw.Draw(bg_img)
-                for y in range(height):
-                    ratio = y / height
-                    r = int(224 + (255 - 224) * ratio)
-                    g = int(247 + (240 - 247) * ratio)
-                    b = int(255 + (245 - 255) * ratio)
-                    draw.line([(0, y), (width, y)], fill=(r, g, b))
-                bg_img.save(bg_path)
-            bg_clip = ImageClip(bg_path).set_duration(duration)
+            # 文案、字体或宽度变化时换文件名，不会沿用旧的文字图层
+            text_path = os.path.join(
+                brand_dir, f"outro_text_{platform}_{self._outro_text_key(platform)[:16]}.png"
+            )
+
+            # 浅蓝到浅粉的竖直渐变，按尺寸缓存在内存中
+            bg_clip = ImageClip(
+                linear_gradient((width, height), OUTRO_BG_TOP, OUTRO_BG_BOTTOM)
+            ).set_duration(duration)
 
             logo_img = ImageClip(logo_path)
             logo_scale = min(width * 0.35 / logo_img.w, height * 0.2 / logo_img.h)
@@ -467,7 +303,7 @@ class VideoAssemblerBase(ABC):
                 text_draw = ImageDraw.Draw(text_img)
 
                 font_large = font_manager.get_font("chinese", 80)
-                thanks_text = "感谢观看"
+                thanks_text = OUTRO_THANKS_TEXT
                 bbox = text_draw.textbbox((0, 0), thanks_text, font=font_large)
                 text_draw.text(
                     ((width - (bbox[2] - bbox[0])) // 2, 50),
@@ -477,7 +313,7 @@ class VideoAssemblerBase(ABC):
                 )
 
                 font_medium = font_manager.get_font("chinese", 60)
-                like_text = "记得点赞关注哦"
+                like_text = OUTRO_LIKE_TEXT
                 bbox = text_draw.textbbox((0, 0), like_text, font=font_medium)
                 text_draw.text(
                     ((width - (bbox[2] - bbox[0])) // 2, 180),
@@ -487,14 +323,8 @@ class VideoAssemblerBase(ABC):
                 )
 
                 font_small = font_manager.get_font("chinese", 45)
-                platform_accounts = {
-                    "douyin": "抖音: @智绘童梦",
-                    "xiaohongshu": "小红书: @智绘童梦",
-                    "youtube": "YouTube: @SmartArtKids",
-                    "general": "智绘童梦 · 陪伴成长每一刻",
-                }
-                account_text = platform_accounts.get(
-                    platform, platform_accounts["general"]
+                account_text = OUTRO_PLATFORM_ACCOUNTS.get(
+                    platform, OUTRO_PLATFORM_ACCOUNTS["general"]
                 )
                 bbox = text_draw.textbbox((0, 0), account_text, font=font_small)
                 text_draw.text(
@@ -504,7 +334,7 @@ class VideoAssemblerBase(ABC):
                     fill=(100, 100, 100),
                 )
 
-                slogan_text = "用智慧为孩子绘制梦想"
+                slogan_text = OUTRO_SLOGAN_TEXT
                 bbox = text_draw.textbbox((0, 0), slogan_text, font=font_small)
                 text_draw.text(
                     ((width - (bbox[2] - bbox[0])) // 2, 400),
@@ -519,6 +349,8 @@ class VideoAssemblerBase(ABC):
             )
             outro_clip = CompositeVideoClip([bg_clip, logo_clip, text_clip])
             outro_clip = outro_clip.fadein(0.5).fadeout(0.5)
+            if tuple(outro_clip.size) != tuple(C.VIDEO_SIZE):
+                outro_clip = outro_clip.resize(newsize=C.VIDEO_SIZE)
             return outro_clip
         except Exception as e:
             logger.traceback_and_raise(Exception(f"Failed to create brand outro: {e}"))
@@ -663,8 +495,6 @@ class VideoAssemblerBase(ABC):
         Synchronously generate dubbing via edge-tts python library.
         Running in a separate thread to avoid conflicting with existing event loops.
         """
-        import threading
-
         try:
             # Use defaults from Config if not provided
             used_voice = (
@@ -673,6 +503,15 @@ class VideoAssemblerBase(ABC):
             used_rate = rate if rate else "-10%"
             used_pitch = pitch if pitch else "+0Hz"
 
+            # 与旁白共用全局 TTS 缓存：同一 (文本, 音色, 语速, 音调) 不再发起 TTS 请求
+            cache_key = tts_cache.key("edge", used_voice, used_rate, used_pitch, None, text)
+            if tts_cache.fetch(cache_key, output_path):
+                return True
+            tts_cache.discard(output_path)
+
+            # 线程内的异常无法直接抛到这里，记录下来在 join 之后判断
+            errors = []
+
             def _run_in_thread():
                 async def _gen():
                     communicate = edge_tts.Communicate(
@@ -681,7 +520,10 @@ class VideoAssemblerBase(ABC):
                     await communicate.save(output_path)
 
                 # New loop for this thread
-                asyncio.run(_gen())
+                try:
+                    asyncio.run(_gen())
+                except Exception as e:
+                    errors.append(e)
 
             # Start a new thread to run the async task
             t = threading.Thread(target=_run_in_thread)
@@ -690,8 +532,16 @@ class VideoAssemblerBase(ABC):
 
             if t.is_alive():
                 logger.error("Intro Dub Generation Timed Out")
+                tts_cache.discard(output_path)
+                return False
+
+            if errors or not os.path.exists(output_path) or not os.path.getsize(output_path):
+                # 失败时可能留下空文件或被截断的 mp3，删除且不写入缓存
+                logger.warning(f"⚠️ Intro dub generation failed: {errors[0] if errors else 'empty audio'}")
+                tts_cache.discard(output_path)
                 return False
 
+            tts_cache.store(cache_key, output_path)
             return True
 
         except Exception as e:
@@ -716,38 +566,19 @@ class VideoAssemblerBase(ABC):
             font_pinyin = font_manager.get_font("chinese", pinyin_size)
             draw = ImageDraw.Draw(img)
 
-            pinyin_list = pypinyin.pinyin(title, style=pypinyin.Style.TONE)
-            char_data = []
-            total_block_width = 0
-            for i, char in enumerate(title):
-                bbox_c = draw.textbbox((0, 0), char, font=font_title)
-                w_char = bbox_c[2] - bbox_c[0]
-                h_char = bbox_c[3] - bbox_c[1]
-                p_str = pinyin_list[i][0] if i < len(pinyin_list) else ""
-                bbox_p = draw.textbbox((0, 0), p_str, font=font_pinyin)
-                w_pin = bbox_p[2] - bbox_p[0]
-                h_pin = bbox_p[3] - bbox_p[1]
-                cell_width = max(w_char, w_pin)
-                char_data.append(
-                    {
-                        "char": char,
-                        "pinyin": p_str,
-                        "w_char": w_char,
-                        "h_char": h_char,
-                        "w_pin": w_pin,
-                        "h_pin": h_pin,
-                        "cell_width": cell_width,
-                    }
-                )
-                total_block_width += cell_width + 4
+            # 标题多为成语等固定词表，拼音标注持久化缓存
+            char_data = pinyin_service.cells(
+                title, font_title, font_pinyin, persist=True
+            )
+            total_block_width = sum(d.cell_width + 4 for d in char_data)
             if total_block_width > 0:
                 total_block_width -= 4
 
             max_h_char = (
-                max([d["h_char"] for d in char_data]) if char_data else title_size
+                max([d.h_char for d in char_data]) if char_data else title_size
             )
             max_h_pin = (
-                max([d["h_pin"] for d in char_data]) if char_data else pinyin_size
+                max([d.h_pin for d in char_data]) if char_data else pinyin_size
             )
             total_block_height = max_h_pin + spacing + max_h_char
 
@@ -777,23 +608,23 @@ class VideoAssemblerBase(ABC):
             y_hanzi_baseline = start_y + max_h_pin + spacing
 
             for item in char_data:
-                x_pin = current_x + (item["cell_width"] - item["w_pin"]) / 2
+                x_pin = current_x + (item.cell_width - item.w_pin) / 2
                 draw.text(
                     (x_pin, y_pinyin_baseline),
-                    item["pinyin"],
+                    item.pinyin,
                     font=font_pinyin,
                     fill=(200, 200, 200, 255),
                 )
-                x_char = current_x + (item["cell_width"] - item["w_char"]) / 2
+                x_char = current_x + (item.cell_width - item.w_char) / 2
                 draw.text(
                     (x_char, y_hanzi_baseline),
-                    item["char"],
+                    item.char,
                     font=font_title,
                     fill=(255, 255, 255, 255),
                     stroke_width=2,
                     stroke_fill=(0, 0, 0, 50),
                 )
-                current_x += item["cell_width"] + 4
+                current_x += item.cell_width + 4
 
             if subtitle:
                 font_sub = font_manager.get_font("chinese", int(title_size * 0.45))
@@ -834,92 +665,149 @@ class VideoAssemblerBase(ABC):
             trans_duration, padding = 0.8, -0.8
         elif trans_type == "crossfade_slow":
             trans_duration, padding = 1.5, -1.5
-        elif trans_type == "circle_open":
+        elif trans_type in MASK_TRANSITIONS:
             trans_duration, padding = 1.2, -1.0
         elif trans_type == "page_turn":
             trans_duration, padding = 0.8, 0.0
 
         return trans_type, trans_duration, padding
 
-    def _generate_cover_clip(self, scenes: List[Scene], topic: str, subtitle: str):
-        """生成封面 clip"""
+    def _prepare_cover_assets(self, scenes: List[Scene], topic: str, subtitle: str):
+        """
+        准备封面图片与封面朗读音频
+
+        Returns:
+            tuple: (cover_path, cover_audio_path, duration)；没有封面时 cover_path 为 None，
+            没有朗读音频时 cover_audio_path 为 None
+        """
         cover_path = os.path.join(C.OUTPUT_DIR, "cover.png")
+        base_image = next(
+            (
+                s.image_path
+                for s in scenes
+                if s.image_path and os.path.exists(s.image_path)
+            ),
+            None,
+        )
 
-        if not os.path.exists(cover_path):
-            logger.info("Generating Video Cover in Assembly Phase...")
-            base_image = next(
-                (
-                    s.image_path
-                    for s in scenes
-                    if s.image_path and os.path.exists(s.image_path)
+        if base_image:
+            title = topic or "Untitled"
+            # 底图、标题、副标题、字体或分辨率任一变化都会换键，旧封面不会残留
+            cache_path = self._cover_cache_path(
+                "cover",
+                content_key(
+                    COVER_CACHE_VERSION,
+                    file_digest(base_image),
+                    title,
+                    subtitle,
+                    font_manager.resolve_path("chinese"),
+                    font_manager.resolve_path("english"),
+                    list(C.VIDEO_SIZE),
                 ),
-                None,
+                ".png",
             )
+            if cache_path and os.path.exists(cache_path):
+                shutil.copyfile(cache_path, cover_path)
+                logger.debug("🗃️ Cover cache hit")
+            else:
+                logger.info("Generating Video Cover in Assembly Phase...")
+                with self.profiler.stage("cover.image"):
+                    generated = self.generate_cover(
+                        image_path=base_image,
+                        title=title,
+                        output_path=cover_path,
+                        subtitle=subtitle,
+                    )
+                if generated and cache_path:
+                    self._store_cover_cache(cover_path, cache_path)
+        elif not os.path.exists(cover_path):
+            logger.warning("No scene image available for cover generation.")
 
-            if base_image:
-                self.generate_cover(
-                    image_path=base_image,
-                    title=topic or "Untitled",
-                    output_path=cover_path,
-                    subtitle=subtitle,
+        if not os.path.exists(cover_path):
+            return None, None, 0.0
+
+        # 🔥 添加封面朗读音频
+        duration = 2.5
+        cover_audio_path = None
+        if topic:
+            audio_path = os.path.join(C.OUTPUT_DIR, "cover_title.mp3")
+            logger.info(f"🎤 生成封面朗读: {topic}")
+            with self.profiler.stage("cover.tts"):
+                dubbed = self._generate_intro_dub_sync(
+                    text=topic,
+                    output_path=audio_path,
+                    # 使用旁白音色或默认音色
+                    voice=None,
                 )
-            else:
-                logger.warning("No scene image available for cover generation.")
+            if dubbed and os.path.exists(audio_path):
+                audio_duration = self._probe_audio_duration(audio_path)
+                # 确保封面时长至少为2.5秒，或音频时长+0.5秒缓冲
+                duration = max(2.5, audio_duration + 0.5)
+                logger.info(
+                    f"   封面朗读时长: {audio_duration:.2f}s -> 封面总时长: {duration:.2f}s"
+                )
+                cover_audio_path = audio_path
+
+        return cover_path, cover_audio_path, duration
+
+    def _cover_cache_path(self, kind: str, key: str, ext: str) -> Optional[str]:
+        """封面产物在 CACHE_DIR/<kind> 下的缓存路径；缓存关闭时返回 None"""
+        if not C.ENABLE_COVER_CACHE or not C.CACHE_DIR:
+            return None
+        return os.path.join(C.CACHE_DIR, kind, f"{key}{ext}")
+
+    def _store_cover_cache(self, src_path: str, cache_path: str):
+        # 以进程 + 线程区分临时文件，写完后原子替换
+        part_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.part"
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            shutil.copyfile(src_path, part_path)
+            os.replace(part_path, cache_path)
+        except OSError as e:
+            logger.warning(f"⚠️ Failed to write cover cache: {e}")
+            if os.path.exists(part_path):
+                os.remove(part_path)
+
+    def _probe_audio_duration(self, audio_path: str) -> float:
+        """读取音频时长（秒）：只读文件头，与 AudioFileClip 的 duration 一致"""
+        info = stream_info(audio_path)
+        if info and info["duration"] is not None:
+            return info["duration"]
+        audio_clip = AudioFileClip(audio_path)
+        try:
+            return audio_clip.duration
+        finally:
+            audio_clip.close()
+
+    def _scene_audio_duration(self, scene: Scene) -> float:
+        """场景旁白时长：优先用音频步骤记入 script.json 的元数据，缺失时读取文件头"""
+        if not scene.duration_seconds or scene.duration_seconds <= 0:
+            scene.duration_seconds = self._probe_audio_duration(scene.audio_path)
+        return scene.duration_seconds
+
+    def _generate_cover_clip(self, scenes: List[Scene], topic: str, subtitle: str):
+        """生成封面 clip"""
+        cover_path, cover_audio_path, duration = self._prepare_cover_assets(
+            scenes, topic, subtitle
+        )
+        return self._build_cover_clip(cover_path, cover_audio_path, duration)
 
-        if os.path.exists(cover_path):
+    def _build_cover_clip(
+        self, cover_path: Optional[str], cover_audio_path: Optional[str], duration: float
+    ):
+        """由已准备好的封面素材构建封面 clip"""
+        if cover_path:
             try:
-                cover_clip = ImageClip(cover_path)
-
-                # 🔥 关键修复：确保封面也缩放到 VIDEO_SIZE
-                if hasattr(C, "VIDEO_SIZE"):
-                    target_w, target_h = C.VIDEO_SIZE
-                    curr_w, curr_h = cover_clip.size
-
-                    if curr_w != target_w or curr_h != target_h:
-                        logger.info(
-                            f"📐 封面缩放: {curr_w}x{curr_h} -> {target_w}x{target_h}"
-                        )
-
-                        # Aspect Fill
-                        scale = max(target_w / curr_w, target_h / curr_h)
-                        new_w, new_h = int(curr_w * scale), int(curr_h * scale)
-
-                        cover_clip = cover_clip.resize(newsize=(new_w, new_h))
-
-                        # Center crop
-                        if new_w != target_w or new_h != target_h:
-                            cover_clip = cover_clip.crop(
-                                x_center=new_w / 2,
-                                y_center=new_h / 2,
-                                width=target_w,
-                                height=target_h,
-                            )
-
-                # 🔥 添加封面朗读音频
-                duration = 2.5
-                if topic:
-                    cover_audio_path = os.path.join(C.OUTPUT_DIR, "cover_title.mp3")
-                    logger.info(f"🎤 生成封面朗读: {topic}")
-                    if self._generate_intro_dub_sync(
-                        text=topic,
-                        output_path=cover_audio_path,
-                        # 使用旁白音色或默认音色
-                        voice=None,
-                    ):
-                        if os.path.exists(cover_audio_path):
-                            audio_clip = AudioFileClip(cover_audio_path)
-
-                            # 确保封面时长至少为2.5秒，或音频时长+0.5秒缓冲
-                            duration = max(2.5, audio_clip.duration + 0.5)
-                            logger.info(
-                                f"   封面朗读时长: {audio_clip.duration:.2f}s -> 封面总时长: {duration:.2f}s"
-                            )
-
-                            # Padding audio using CompositeAudioClip to avoid duration mismatch errors
-                            padded_audio = CompositeAudioClip(
-                                [audio_clip.set_start(0)]
-                            ).set_duration(duration)
-                            cover_clip = cover_clip.set_audio(padded_audio)
+                # 封面走图片入库缓存：一次性 Aspect-Fill 到 VIDEO_SIZE（静态画面不需要预放大）
+                cover_clip = ImageClip(image_ingest.load(cover_path, scale_factor=1.0))
+
+                if cover_audio_path:
+                    audio_clip = AudioFileClip(cover_audio_path)
+                    # Padding audio using CompositeAudioClip to avoid duration mismatch errors
+                    padded_audio = CompositeAudioClip(
+                        [audio_clip.set_start(0)]
+                    ).set_duration(duration)
+                    cover_clip = cover_clip.set_audio(padded_audio)
 
                 return cover_clip.set_duration(duration).fadein(0.5).fadeout(0.5)
             except Exception as e:
@@ -935,16 +823,15 @@ class VideoAssemblerBase(ABC):
         加载场景的音频和视觉资源
 
         Returns:
-            tuple: (audio_clip, visual_clip, duration) 或 (None, None, None) 如果失败
+            tuple: (audio_path, visual_clip, duration) 或 (None, None, None) 如果失败
         """
         try:
             # 解析运镜动作
             raw_action = getattr(scene, "camera_action", "zoom_in")
             scene.camera_action = action_map.get(raw_action, "zoom_in")
 
-            # 加载音频并计算时长
-            audio_clip = AudioFileClip(scene.audio_path).fx(afx.audio_fadeout, 0.05)
-            duration = audio_clip.duration + 0.5  # audio_padding
+            # 时长来自场景元数据，这里不打开音频；解码器在 _sync_audio_video 挂音轨时才创建
+            duration = self._scene_audio_duration(scene) + 0.5  # audio_padding
             if padding < 0 and i > 0:
                 duration += abs(padding)
 
@@ -958,19 +845,24 @@ class VideoAssemblerBase(ABC):
                 return None, None, None
 
             logger.debug(f"   ✅ Scene {i}: Visual loaded: {visual_clip.size}")
-            return audio_clip, visual_clip, duration
+            return scene.audio_path, visual_clip, duration
 
         except Exception as e:
             logger.exception(f"Failed to load assets for scene {scene.scene_id}")
             return None, None, None
 
-    def _sync_audio_video(self, visual_clip, audio_clip, duration):
+    def _sync_audio_video(self, visual_clip, audio_path, duration):
         """
         同步音频和视频，设置duration
 
         Returns:
-            合成后的visual_clip
+            合成后的visual_clip；音频无法打开时为 None
         """
+        try:
+            audio_clip = AudioFileClip(audio_path).fx(afx.audio_fadeout, 0.05)
+        except Exception:
+            logger.exception(f"Failed to open scene audio {audio_path}")
+            return None
         padded_audio = CompositeAudioClip([audio_clip.set_start(0)]).set_duration(
             duration
         )
@@ -1013,8 +905,10 @@ class VideoAssemblerBase(ABC):
 
         # 重叠转场效果
         if padding < 0 and i > 0:
-            if trans_type == "circle_open":
-                visual_clip = self.apply_circle_open(visual_clip, abs(padding))
+            if trans_type in MASK_TRANSITIONS:
+                visual_clip = self.apply_mask_transition(
+                    visual_clip, abs(padding), MASK_TRANSITIONS[trans_type]
+                )
             elif trans_type.startswith("crossfade"):
                 visual_clip = visual_clip.crossfadein(abs(padding))
 
@@ -1027,8 +921,14 @@ class VideoAssemblerBase(ABC):
         trans_type: str,
         trans_duration: float,
         padding: float,
+        labels: Optional[List[str]] = None,
     ):
-        """批量处理场景，返回 clips 列表"""
+        """
+        批量处理场景，返回 clips 列表
+
+        Args:
+            labels: 传入时按 clips 顺序追加每个 clip 所属场景的名称（供剖析器归属编码耗时）
+        """
         clips = []
         prev_scene_node = None
 
@@ -1036,37 +936,23 @@ class VideoAssemblerBase(ABC):
             if not scene.audio_path:
                 continue
             try:
-                # 1. 加载资源（使用辅助方法）
-                audio_clip, visual_clip, duration = self._load_scene_assets(
-                    scene, action_map, i, padding
-                )
-                if not visual_clip:
+                label = f"scene {scene.scene_id}"
+                with self.profiler.stage("scenes", scene=label):
+                    scene_clips = self._build_scene_clips(
+                        scene,
+                        i,
+                        prev_scene_node,
+                        action_map,
+                        trans_type,
+                        trans_duration,
+                        padding,
+                    )
+                if not scene_clips:
                     continue
 
-                # 2. 同步音视频（使用辅助方法）
-                visual_clip = self._sync_audio_video(visual_clip, audio_clip, duration)
-
-                # 合成场景（添加字幕等）
-                narration_cn_log = getattr(scene, "narration_cn", "") or "N/A"
-                logger.info(
-                    f"🎨 正在合成场景 {scene.scene_id}，narration='{scene.narration[:30]}...', narration_cn='{narration_cn_log[:20]}...'"
-                )
-                visual_clip = self._compose_scene(scene, visual_clip, duration)
-                logger.info(f"   ✅ 场景 {scene.scene_id} 合成完成")
-
-                # 4. 应用转场（使用辅助方法）
-                visual_clip = self._apply_transition(
-                    clips,
-                    visual_clip,
-                    prev_scene_node,
-                    scene,
-                    i,
-                    trans_type,
-                    trans_duration,
-                    padding,
-                )
-
-                clips.append(visual_clip)
+                clips.extend(scene_clips)
+                if labels is not None:
+                    labels.extend([label] * len(scene_clips))
                 prev_scene_node = scene
 
             except Exception as e:
@@ -1076,6 +962,69 @@ class VideoAssemblerBase(ABC):
 
         return clips
 
+    def _build_scene_clips(
+        self,
+        scene: Scene,
+        i: int,
+        prev_scene: Optional[Scene],
+        action_map: dict,
+        trans_type: str,
+        trans_duration: float,
+        padding: float,
+    ) -> List[VideoClip]:
+        """
+        构建单个场景的 clips
+
+        Returns:
+            list: [翻书转场 clip（可选）, 场景 clip]；资源加载失败时为空列表
+        """
+        clips = []
+
+        # 1. 加载资源（使用辅助方法）
+        with self.profiler.stage("scene.load_visual"):
+            audio_path, visual_clip, duration = self._load_scene_assets(
+                scene, action_map, i, padding
+            )
+        if not visual_clip:
+            return clips
+
+        # 2. 同步音视频（使用辅助方法）
+        visual_clip = self._sync_audio_video(visual_clip, audio_path, duration)
+        if not visual_clip:
+            return clips
+
+        # 合成场景（添加字幕等）
+        narration_cn_log = getattr(scene, "narration_cn", "") or "N/A"
+        logger.info(
+            f"🎨 正在合成场景 {scene.scene_id}，narration='{scene.narration[:30]}...', narration_cn='{narration_cn_log[:20]}...'"
+        )
+        with self.profiler.stage("scene.compose"):
+            visual_clip = self._compose_scene(scene, visual_clip, duration)
+        logger.info(f"   ✅ 场景 {scene.scene_id} 合成完成")
+
+        # 3. 写入中间帧库（可选），之后转场与编码都从内存映射取帧
+        if self.frame_store is not None:
+            with self.profiler.stage("scene.frame_store"):
+                stored = self.frame_store.put(f"scene_{scene.scene_id}", visual_clip)
+            if stored is not None:
+                visual_clip = stored
+
+        # 4. 应用转场（使用辅助方法）
+        with self.profiler.stage("scene.transition"):
+            visual_clip = self._apply_transition(
+                clips,
+                visual_clip,
+                prev_scene,
+                scene,
+                i,
+                trans_type,
+                trans_duration,
+                padding,
+            )
+
+        clips.append(visual_clip)
+        return clips
+
     def _add_brand_outro(self, clips: List):
         """添加品牌片尾"""
         if not C.ENABLE_BRAND_OUTRO:
@@ -1093,37 +1042,68 @@ class VideoAssemblerBase(ABC):
 
     def _add_custom_intro(self, main_clip, intro_hook: str, bgm_start_time: float):
         """添加自定义片头视频，返回 (final_clip, new_bgm_start_time)"""
-        if not C.ENABLE_CUSTOM_INTRO:
+        intro_clip = self._load_custom_intro(intro_hook)
+        if not intro_clip:
+            return main_clip, bgm_start_time
+
+        try:
+            # 应用转场
+            final_clip, bgm_offset = self._apply_intro_transition(intro_clip, main_clip)
+
+            return final_clip, bgm_start_time + bgm_offset
+
+        except Exception as e:
+            logger.traceback_and_raise(
+                Exception(f"Failed to add custom intro video: {e}")
+            )
             return main_clip, bgm_start_time
 
+    def _load_custom_intro(self, intro_hook: str):
+        """加载自定义片头（已配音并缩放到目标尺寸），未启用或文件不存在时返回 None"""
+        if not C.ENABLE_CUSTOM_INTRO:
+            return None
+
         intro_path = self._resolve_intro_path()
         if not intro_path or not os.path.exists(intro_path):
             if intro_path:
                 logger.warning(
                     f"Custom intro enabled but file not found at {intro_path}"
                 )
-            return main_clip, bgm_start_time
+            return None
 
         try:
             logger.debug(f"Adding custom intro video from {intro_path}")
-            intro_clip = VideoFileClip(intro_path)
+            compiled_path = self._compile_intro(intro_path)
+            if compiled_path:
+                # 编译片头已缩放到目标尺寸，下面的缩放不再逐帧执行
+                intro_clip = VideoFileClip(compiled_path, audio=False)
+                audio_path = brand_assets.intro_audio_path(compiled_path)
+                if os.path.exists(audio_path):
+                    intro_clip = intro_clip.set_audio(AudioFileClip(audio_path))
+            else:
+                intro_clip = VideoFileClip(intro_path)
 
             # 添加配音
-            intro_clip = self._add_intro_dubbing(intro_clip, intro_hook)
+            dubbed_clip = self._add_intro_dubbing(intro_clip, intro_hook)
+            self.brand_intro_path = compiled_path if dubbed_clip is intro_clip else None
+            intro_clip = dubbed_clip
 
             # 缩放到目标尺寸
-            intro_clip = self._resize_intro_to_target(intro_clip)
-
-            # 应用转场
-            final_clip, bgm_offset = self._apply_intro_transition(intro_clip, main_clip)
-
-            return final_clip, bgm_start_time + bgm_offset
+            return self._resize_intro_to_target(intro_clip)
 
         except Exception as e:
             logger.traceback_and_raise(
                 Exception(f"Failed to add custom intro video: {e}")
             )
-            return main_clip, bgm_start_time
+            return None
+
+    def _compile_intro(self, intro_path: str) -> Optional[str]:
+        """编译（或命中缓存的）片头片段，失败时回退到源文件"""
+        try:
+            return brand_assets.intro(self, intro_path)
+        except Exception as e:
+            logger.warning(f"⚠️ Brand intro compile failed, using source video: {e}")
+            return None
 
     def _resolve_intro_path(self):
         """解析片头视频路径"""
@@ -1323,13 +1303,11 @@ class VideoAssemblerBase(ABC):
             return intro_clip
 
         # Aspect Fill: 缩放后裁剪
-        ratio_w, ratio_h = target_w / w, target_h / h
-        scale = max(ratio_w, ratio_h)
-        new_w, new_h = int(w * scale), int(h * scale)
+        new_w, new_h = aspect_fill_size((w, h), (target_w, target_h))
 
-        logger.debug(f"🎬 片头视频缩放: {w}x{h} -> {new_w}x{new_h} (scale={scale:.3f})")
+        logger.debug(f"🎬 片头视频缩放: {w}x{h} -> {new_w}x{new_h}")
 
-        if scale != 1.0:
+        if (new_w, new_h) != (w, h):
             intro_clip = intro_clip.resize(newsize=(new_w, new_h))
 
         # Center crop
@@ -1351,12 +1329,7 @@ class VideoAssemblerBase(ABC):
         )
 
         if intro_trans == "crossfade" and intro_trans_dur > 0:
-            # 延长片头：添加定格帧
-            last_frame_t = max(0, intro_clip.duration - 0.1)
-            last_frame_img = intro_clip.get_frame(last_frame_t)
-            freeze_clip = ImageClip(last_frame_img).set_duration(intro_trans_dur)
-
-            intro_extended = concatenate_videoclips([intro_clip, freeze_clip])
+            intro_extended = self._extend_intro_with_freeze(intro_clip, intro_trans_dur)
             main_clip = main_clip.crossfadein(intro_trans_dur)
 
             final_clip = concatenate_videoclips(
@@ -1371,19 +1344,42 @@ class VideoAssemblerBase(ABC):
                 [intro_clip, main_clip], method="compose", padding=0
             ), intro_clip.duration
 
+    def _extend_intro_with_freeze(self, intro_clip, duration: float):
+        """延长片头：在末尾添加定格帧，供主视频在其上叠化"""
+        last_frame_t = max(0, intro_clip.duration - 0.1)
+        last_frame_img = intro_clip.get_frame(last_frame_t)
+        freeze_clip = ImageClip(last_frame_img).set_duration(duration)
+        return concatenate_videoclips([intro_clip, freeze_clip])
+
     def _mix_background_music(self, final_clip, category: str, bgm_start_time: float):
         """混合背景音乐"""
+        bgm_clip = self._create_bgm_track(
+            category, final_clip.duration, bgm_start_time
+        )
+        if not bgm_clip:
+            return final_clip
+
+        original_audio = final_clip.audio
+        final_audio = (
+            CompositeAudioClip([original_audio, bgm_clip]) if original_audio else bgm_clip
+        )
+        return final_clip.set_audio(final_audio)
+
+    def _create_bgm_track(
+        self, category: str, total_duration: float, bgm_start_time: float
+    ):
+        """生成已循环、淡出并定位好的 BGM 音轨，无 BGM 时返回 None"""
         bgm_file = self._resolve_bgm_file(category)
         if not bgm_file:
-            return final_clip
+            return None
 
         try:
             bgm_clip = AudioFileClip(bgm_file)
-            bgm_duration = max(0, final_clip.duration - bgm_start_time)
+            bgm_duration = max(0, total_duration - bgm_start_time)
 
             logger.debug(f"🎶 BGM Logic: File={bgm_file}")
             logger.debug(
-                f"   Start Time={bgm_start_time:.2f}s, Final Duration={final_clip.duration:.2f}s, BGM Duration={bgm_duration:.2f}s"
+                f"   Start Time={bgm_start_time:.2f}s, Final Duration={total_duration:.2f}s, BGM Duration={bgm_duration:.2f}s"
             )
 
             if bgm_duration > 0:
@@ -1393,23 +1389,15 @@ class VideoAssemblerBase(ABC):
                     .volumex(0.15)
                     .set_start(bgm_start_time)
                 )
-
-                original_audio = final_clip.audio
-                final_audio = (
-                    CompositeAudioClip([original_audio, bgm_clip])
-                    if original_audio
-                    else bgm_clip
-                )
-
-                final_clip = final_clip.set_audio(final_audio)
                 logger.debug("   ✅ BGM mixed successfully.")
-            else:
-                logger.warning("   ⚠️ BGM duration <= 0, skipping mix.")
+                return bgm_clip
+
+            logger.warning("   ⚠️ BGM duration <= 0, skipping mix.")
 
         except Exception as e:
             logger.traceback_and_raise(Exception(f"Failed to mix BGM: {e}"))
 
-        return final_clip
+        return None
 
     def _resolve_bgm_file(self, category: str):
         """解析背景音乐文件路径"""
@@ -1446,32 +1434,46 @@ class VideoAssemblerBase(ABC):
         7. 混合 BGM
         8. 输出视频文件
         """
+        self.profiler = RenderProfiler(enabled=C.ENABLE_RENDER_PROFILE)
+
+        if C.ENABLE_SEGMENT_RENDER:
+            try:
+                output_path = SegmentRenderer(self).render(
+                    scenes,
+                    output_filename=output_filename,
+                    topic=topic,
+                    subtitle=subtitle,
+                    category=category,
+                    intro_hook=intro_hook,
+                )
+                self._save_render_profile(output_path)
+                return output_path
+            except Exception as e:
+                logger.exception(f"Segment render failed: {e}")
+                logger.warning("⚠️ 分段渲染失败，回退到整段渲染")
+                self.profiler = RenderProfiler(enabled=C.ENABLE_RENDER_PROFILE)
+
         logger.info("Assembling video clips...")
 
+        if C.ENABLE_FRAME_STORE:
+            self.frame_store = FrameStore(
+                C.FRAME_STORE_DIR or os.path.join(C.OUTPUT_DIR, "frames"), C.VIDEO_FPS
+            )
+
         # 1. 设置转场配置
         trans_type, trans_duration, padding = self._setup_transition_config(category)
 
         # 2. 生成封面
-        clips = []
-        cover_clip = self._generate_cover_clip(scenes, topic, subtitle)
+        clips, labels = [], []
+        with self.profiler.stage("cover"):
+            cover_clip = self._generate_cover_clip(scenes, topic, subtitle)
         if cover_clip:
             clips.append(cover_clip)
+            labels.append("cover")
 
         # 3. 处理所有场景
-        action_map = {
-            "static": "static",
-            "zoom_in": "zoom_in",
-            "zoom_out": "zoom_out",
-            "pan_left": "pan_left",
-            "pan_right": "pan_right",
-            "pan_up": "pan_up",
-            "pan_down": "pan_down",
-            "follow": "pan_right",
-            "track": "pan_left",
-        }
-
         scene_clips = self._process_scenes(
-            scenes, action_map, trans_type, trans_duration, padding
+            scenes, CAMERA_ACTION_MAP, trans_type, trans_duration, padding, labels
         )
         clips.extend(scene_clips)
 
@@ -1480,24 +1482,128 @@ class VideoAssemblerBase(ABC):
             return None
 
         # 4. 添加品牌片尾
-        self._add_brand_outro(clips)
+        with self.profiler.stage("outro"):
+            self._add_brand_outro(clips)
+        labels.extend(["outro"] * (len(clips) - len(labels)))
 
         # 5. 合并场景 clips 为主视频
-        main_clip = concatenate_videoclips(clips, method="compose", padding=padding)
+        with self.profiler.stage("concatenate"):
+            main_clip = concatenate_videoclips(
+                clips, method="compose", padding=padding
+            )
 
         # 6. 添加片头视频
         bgm_start_time = 0.0
-        final_clip, bgm_start_time = self._add_custom_intro(
-            main_clip, intro_hook, bgm_start_time
-        )
+        with self.profiler.stage("intro"):
+            final_clip, bgm_start_time = self._add_custom_intro(
+                main_clip, intro_hook, bgm_start_time
+            )
 
         # 7. 混合背景音乐
-        final_clip = self._mix_background_music(final_clip, category, bgm_start_time)
+        with self.profiler.stage("bgm"):
+            final_clip = self._mix_background_music(
+                final_clip, category, bgm_start_time
+            )
+
+        # 主视频位于成片末尾（片头在前），据此把编码阶段的取帧耗时归属到各场景
+        offset = final_clip.duration - main_clip.duration
+        windows = [
+            (label, offset + c.start, offset + c.end)
+            for label, c in zip(labels, main_clip.clips)
+        ]
+        if offset > 0:
+            windows.insert(0, ("intro", 0.0, offset))
+        self.profiler.set_timeline(windows)
 
         # 8. 输出视频文件
         output_path = os.path.join(C.OUTPUT_DIR, output_filename)
-        final_clip.write_videofile(
-            output_path, fps=24, codec="libx264", audio_codec="aac"
+        # 片头/图生视频素材由 VideoFileClip 顺序解码，不能被多个线程同时取帧
+        thread_safe = bgm_start_time == 0 and not any(
+            C.ENABLE_ANIMATION and s.video_path and os.path.exists(s.video_path)
+            for s in scenes
         )
+        static = is_static_timeline(scenes, has_video_source=not thread_safe)
+        with self.profiler.stage("encode"):
+            self._write_video(
+                final_clip, output_path, thread_safe=thread_safe, static=static
+            )
         logger.info(f"Video saved to {output_path}")
+        self._save_render_profile(output_path)
         return output_path
+
+    def _save_render_profile(self, output_path: Optional[str]):
+        """把剖析报告写到成片旁：final_video.mp4 -> render_profile.json，其它 -> <名称>_render_profile.json"""
+        if not output_path:
+            return
+        stem = os.path.splitext(os.path.basename(output_path))[0]
+        name = (
+            "render_profile.json"
+            if stem == "final_video"
+            else f"{stem}_render_profile.json"
+        )
+        self.profiler.save(
+            os.path.join(os.path.dirname(output_path), name), output_path
+        )
+
+    def _write_video(
+        self, final_clip, output_path: str, thread_safe: bool = False, static: bool = False
+    ):
+        """
+        编码输出视频：默认走流式写入器，渲染与编码并行。
+
+        编码参数取 features.encoding 档位（static 为纯静态画面时间轴，tune=auto 时使用 stillimage）；
+        配置了额外输出时与成片共用同一帧流一次编码写出。
+        """
+        size = tuple(final_clip.size)
+        params = x264_params(C.VIDEO_FPS, static)
+        renditions = rendition_outputs(output_path, size, C.VIDEO_FPS, static)
+        if not C.ENABLE_STREAM_WRITER:
+            final_clip.write_videofile(
+                output_path,
+                fps=C.VIDEO_FPS,
+                codec="libx264",
+                audio_codec="aac",
+                preset=C.VIDEO_PRESET,
+                ffmpeg_params=params,
+            )
+            # write_videofile 只能写一路，额外输出从成片转出（不再重新渲染帧）
+            with self.profiler.stage("encode.renditions"):
+                encode_renditions(output_path, renditions, size)
+            return
+
+        audio_path = None
+        if final_clip.audio is not None:
+            audio_path = f"{os.path.splitext(output_path)[0]}_TEMP_audio.m4a"
+            with self.profiler.stage("encode.audio"):
+                final_clip.audio.write_audiofile(
+                    audio_path, fps=44100, codec="aac", logger=None
+                )
+
+        writer = StreamingVideoWriter(
+            output_path,
+            final_clip.size,
+            fps=C.VIDEO_FPS,
+            threads=C.STREAM_WRITER_THREADS if thread_safe else 1,
+            ring_size=C.STREAM_WRITER_RING_SIZE,
+            preset=C.VIDEO_PRESET,
+            audio_path=audio_path,
+            ffmpeg_params=params,
+            extra_outputs=renditions,
+        )
+        step = 1.0 / C.VIDEO_FPS
+        n_frames = len(np.arange(0, final_clip.duration, step))
+
+        def frame_fn(i):
+            t = i * step
+            t0 = time.perf_counter()
+            frame = final_clip.get_frame(t)
+            self.profiler.record_frame(t, time.perf_counter() - t0)
+            return frame
+
+        try:
+            self.profiler.extra["writer"] = writer.write(frame_fn, n_frames)
+            for out in renditions:
+                logger.info(f"🎬 Rendition {out.name} saved to {out.path}")
+        finally:
+            if audio_path and os.path.exists(audio_path):
+                os.remove(audio_path)
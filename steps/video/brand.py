@@ -0,0 +1,175 @@
+import math
+import os
+import threading
+from typing import Optional
+
+from moviepy.editor import VideoFileClip
+
+from config.config import C
+from steps.video.encoding import x264_params
+from steps.video.writer import StreamingVideoWriter
+from util.logger import logger
+from util.utils import content_key, file_digest
+
+AUDIO_FPS = 44100
+
+# 片头/片尾的编译逻辑变化时递增，使旧缓存失效
+BRAND_CACHE_VERSION = 1
+
+
+def frame_count(duration: float, fps: int) -> int:
+    """按帧网格覆盖 duration 所需的帧数（与分段渲染的帧数分配一致）"""
+    return max(1, int(math.ceil(duration * fps - 1e-6)))
+
+
+class BrandAssetCompiler:
+    """
+    品牌素材编译器：片尾按平台、片头按 VIDEO_SIZE 只渲染编码一次，缓存为 CACHE_DIR/brand 下的片段。
+
+    片段的分辨率、帧率与 x264 参数和成片一致：分段渲染时，只含片头或片尾的时间窗口直接用缓存片段
+    参与 -c copy 拼接，不再渲染和重新编码；其它路径读取已缩放好的片头，不再逐帧缩放裁剪。
+    缓存键包含素材内容哈希与编码参数，同一类目的上百个视频共用同一份片段。
+    """
+
+    def _cache_path(self, kind: str, key: str, n_frames: int) -> Optional[str]:
+        if not C.ENABLE_BRAND_CACHE or not C.CACHE_DIR:
+            return None
+        # 文件名带上帧数，拼接前据此核对与时间窗口是否一致
+        return os.path.join(C.CACHE_DIR, "brand", f"{kind}_{key}_{n_frames}.mp4")
+
+    def _encode_key(self, static: bool = False) -> list:
+        fps = C.VIDEO_FPS
+        return [
+            list(C.VIDEO_SIZE),
+            fps,
+            C.VIDEO_PRESET,
+            x264_params(fps, static),
+            C.PREVIEW_MODE,
+            C.PREVIEW_SOURCE_SIZE,
+        ]
+
+    def compiled_frames(self, path: str) -> Optional[int]:
+        """编译产物的帧数；不是编译产物时返回 None"""
+        brand_dir = os.path.join(C.CACHE_DIR or "", "brand")
+        if not path or os.path.dirname(os.path.abspath(path)) != os.path.abspath(brand_dir):
+            return None
+        try:
+            return int(os.path.splitext(os.path.basename(path))[0].rsplit("_", 1)[1])
+        except (IndexError, ValueError):
+            return None
+
+    # ==================== 片尾 ====================
+
+    def outro(
+        self,
+        assembler,
+        n_frames: int,
+        duration: float = 4.0,
+        platform: str = "general",
+        static: bool = False,
+    ) -> Optional[str]:
+        """
+        编码 n_frames 帧的品牌片尾（第 i 帧取 min(i / fps, duration) 时刻，与分段渲染一致），返回片段路径。
+        缓存关闭或没有 logo 时返回 None。
+        """
+        logo_path = os.path.join(C.ASSETS_DIR, "image", "logo.png")
+        if not os.path.exists(logo_path):
+            return None
+        key = content_key(
+            BRAND_CACHE_VERSION,
+            "outro",
+            platform,
+            round(duration, 6),
+            file_digest(logo_path),
+            assembler._outro_text_key(platform),
+            self._encode_key(static),
+        )
+        path = self._cache_path("outro", key, n_frames)
+        if path is None or os.path.exists(path):
+            return path
+
+        clip = assembler.create_brand_outro(duration=duration, platform=platform)
+        if clip is None:
+            return None
+        try:
+            fps = C.VIDEO_FPS
+            last_t = max(0.0, duration - 1e-3)
+            self._encode(
+                path,
+                lambda i: clip.get_frame(min(i / fps, last_t)),
+                n_frames,
+                static=static,
+            )
+        finally:
+            clip.close()
+        logger.info(f"🏷️ Brand outro compiled: {platform} -> {path}")
+        return path
+
+    # ==================== 片头 ====================
+
+    def intro(self, assembler, intro_path: str) -> Optional[str]:
+        """
+        片头缩放裁剪到 VIDEO_SIZE 并按成片帧率/编码参数编码，返回（不含音轨的）片段路径；
+        原音轨存为同名 .m4a（见 intro_audio_path）。缓存关闭时返回 None。
+        """
+        key = content_key(
+            BRAND_CACHE_VERSION, "intro", file_digest(intro_path), self._encode_key()
+        )
+        source = VideoFileClip(intro_path)
+        try:
+            fps = C.VIDEO_FPS
+            n_frames = frame_count(source.duration, fps)
+            path = self._cache_path("intro", key, n_frames)
+            if path is None or os.path.exists(path):
+                return path
+
+            clip = assembler._resize_intro_to_target(source)
+            # 音轨单独存放：参与 -c copy 拼接的片段只能有视频流
+            if clip.audio is not None:
+                audio_path = self.intro_audio_path(path)
+                part_path = f"{os.path.splitext(path)[0]}.{os.getpid()}.{threading.get_ident()}.part.m4a"
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                try:
+                    clip.audio.set_duration(n_frames / fps).write_audiofile(
+                        part_path, fps=AUDIO_FPS, codec="aac", logger=None
+                    )
+                    os.replace(part_path, audio_path)
+                finally:
+                    if os.path.exists(part_path):
+                        os.remove(part_path)
+            last_t = max(0.0, clip.duration - 1e-3)
+            # 视频文件最后落盘，它存在即表示音轨也已写好
+            self._encode(path, lambda i: clip.get_frame(min(i / fps, last_t)), n_frames)
+        finally:
+            source.close()
+        logger.info(f"🏷️ Brand intro compiled: {intro_path} -> {path}")
+        return path
+
+    def intro_audio_path(self, path: str) -> str:
+        """编译片头对应的音轨文件（源片头没有音轨时不存在）"""
+        return f"{os.path.splitext(path)[0]}.m4a"
+
+    # ==================== 编码 ====================
+
+    def _encode(self, path, frame_fn, n_frames, static=False):
+        # 先写临时文件再原子替换，中断或并发编译时不会留下不完整的片段
+        part_path = f"{os.path.splitext(path)[0]}.{os.getpid()}.{threading.get_ident()}.part.mp4"
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        writer = StreamingVideoWriter(
+            part_path,
+            tuple(C.VIDEO_SIZE),
+            fps=C.VIDEO_FPS,
+            ring_size=C.STREAM_WRITER_RING_SIZE,
+            preset=C.VIDEO_PRESET,
+            ffmpeg_params=x264_params(C.VIDEO_FPS, static),
+        )
+        try:
+            writer.write(frame_fn, n_frames)
+            os.replace(part_path, path)
+        finally:
+            if os.path.exists(part_path):
+                os.remove(part_path)
+
+
+# 全局实例
+brand_assets = BrandAssetCompiler()
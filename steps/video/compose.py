@@ -0,0 +1,126 @@
+from typing import List, Optional, Tuple
+
+import numpy as np
+from moviepy.editor import CompositeVideoClip, ImageClip, VideoClip
+
+
+def _end(clip) -> Optional[float]:
+    return clip.end if clip.end is not None else clip.duration
+
+
+def _static_offset(clip, size) -> Optional[Tuple[int, int]]:
+    """clip 的整数贴图位置（与 blit_on 的换算一致）；位置随时间变化时返回 None"""
+    if clip.relative_pos:
+        return None
+    w, h = size
+    ci_w, ci_h = clip.size
+    offsets = []
+    for t in (0, clip.duration or 0):
+        pos = clip.pos(t)
+        if isinstance(pos, str):
+            pos = {
+                "center": ["center", "center"],
+                "left": ["left", "center"],
+                "right": ["right", "center"],
+                "top": ["center", "top"],
+                "bottom": ["center", "bottom"],
+            }[pos]
+        x, y = pos
+        if isinstance(x, str):
+            x = {"left": 0, "center": (w - ci_w) / 2, "right": w - ci_w}[x]
+        if isinstance(y, str):
+            y = {"top": 0, "center": (h - ci_h) / 2, "bottom": h - ci_h}[y]
+        offsets.append((int(x), int(y)))
+    return offsets[0] if offsets[0] == offsets[1] else None
+
+
+def covers_frame(clip, size, end: Optional[float] = None) -> bool:
+    """
+    不透明且铺满画面的图层（其下方图层完全不可见）。
+    指定 end 时还要求该图层从 0 持续到 end。
+    """
+    if end is not None and (clip.start > 0 or _end(clip) is None or _end(clip) < end):
+        return False
+    return (
+        clip.mask is None
+        and not clip.ismask
+        and tuple(clip.size) == tuple(size)
+        and _static_offset(clip, size) == (0, 0)
+    )
+
+
+class StaticOverlayClip(VideoClip):
+    """
+    运动底图 + 若干静态 RGBA 叠加层。
+
+    叠加层在构造时预乘（mask * rgb 与 1 - mask），并裁到 alpha 非零的行范围；
+    每帧只对该行范围做一次混合，结果与 CompositeVideoClip 的 blit 逐像素一致。
+    """
+
+    def __init__(self, base: VideoClip, overlays: List[ImageClip], size):
+        w, h = size
+        self.base = base
+        self._layers = []
+        for clip in overlays:
+            x, y = _static_offset(clip, size)
+            rgb = clip.img[..., :3]
+            mask = clip.mask.img if clip.mask is not None else np.ones(rgb.shape[:2])
+            oh, ow = rgb.shape[:2]
+            # 裁到画面内，再收紧到 alpha 非零的行/列
+            x0, y0, x1, y1 = max(0, x), max(0, y), min(w, x + ow), min(h, y + oh)
+            if x0 >= x1 or y0 >= y1:
+                continue
+            rgb = rgb[y0 - y : y1 - y, x0 - x : x1 - x]
+            mask = mask[y0 - y : y1 - y, x0 - x : x1 - x]
+            rows = np.flatnonzero(mask.any(axis=1))
+            cols = np.flatnonzero(mask.any(axis=0))
+            if rows.size == 0:
+                continue
+            r0, r1, c0, c1 = rows[0], rows[-1] + 1, cols[0], cols[-1] + 1
+            m = mask[r0:r1, c0:c1][..., None]
+            premult = 1.0 * m * rgb[r0:r1, c0:c1]
+            self._layers.append(
+                (y0 + r0, y0 + r1, x0 + c0, x0 + c1, premult, 1.0 - m)
+            )
+
+        VideoClip.__init__(self, make_frame=self._make_frame, duration=_end(base))
+        self.size = (w, h)
+        self.audio = base.audio
+        if getattr(base, "fps", None):
+            self.fps = base.fps
+
+    def _make_frame(self, t):
+        frame = np.array(self.base.get_frame(t), dtype="uint8")
+        for y0, y1, x0, x1, premult, inv in self._layers:
+            region = frame[y0:y1, x0:x1]
+            region[...] = premult + inv * region
+        return frame
+
+
+def composite_layers(clips: List[VideoClip], size) -> VideoClip:
+    """
+    合成快速路径，替代 CompositeVideoClip(clips, size=size)。
+
+    - 丢弃被不透明、铺满画面的图层完全遮挡的下层
+    - 剩余为“一个铺满的底图 + 静态 ImageClip 叠加层”时，使用预乘的 StaticOverlayClip
+    - 其它情况回退到 CompositeVideoClip
+    """
+    end = max(_end(c) or 0 for c in clips)
+    start = 0
+    for i, clip in enumerate(clips):
+        if covers_frame(clip, size, end):
+            start = i
+    kept = clips[start:]
+
+    base, overlays = kept[0], kept[1:]
+    if covers_frame(base, size, end) and all(
+        isinstance(c, ImageClip)
+        and c.audio is None
+        and c.start <= 0
+        and (_end(c) or 0) >= end
+        and (c.mask is None or isinstance(c.mask, ImageClip))
+        and _static_offset(c, size) is not None
+        for c in overlays
+    ):
+        return StaticOverlayClip(base, overlays, size)
+    return CompositeVideoClip(kept, size=size)
@@ -0,0 +1,187 @@
+import os
+import subprocess
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+from moviepy.config import get_setting
+
+from config.config import C
+from util.logger import logger
+
+
+@dataclass
+class Rendition:
+    """成片之外的一路额外输出（如平台母版之外的轻量分享版），未指定的参数沿用主档位"""
+
+    name: str
+    suffix: str = ""
+    scale: float = 1.0
+    preset: Optional[str] = None
+    crf: Optional[int] = None
+
+
+@dataclass
+class EncodeOutput:
+    """一路 x264 编码输出：文件路径、分辨率、preset 与其余编码参数"""
+
+    path: str
+    size: Tuple[int, int]
+    preset: str
+    params: List[str] = field(default_factory=list)
+    name: str = "master"
+
+
+def is_static_timeline(scenes, has_video_source: bool = False) -> bool:
+    """时间轴是否为纯静态画面：没有片头/图生视频素材，且所有场景都不做镜头运动"""
+    from steps.video.base import CAMERA_ACTION_MAP
+
+    if has_video_source:
+        return False
+    actions = [
+        CAMERA_ACTION_MAP.get(getattr(s, "camera_action", None) or "zoom_in", "zoom_in")
+        for s in scenes
+        if s.audio_path
+    ]
+    return bool(actions) and all(a == "static" for a in actions)
+
+
+def video_tune(static: bool = False) -> Optional[str]:
+    """x264 tune：auto 时纯静态时间轴用 stillimage，其余不指定"""
+    tune = (C.VIDEO_TUNE or "").strip().lower()
+    if tune == "auto":
+        return "stillimage" if static else None
+    if tune in ("", "none"):
+        return None
+    return tune
+
+
+def x264_params(fps: int, static: bool = False, crf: Optional[int] = None) -> List[str]:
+    """主档位的 x264 参数（CRF / 线程数 / tune / 关键帧间隔），preset 由调用方单独传入"""
+    params = ["-crf", str(C.VIDEO_CRF if crf is None else crf)]
+    if C.ENCODE_THREADS > 0:
+        params += ["-threads", str(C.ENCODE_THREADS)]
+    tune = video_tune(static)
+    if tune:
+        params += ["-tune", tune]
+    if C.VIDEO_KEYINT > 0:
+        params += ["-g", str(max(1, int(round(C.VIDEO_KEYINT * fps))))]
+    return params
+
+
+def load_renditions() -> List[Rendition]:
+    """features.encoding.renditions 中配置的额外输出；预览模式不输出"""
+    if C.PREVIEW_MODE:
+        return []
+    renditions = []
+    for name, options in (C.VIDEO_RENDITIONS or {}).items():
+        options = options or {}
+        renditions.append(
+            Rendition(
+                name=name,
+                suffix=options.get("suffix") or f"_{name}",
+                scale=float(options.get("scale", 1.0)),
+                preset=options.get("preset"),
+                crf=options.get("crf"),
+            )
+        )
+    return renditions
+
+
+def rendition_outputs(
+    output_path: str, size: Tuple[int, int], fps: int, static: bool = False
+) -> List[EncodeOutput]:
+    """成片之外的各路输出：final_video.mp4 -> final_video_share.mp4 等"""
+    stem, ext = os.path.splitext(output_path)
+    outputs = []
+    for r in load_renditions():
+        scale = min(1.0, max(0.1, r.scale))
+        w, h = size
+        outputs.append(
+            EncodeOutput(
+                path=f"{stem}{r.suffix}{ext}",
+                # x264 + yuv420p 要求偶数尺寸
+                size=(max(2, int(w * scale) // 2 * 2), max(2, int(h * scale) // 2 * 2)),
+                preset=r.preset or C.VIDEO_PRESET,
+                params=x264_params(fps, static, r.crf),
+                name=r.name,
+            )
+        )
+    return outputs
+
+
+def output_args(
+    outputs: List[EncodeOutput],
+    video: str,
+    size: Tuple[int, int],
+    audio: Optional[str] = None,
+    audio_codec: str = "copy",
+    common: Optional[List[str]] = None,
+    filters: Optional[List[str]] = None,
+) -> List[str]:
+    """
+    单次编码多路输出的 ffmpeg 参数：video 流 split 成多路，分辨率不同的输出各自缩放，
+    每路独立编码并写入各自的文件。
+
+    Args:
+        video: 视频流，输入流（如 "0:v"）或 filter_complex 的输出 pad 名
+        size: video 流的分辨率
+        audio: -map 的音频流（如 "1:a" 或 "[a3]"），没有音频时为 None
+        audio_codec: 音频编码，输入流可直接 copy，滤镜输出需要重新编码
+        common: 每路输出都要附加的参数（如 -r / -t）
+        filters: 调用方已有 filter_complex 时传入其滤镜列表，split/scale 追加到其中而不是单独生成
+    """
+    # 输入流（"0:v"）直接 -map，滤镜 pad 需要加方括号；滤镜链的输入两者都加方括号
+    source = video if ":" in video else f"[{video}]"
+    pads = [f"enc{i}" for i in range(len(outputs))]
+    chains = []
+    if len(outputs) > 1:
+        chains.append(f"[{video}]split={len(outputs)}" + "".join(f"[{p}]" for p in pads))
+    for i, out in enumerate(outputs):
+        src = f"[{pads[i] if len(outputs) > 1 else video}]"
+        if tuple(out.size) != tuple(size):
+            chains.append(f"{src}scale={out.size[0]}:{out.size[1]}:flags=lanczos[{pads[i]}s]")
+            pads[i] = f"{pads[i]}s"
+        elif len(outputs) == 1:
+            pads[i] = None
+    labels = [f"[{p}]" if p else source for p in pads]
+    audios = [audio] * len(outputs)
+    if audio and audio.startswith("[") and len(outputs) > 1:
+        # 滤镜输出的音频 pad 只能被引用一次
+        audios = [f"[aenc{i}]" for i in range(len(outputs))]
+        chains.append(f"{audio}asplit={len(outputs)}" + "".join(audios))
+
+    args = []
+    if chains:
+        if filters is not None:
+            filters.extend(chains)
+        else:
+            args += ["-filter_complex", ";".join(chains)]
+    for label, out_audio, out in zip(labels, audios, outputs):
+        args += ["-map", label]
+        if out_audio:
+            args += ["-map", out_audio, "-c:a", audio_codec]
+        args += ["-c:v", "libx264", "-preset", out.preset, "-pix_fmt", "yuv420p"]
+        args += out.params + (common or [])
+        args.append(out.path)
+    return args
+
+
+def encode_renditions(source_path: str, outputs: List[EncodeOutput], size: Tuple[int, int]):
+    """从已编码的成片一次解码、同时转出各路额外输出（帧流无法复用的路径使用）"""
+    if not outputs:
+        return
+    cmd = [
+        get_setting("FFMPEG_BINARY"),
+        "-y",
+        "-hide_banner",
+        "-loglevel",
+        "error",
+        "-i",
+        source_path,
+        *output_args(outputs, "0:v", size, audio="0:a?"),
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip()[-2000:])
+    for out in outputs:
+        logger.info(f"🎬 Rendition {out.name} saved to {out.path}")
@@ -2,6 +2,7 @@ from config.config import C
 from steps.video.base import VideoAssemblerBase
 from steps.video.generic import GenericVideoAssembler
 from steps.video.book import BookVideoAssembler
+from steps.video.filtergraph import FilterGraphVideoAssembler
 
 class VideoAssemblerFactory:
     @staticmethod
@@ -9,7 +10,13 @@ class VideoAssemblerFactory:
         layout_mode = "movie"
         if category in C.CATEGORY_LAYOUTS:
             layout_mode = C.CATEGORY_LAYOUTS[category]
-        
+
         if layout_mode == "book":
-            return BookVideoAssembler()
-        return GenericVideoAssembler()
+            assembler = BookVideoAssembler()
+        else:
+            assembler = GenericVideoAssembler()
+
+        render_backend = C.CATEGORY_RENDER_BACKENDS.get(category, "moviepy")
+        if render_backend == "ffmpeg":
+            return FilterGraphVideoAssembler(assembler)
+        return assembler
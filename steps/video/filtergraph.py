@@ -0,0 +1,515 @@
+import os
+import subprocess
+from typing import List, Optional
+
+import numpy as np
+from PIL import Image
+from moviepy.config import get_setting
+
+from config.config import C
+from model.models import Scene
+from util.logger import logger
+from util.profiler import RenderProfiler
+from steps.video.base import VideoAssemblerBase, CAMERA_ACTION_MAP
+from steps.video.camera import parse_camera_action
+from steps.video.encoding import (
+    EncodeOutput,
+    is_static_timeline,
+    output_args,
+    rendition_outputs,
+    x264_params,
+)
+
+# 项目转场 -> ffmpeg xfade 转场
+XFADE_TRANSITIONS = {
+    "crossfade": "fade",
+    "crossfade_slow": "fade",
+    "circle_open": "circleopen",
+    "wipe_left": "wipeleft",
+    "wipe_right": "wiperight",
+    "wipe_up": "wipeup",
+    "wipe_down": "wipedown",
+}
+
+
+def _frame_count(t: float) -> int:
+    """moviepy 在 [0, t) 内写出的帧数，与 _write_video 的 np.arange 取帧一致"""
+    return len(np.arange(0, t, 1.0 / C.VIDEO_FPS))
+
+
+class FilterGraph:
+    """ffmpeg 输入列表与 filter_complex 的构建器"""
+
+    def __init__(self):
+        self.inputs: List[List[str]] = []
+        self.filters: List[str] = []
+        self._counter = 0
+
+    def add_input(self, path: str, *options: str) -> int:
+        self.inputs.append([*options, "-i", path])
+        return len(self.inputs) - 1
+
+    def add(self, sources, chain: str, prefix: str = "v") -> str:
+        """追加一条滤镜链，返回输出 pad 名"""
+        if isinstance(sources, str):
+            sources = [sources]
+        self._counter += 1
+        out = f"{prefix}{self._counter}"
+        pads = "".join(f"[{s}]" for s in sources)
+        self.filters.append(f"{pads}{chain}[{out}]")
+        return out
+
+    def input_args(self) -> List[str]:
+        return [arg for args in self.inputs for arg in args]
+
+    def script(self) -> str:
+        return ";\n".join(self.filters)
+
+
+class FilterGraphVideoAssembler(VideoAssemblerBase):
+    """
+    ffmpeg 滤镜图渲染后端。
+
+    把静态图片场景翻译为原生 ffmpeg 滤镜图（zoompan/crop/scale 运镜、overlay 叠加预渲染字幕、
+    xfade 转场），整条视频由一个 ffmpeg 进程完成，Python 不再逐帧处理画面。
+    版式（字幕/图书排版）仍由 layout 装配器负责栅格化；遇到不支持的场景（图生视频、翻书转场）
+    或 ffmpeg 执行失败时，回退到 layout 装配器的 moviepy 渲染路径。
+    """
+
+    def __init__(self, layout: VideoAssemblerBase):
+        super().__init__()
+        self.layout = layout
+
+    def _compose_scene(self, scene: Scene, visual_clip, duration: float):
+        return self.layout._compose_scene(scene, visual_clip, duration)
+
+    def render_overlays(self, scene: Scene, duration: float, video_size: tuple):
+        return self.layout.render_overlays(scene, duration, video_size)
+
+    def assemble_video(
+        self,
+        scenes: List[Scene],
+        output_filename: str = "final_video.mp4",
+        topic: str = "",
+        subtitle: str = "",
+        category: str = "",
+        intro_hook: str = "",
+    ):
+        trans_type, _, padding = self._setup_transition_config(category)
+
+        reason = self._unsupported_reason(scenes, trans_type)
+        if reason is None:
+            try:
+                self.profiler = RenderProfiler(enabled=C.ENABLE_RENDER_PROFILE)
+                output_path = self._render_with_ffmpeg(
+                    scenes, output_filename, topic, subtitle, category, intro_hook,
+                    trans_type, padding,
+                )
+                self._save_render_profile(output_path)
+                return output_path
+            except Exception as e:
+                reason = f"ffmpeg 渲染失败：{e}"
+                logger.exception(reason)
+
+        logger.warning(f"⚠️ 滤镜图后端不可用（{reason}），回退到 moviepy 渲染")
+        return self.layout.assemble_video(
+            scenes,
+            output_filename=output_filename,
+            topic=topic,
+            subtitle=subtitle,
+            category=category,
+            intro_hook=intro_hook,
+        )
+
+    def _unsupported_reason(self, scenes: List[Scene], trans_type: str) -> Optional[str]:
+        """检查能否用滤镜图渲染，不能时返回原因"""
+        if trans_type not in ("none", *XFADE_TRANSITIONS):
+            return f"不支持的转场 {trans_type}"
+        for scene in scenes:
+            if not scene.audio_path:
+                continue
+            if C.ENABLE_ANIMATION and scene.video_path and os.path.exists(scene.video_path):
+                return f"场景 {scene.scene_id} 使用了图生视频素材"
+            if not scene.image_path or not os.path.exists(scene.image_path):
+                return f"场景 {scene.scene_id} 缺少图片"
+        return None
+
+    # ==================== 滤镜图构建 ====================
+
+    def _render_with_ffmpeg(
+        self, scenes, output_filename, topic, subtitle, category, intro_hook,
+        trans_type, padding,
+    ):
+        logger.info("Assembling video with ffmpeg filtergraph...")
+        W, H = C.VIDEO_SIZE
+        work_dir = os.path.join(C.OUTPUT_DIR, "filtergraph")
+        os.makedirs(work_dir, exist_ok=True)
+
+        graph = FilterGraph()
+        overlap = abs(padding) if padding < 0 else 0.0
+        entries = []
+
+        # 1. 封面
+        with self.profiler.stage("cover"):
+            cover_path, cover_audio_path, cover_duration = self._prepare_cover_assets(
+                scenes, topic, subtitle
+            )
+        if cover_path:
+            entries.append(
+                self._still_entry(graph, cover_path, cover_duration, cover_audio_path)
+            )
+
+        # 2. 场景
+        for i, scene in enumerate(scenes):
+            if not scene.audio_path:
+                continue
+            raw_action = getattr(scene, "camera_action", "zoom_in")
+            scene.camera_action = CAMERA_ACTION_MAP.get(raw_action, "zoom_in")
+            with self.profiler.stage("scenes", scene=f"scene {scene.scene_id}"):
+                entries.append(
+                    self._scene_entry(graph, scene, i, overlap, trans_type, work_dir)
+                )
+
+        if not entries:
+            logger.error("No clips generated. Aborting video assembly.")
+            return None
+
+        # 3. 品牌片尾
+        if C.ENABLE_BRAND_OUTRO:
+            with self.profiler.stage("outro"):
+                outro_png = self._render_outro_frame(work_dir)
+            if outro_png:
+                entries.append(self._still_entry(graph, outro_png, 4.0))
+
+        # 4. 拼接主视频
+        video, audio_parts, total = self._join_entries(graph, entries, overlap)
+
+        # 5. 片头
+        with self.profiler.stage("intro"):
+            video, audio_parts, total, bgm_start_time = self._join_intro(
+                graph, video, audio_parts, total, intro_hook, work_dir
+            )
+
+        # 6. 混音（旁白 + BGM）
+        audio = self._mix_audio(graph, audio_parts, total, category, bgm_start_time)
+
+        # 7. 执行（额外输出在同一滤镜图中 split，一次编码写出）
+        output_path = os.path.join(C.OUTPUT_DIR, output_filename)
+        size = tuple(C.VIDEO_SIZE)
+        n_frames = _frame_count(total)
+        static = is_static_timeline(scenes, has_video_source=bgm_start_time > 0)
+        outputs = [
+            EncodeOutput(
+                output_path, size, C.VIDEO_PRESET, x264_params(C.VIDEO_FPS, static)
+            )
+        ] + rendition_outputs(output_path, size, C.VIDEO_FPS, static)
+        out_args = output_args(
+            outputs,
+            video,
+            size,
+            audio=f"[{audio}]",
+            audio_codec="aac",
+            # 帧数与 _write_video 一致；-t 取整到帧末，只用来截断音轨
+            common=[
+                "-r",
+                str(C.VIDEO_FPS),
+                "-frames:v",
+                str(n_frames),
+                "-t",
+                f"{n_frames / C.VIDEO_FPS:.6f}",
+            ],
+            filters=graph.filters,
+        )
+        script_path = os.path.join(work_dir, "graph.txt")
+        with open(script_path, "w", encoding="utf-8") as f:
+            f.write(graph.script())
+
+        cmd = [
+            get_setting("FFMPEG_BINARY"),
+            "-y",
+            "-hide_banner",
+            "-loglevel",
+            "error",
+            *graph.input_args(),
+            "-filter_complex_script",
+            script_path,
+            *out_args,
+        ]
+        logger.debug(f"ffmpeg filtergraph: {len(graph.inputs)} inputs -> {script_path}")
+        with self.profiler.stage("encode"):
+            result = subprocess.run(cmd, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip()[-2000:])
+
+        logger.info(f"Video saved to {output_path}")
+        return output_path
+
+    def _normalize(self, graph: FilterGraph, label: str) -> str:
+        """统一帧率/像素格式/时间基，保证 xfade/concat 的输入一致"""
+        return graph.add(label, f"fps={C.VIDEO_FPS},format=yuv420p,setsar=1")
+
+    def _fill_chain(self, W: int, H: int) -> str:
+        """Aspect Fill：缩放覆盖后居中裁剪"""
+        return f"scale={W}:{H}:force_original_aspect_ratio=increase,crop={W}:{H}"
+
+    def _still_entry(self, graph, image_path, duration, audio_path=None):
+        """静态画面（封面/片尾），带 0.5 秒淡入淡出（拼接时按所在帧网格位置加上并统一帧率）"""
+        W, H = C.VIDEO_SIZE
+        idx = graph.add_input(
+            image_path, "-loop", "1", "-framerate", str(C.VIDEO_FPS), "-t", f"{duration:.3f}"
+        )
+        video = graph.add(f"{idx}:v", self._fill_chain(W, H))
+        audio = []
+        if audio_path:
+            a_idx = graph.add_input(audio_path)
+            audio.append(
+                (graph.add(f"{a_idx}:a", f"atrim=duration={duration:.3f}", "a"), 0.0)
+            )
+        return {
+            "video": video,
+            "duration": duration,
+            "xfade": None,
+            "fade": True,
+            "audio": audio,
+        }
+
+    def _scene_entry(self, graph, scene, i, overlap, trans_type, work_dir):
+        W, H = C.VIDEO_SIZE
+        audio_duration = self._scene_audio_duration(scene)
+        duration = audio_duration + 0.5  # audio_padding
+        if overlap > 0 and i > 0:
+            duration += overlap
+
+        video = self._camera_chain(graph, scene.image_path, scene.camera_action, duration)
+
+        # 叠加预渲染的字幕/文字图层
+        overlays = self.layout.render_overlays(scene, duration, (W, H))
+        for k, (rgba, start, end, (x, y)) in enumerate(overlays):
+            png = os.path.join(work_dir, f"overlay_{scene.scene_id}_{k}.png")
+            Image.fromarray(rgba.astype(np.uint8)).save(png)
+            o_idx = graph.add_input(png)
+            video = graph.add(
+                [video, f"{o_idx}:v"],
+                f"overlay=x={x}:y={y}:enable='between(t,{start:.3f},{end:.3f})'",
+            )
+
+        a_idx = graph.add_input(scene.audio_path)
+        audio = graph.add(
+            f"{a_idx}:a",
+            f"afade=t=out:st={max(0.0, audio_duration - 0.05):.3f}:d=0.05",
+            "a",
+        )
+
+        xfade = None
+        if overlap > 0 and i > 0:
+            xfade = XFADE_TRANSITIONS.get(trans_type)
+        return {
+            "video": self._normalize(graph, video),
+            "duration": duration,
+            "xfade": xfade,
+            "fade": False,
+            "audio": [(audio, 0.0)],
+        }
+
+    def _camera_chain(self, graph, image_path, action, duration) -> str:
+        """生成运镜滤镜链（zoompan），与 KenBurnsRenderer 的轨迹一致"""
+        W, H = C.VIDEO_SIZE
+        zoom, pan, rotation = parse_camera_action(action)
+
+        if zoom is None:
+            idx = graph.add_input(
+                image_path, "-loop", "1", "-framerate", str(C.VIDEO_FPS), "-t", f"{duration:.3f}"
+            )
+            return graph.add(f"{idx}:v", self._fill_chain(W, H))
+
+        n_frames = max(1, int(np.ceil(duration * C.VIDEO_FPS)))
+        scale_factor = getattr(C, "CAMERA_MOVEMENT_INTENSITY", 1.15)
+        # 先放大再 zoompan，减轻整数坐标带来的抖动
+        k = max(1, int(getattr(C, "FFMPEG_ZOOMPAN_UPSCALE", 2)))
+
+        p = f"(on/{n_frames})"
+        if getattr(C, "CAMERA_ENABLE_EASING", True):
+            e = f"if(lt({p},0.5),4*pow({p},3),1-pow(-2*{p}+2,3)/2)"
+        else:
+            e = p
+
+        if zoom == "in":
+            z = f"1+{scale_factor - 1.0:.6f}*{e}"
+        elif zoom == "out":
+            z = f"{scale_factor:.6f}-{scale_factor - 1.0:.6f}*{e}"
+        else:
+            z = f"{scale_factor:.6f}"
+
+        max_x, max_y = "(iw-iw/zoom)", "(ih-ih/zoom)"
+        x, y = f"{max_x}/2", f"{max_y}/2"
+        if pan == "left":
+            x = f"{max_x}*(1-{e})"
+        elif pan == "right":
+            x = f"{max_x}*{e}"
+        elif pan == "up":
+            y = f"{max_y}*(1-{e})"
+        elif pan == "down":
+            y = f"{max_y}*{e}"
+
+        idx = graph.add_input(image_path)
+        chain = (
+            f"{self._fill_chain(W * k, H * k)},"
+            f"zoompan=z='{z}':x='{x}':y='{y}':d={n_frames}:s={W}x{H}:fps={C.VIDEO_FPS},"
+            f"trim=duration={duration:.3f}"
+        )
+
+        if rotation and getattr(C, "CAMERA_ENABLE_ROTATION", False):
+            degree = getattr(C, "CAMERA_ROTATION_DEGREE", 1.5)
+            pt = f"(t/{duration:.3f})"
+            if getattr(C, "CAMERA_ENABLE_EASING", True):
+                pt = f"if(lt({pt},0.5),4*pow({pt},3),1-pow(-2*{pt}+2,3)/2)"
+            if rotation == "ramp":
+                angle = f"{degree}*{pt}"
+            elif rotation == "ramp_reverse":
+                angle = f"-{degree}*{pt}"
+            else:
+                angle = f"{degree}*sin({pt}*PI)"
+            # PIL 逆时针为正，ffmpeg rotate 顺时针为正
+            chain += f",rotate=a='-({angle})*PI/180':c=black"
+
+        return graph.add(f"{idx}:v", chain)
+
+    def _render_outro_frame(self, work_dir) -> Optional[str]:
+        """片尾画面是静态的：用 moviepy 合成一帧后交给 ffmpeg 做淡入淡出"""
+        outro_clip = self.create_brand_outro(duration=4.0)
+        if not outro_clip:
+            return None
+        png = os.path.join(work_dir, "outro.png")
+        Image.fromarray(outro_clip.get_frame(2.0).astype(np.uint8)).save(png)
+        return png
+
+    def _join_entries(self, graph, entries, overlap):
+        """
+        依次拼接各段画面，与 concatenate_videoclips(padding=-overlap) + _write_video 逐帧一致：
+        各段起点按 moviepy 的方式累加（各段时长之和再减去 段序号×overlap），成片第 i 帧取 i / fps
+        时刻，因此每段从起点之后的第一帧开始，边界取整到帧。有转场的边界用 xfade，其余边界直接切
+        （前一段尾部被后一段覆盖的部分裁掉）；总时长同样截掉最后一段尾部的 overlap。
+        """
+        fps = C.VIDEO_FPS
+        durations = [entry["duration"] for entry in entries]
+        starts = np.maximum(0, np.cumsum([0] + durations) - overlap * np.arange(len(entries) + 1))
+
+        video, audio_parts = None, []
+        for entry, start in zip(entries, starts):
+            start_frame = _frame_count(start)
+            clip = entry["video"]
+            if entry["fade"]:
+                # 首帧对应段内 start_frame / fps - start 时刻，淡入淡出按此平移
+                shift = start_frame / fps - start
+                clip = graph.add(clip, self._fade_chain(entry["duration"], shift))
+                clip = self._normalize(graph, clip)
+            if video is None:
+                video = clip
+            elif entry["xfade"]:
+                # xfade 从 offset 之后的第一帧接入后一段，进度按 (t - offset) / duration 计算
+                video = graph.add(
+                    [video, clip],
+                    f"xfade=transition={entry['xfade']}:duration={overlap:.3f}:offset={start:.6f}",
+                )
+            else:
+                video = graph.add(video, f"trim=end_frame={start_frame},setpts=PTS-STARTPTS")
+                video = graph.add([video, clip], f"concat=n=2:v=1:a=0,fps={fps}")
+            audio_parts.extend((label, start + t) for label, t in entry["audio"])
+
+        return video, audio_parts, float(starts[-1])
+
+    def _fade_chain(self, duration: float, shift: float) -> str:
+        """0.5 秒淡入淡出；shift 为首帧在段内的时刻（不足一帧），先换到微秒时间基再平移"""
+        return (
+            f"settb=AVTB,setpts=PTS+{shift:.6f}/TB,"
+            f"fade=t=in:st=0:d=0.5,fade=t=out:st={max(0.0, duration - 0.5):.3f}:d=0.5,"
+            f"setpts=PTS-STARTPTS"
+        )
+
+    def _join_intro(self, graph, video, audio_parts, total, intro_hook, work_dir):
+        """拼接自定义片头，返回 (video, audio_parts, total, bgm_start_time)"""
+        # 片头配音/缩放沿用 moviepy 逻辑，只渲染一次片头片段
+        intro_clip = self._load_custom_intro(intro_hook)
+        if not intro_clip:
+            return video, audio_parts, total, 0.0
+
+        intro_duration = intro_clip.duration
+        has_audio = intro_clip.audio is not None
+        segment_path = os.path.join(work_dir, "intro_segment.mp4")
+        intro_clip.write_videofile(
+            segment_path,
+            fps=C.VIDEO_FPS,
+            codec="libx264",
+            audio_codec="aac",
+            preset=C.VIDEO_PRESET,
+            logger=None,
+        )
+        intro_clip.close()
+
+        idx = graph.add_input(segment_path)
+        intro_video = graph.add(f"{idx}:v", f"trim=duration={intro_duration:.3f}")
+
+        intro_trans = getattr(C, "CUSTOM_INTRO_TRANSITION", "crossfade")
+        trans_dur = abs(float(getattr(C, "CUSTOM_INTRO_TRANSITION_DURATION", 0.8)))
+        if intro_trans == "crossfade" and trans_dur > 0:
+            # 片头末帧定格 trans_dur 秒，主视频在其上叠化
+            intro_video = graph.add(
+                intro_video, f"tpad=stop_mode=clone:stop_duration={trans_dur:.3f}"
+            )
+            intro_video = self._normalize(graph, intro_video)
+            video = graph.add(
+                [intro_video, video],
+                f"xfade=transition=fade:duration={trans_dur:.3f}:offset={intro_duration:.3f}",
+            )
+            # 与 concatenate_videoclips(padding=-trans_dur) 一致，总时长截掉 trans_dur
+            total -= trans_dur
+        else:
+            intro_video = self._normalize(graph, intro_video)
+            video = graph.add([intro_video, video], f"concat=n=2:v=1:a=0,fps={C.VIDEO_FPS}")
+
+        audio_parts = [(label, t + intro_duration) for label, t in audio_parts]
+        if has_audio:
+            audio_parts.insert(0, (graph.add(f"{idx}:a", "anull", "a"), 0.0))
+        return video, audio_parts, total + intro_duration, intro_duration
+
+    def _mix_audio(self, graph, audio_parts, total, category, bgm_start_time) -> str:
+        """按时间轴摆放各段音频并与 BGM 混音"""
+        placed = []
+        for label, start in audio_parts:
+            delay = int(round(start * 1000))
+            placed.append(
+                graph.add(
+                    label,
+                    f"aformat=sample_rates=44100:channel_layouts=stereo,"
+                    f"adelay={delay}|{delay}",
+                    "a",
+                )
+            )
+
+        bgm_file = self._resolve_bgm_file(category)
+        bgm_duration = max(0.0, total - bgm_start_time)
+        if bgm_file and bgm_duration > 0:
+            idx = graph.add_input(bgm_file, "-stream_loop", "-1")
+            delay = int(round(bgm_start_time * 1000))
+            placed.append(
+                graph.add(
+                    f"{idx}:a",
+                    f"atrim=duration={bgm_duration:.3f},"
+                    f"aformat=sample_rates=44100:channel_layouts=stereo,"
+                    f"afade=t=out:st={max(0.0, bgm_duration - 3.0):.3f}:d=3,"
+                    f"volume=0.15,adelay={delay}|{delay}",
+                    "a",
+                )
+            )
+
+        if not placed:
+            return graph.add(
+                [], f"anullsrc=r=44100:cl=stereo,atrim=duration={total:.3f}", "a"
+            )
+        if len(placed) == 1:
+            mixed = placed[0]
+        else:
+            mixed = graph.add(
+                placed, f"amix=inputs={len(placed)}:normalize=0:duration=longest", "a"
+            )
+        return graph.add(mixed, f"apad=whole_dur={total:.3f}", "a")
@@ -0,0 +1,128 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+import numpy as np
+from moviepy.editor import VideoClip
+from moviepy.video.io.ffmpeg_reader import FFMPEG_VideoReader
+
+from config.config import C
+from util.logger import logger
+
+
+class FrameCache:
+    """
+    进程内共享的解码帧 LRU 缓存，总字节数不超过 max_bytes（默认取 C.FRAME_CACHE_MAX_MB）。
+    所有 VideoFrameSource 共用一个预算，超出时淘汰最久未使用的帧。
+    """
+
+    def __init__(self, max_bytes: Optional[int] = None):
+        self._max_bytes = max_bytes
+        self._frames = OrderedDict()
+        self._lock = threading.Lock()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def max_bytes(self) -> int:
+        if self._max_bytes is not None:
+            return self._max_bytes
+        return int(C.FRAME_CACHE_MAX_MB * 1024 * 1024)
+
+    def get(self, key) -> Optional[np.ndarray]:
+        with self._lock:
+            frame = self._frames.get(key)
+            if frame is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._frames.move_to_end(key)
+            return frame
+
+    def put(self, key, frame: np.ndarray):
+        if frame.nbytes > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._frames:
+                return
+            self._frames[key] = frame
+            self.nbytes += frame.nbytes
+            while self.nbytes > self.max_bytes:
+                _, evicted = self._frames.popitem(last=False)
+                self.nbytes -= evicted.nbytes
+
+
+# 全局实例
+frame_cache = FrameCache()
+
+
+class VideoFrameSource:
+    """
+    图生视频片段的“只解码一次”帧源。
+
+    帧按下标存入 frame_cache；循环播放与转场重叠区再次访问同一帧时直接命中缓存，
+    不再触发 ffmpeg 重新 seek/解码。只有缓存被内存上限淘汰的帧才会重新解码。
+    """
+
+    def __init__(self, path: str, cache: Optional[FrameCache] = None):
+        self.path = path
+        self.cache = cache or frame_cache
+        self.reader = FFMPEG_VideoReader(path)
+        self.fps = self.reader.fps
+        self.size = tuple(self.reader.size)
+        self.duration = self.reader.duration
+        self.n_frames = max(1, int(self.reader.nframes))
+        self._lock = threading.Lock()
+        # 同一文件的多个帧源（如重复加载的场景）共享缓存帧
+        stat = os.stat(path)
+        self._key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+
+    def index_at(self, t: float) -> int:
+        """源视频内 t 时刻的帧下标（与 FFMPEG_VideoReader.get_frame 的取整一致）"""
+        return min(int(self.fps * t + 0.00001), self.n_frames - 1)
+
+    def frame(self, index: int) -> np.ndarray:
+        key = (self._key, index)
+        frame = self.cache.get(key)
+        if frame is not None:
+            return frame
+        with self._lock:
+            # 顺序访问时 reader 只需继续往下读，不会 seek
+            frame = self.reader.get_frame(index / self.fps)
+        frame.flags.writeable = False
+        self.cache.put(key, frame)
+        return frame
+
+    def make_frame(self, t: float) -> np.ndarray:
+        """循环播放：超出源视频时长后从头开始（与 vfx.loop 一致）"""
+        if self.duration:
+            t = t % self.duration
+        return self.frame(self.index_at(t))
+
+    def clip(self, duration: float) -> VideoClip:
+        """构造指定时长的（必要时循环的）VideoClip，不带原视频音轨；关闭片段即关闭帧源"""
+        clip = VideoClip(make_frame=self.make_frame, duration=duration).set_fps(self.fps)
+        # 与翻页缓存片段相同：片段的 close 结束底层 ffmpeg 读取进程，不等垃圾回收
+        clip.close = self.close
+        return clip
+
+    def close(self):
+        with self._lock:
+            self.reader.close()
+
+
+def load_video_clip(path: str, duration: float) -> Optional[VideoClip]:
+    """
+    以解码一次的帧源加载视频片段；帧缓存关闭（FRAME_CACHE_MAX_MB <= 0）时返回 None，
+    由调用方回退到 VideoFileClip。
+    """
+    if C.FRAME_CACHE_MAX_MB <= 0:
+        return None
+    source = VideoFrameSource(path)
+    logger.debug(
+        f"🎞️ Frame source: {path} ({source.n_frames} frames @ {source.fps}fps, "
+        f"cache {frame_cache.nbytes / 1e6:.0f}/{frame_cache.max_bytes / 1e6:.0f} MB)"
+    )
+    return source.clip(duration)
@@ -0,0 +1,165 @@
+import json
+import math
+import os
+import threading
+from typing import Optional
+
+import numpy as np
+from moviepy.editor import CompositeVideoClip, VideoClip
+
+from steps.video.compose import covers_frame
+from util.logger import logger
+
+
+def _is_opaque(clip, size) -> bool:
+    """clip 画面不透明（其 mask 可以丢弃而不改变合成结果）"""
+    if clip.mask is None:
+        return True
+    if isinstance(clip, CompositeVideoClip):
+        end = clip.duration
+        return any(covers_frame(c, size, end) for c in clip.clips)
+    return False
+
+
+class StoredFrames:
+    """
+    帧库中一个已落盘的片段：(n, H, W, 3) uint8 的 .npy 内存映射 + 同名 .json 元数据。
+
+    第 k 帧对应片段内时刻 phase + k / fps。帧步长固定，frame / frames 返回的都是内存映射上的只读视图，
+    不做拷贝；离线调试时也可以直接 np.load(path, mmap_mode="r") 查看任意帧。
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(f"{os.path.splitext(path)[0]}.json", "r", encoding="utf-8") as f:
+            self.meta = json.load(f)
+        self.fps = self.meta["fps"]
+        self.phase = self.meta.get("phase", 0.0)
+        self.duration = self.meta["duration"]
+        self.frames_mm = np.load(path, mmap_mode="r")
+
+    def __len__(self) -> int:
+        return self.frames_mm.shape[0]
+
+    def index_at(self, t: float) -> Optional[int]:
+        """t 恰好落在帧网格上时返回帧下标，否则返回 None"""
+        k = (t - self.phase) * self.fps
+        index = int(round(k))
+        if abs(k - index) > 1e-6 or not 0 <= index < len(self):
+            return None
+        return index
+
+    def frame(self, index: int) -> np.ndarray:
+        return self.frames_mm[index]
+
+    def frames(self, start: int, stop: int) -> np.ndarray:
+        """连续帧切片（转场等按范围读取时使用）"""
+        return self.frames_mm[start:stop]
+
+
+class StoredClip(VideoClip):
+    """
+    从帧库取帧的 clip，画面与 source 逐帧一致。
+
+    片段在时间轴上的起点通常不是帧间隔的整数倍，第一次取帧时才能确定编码器的采样相位，
+    因此在首次取帧时按该相位把整个片段写入帧库；之后网格上的时刻直接读内存映射，
+    不在网格上的时刻（极少见）仍由 source 现场渲染。
+    """
+
+    def __init__(self, store: "FrameStore", name: str, source: VideoClip):
+        # 不把 make_frame 交给构造函数：它会立即取第 0 帧，过早确定采样相位
+        VideoClip.__init__(self, duration=source.duration)
+        self.make_frame = self._make_frame
+        self.size = source.size
+        self.audio = source.audio
+        self.fps = store.fps
+        self.store = store
+        self.name = name
+        self.source = source
+        self.stored = None
+        self._materialized = False
+        self._lock = threading.Lock()
+
+    def _make_frame(self, t):
+        if not self._materialized:
+            with self._lock:
+                if not self._materialized:
+                    fps = self.store.fps
+                    phase = max(t - math.floor(t * fps + 1e-6) / fps, 0.0)
+                    self.stored = self.store.write(self.name, self.source, phase)
+                    self._materialized = True
+        if self.stored is not None:
+            index = self.stored.index_at(t)
+            if index is not None:
+                return self.stored.frame(index)
+        return self.source.get_frame(t)
+
+
+class FrameStore:
+    """
+    组装阶段的中间帧库（可选）：每个场景合成后的画面逐帧写入 root 下的内存映射文件，
+    转场和最终编码从映射文件取帧，不再沿 PIL/NumPy/mask 链路重复生成和拷贝。
+
+    文件按场景命名（scene_<id>.npy + scene_<id>.json），渲染结束后保留在磁盘上，
+    可离线检查任意场景的任意帧而无需重新渲染。
+    """
+
+    def __init__(self, root: str, fps: int):
+        self.root = root
+        self.fps = fps
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.root, f"{name}.npy")
+
+    def open(self, name: str) -> StoredFrames:
+        return StoredFrames(self.path(name))
+
+    def put(self, name: str, clip: VideoClip) -> Optional[VideoClip]:
+        """
+        返回从帧库取帧的等价 clip（保留原音轨），帧在首次取帧时写入。
+        clip 带有非平凡的 mask 时无法用不透明帧表示，返回 None 由调用方继续使用原 clip。
+        """
+        if not _is_opaque(clip, tuple(clip.size)):
+            logger.debug(f"🗄️ Frame store skipped {name}: clip has transparency")
+            return None
+        return StoredClip(self, name, clip)
+
+    def write(self, name: str, clip: VideoClip, phase: float = 0.0) -> Optional[StoredFrames]:
+        """渲染 clip 在 phase + k / fps 时刻的全部帧并写入帧库；写入失败时返回 None"""
+        w, h = clip.size
+        n_frames = max(1, int(np.ceil((clip.duration - phase) * self.fps - 0.00001)))
+        path = self.path(name)
+        # 以进程 + 线程区分临时文件，写完后原子替换
+        part_path = f"{path}.{os.getpid()}.{threading.get_ident()}.part.npy"
+        try:
+            os.makedirs(self.root, exist_ok=True)
+            frames = np.lib.format.open_memmap(
+                part_path, mode="w+", dtype=np.uint8, shape=(n_frames, h, w, 3)
+            )
+            for i in range(n_frames):
+                frames[i] = clip.get_frame(phase + i / self.fps)[..., :3]
+            frames.flush()
+            del frames
+            with open(f"{os.path.splitext(path)[0]}.json", "w", encoding="utf-8") as f:
+                json.dump(
+                    {
+                        "name": name,
+                        "fps": self.fps,
+                        "phase": phase,
+                        "duration": clip.duration,
+                        "size": [w, h],
+                        "n_frames": n_frames,
+                    },
+                    f,
+                    ensure_ascii=False,
+                    indent=2,
+                )
+            os.replace(part_path, path)
+        except OSError as e:
+            logger.warning(f"⚠️ Failed to write frame store {name}: {e}")
+            if os.path.exists(part_path):
+                os.remove(part_path)
+            return None
+
+        logger.debug(f"🗄️ Frame store: {name} -> {path} ({n_frames} frames)")
+        return self.open(name)
@@ -1,5 +1,4 @@
 import numpy as np
-import pypinyin
 from PIL import Image, ImageDraw
 from moviepy.editor import ImageClip, CompositeVideoClip, concatenate_videoclips
 
@@ -8,6 +7,8 @@ from model.models import Scene
 from util.logger import logger
 from steps.video.base import VideoAssemblerBase
 from steps.image.font import font_manager
+from steps.image.glyph import glyph_atlas
+from steps.image.pinyin import pinyin_service
 
 class GenericVideoAssembler(VideoAssemblerBase):
     def _compose_scene(self, scene: Scene, visual_clip, duration: float):
@@ -17,7 +18,39 @@ class GenericVideoAssembler(VideoAssemblerBase):
                 return CompositeVideoClip([visual_clip, subtitle_clip])
         return visual_clip
 
+    def render_overlays(self, scene: Scene, duration: float, video_size: tuple):
+        if not C.ENABLE_SUBTITLES:
+            return []
+        rendered = self._render_subtitle_lines(scene.narration, duration, video_size)
+        if not rendered:
+            return []
+        line_images, target_y = rendered
+        overlays = []
+        start = 0.0
+        for img_np, line_duration in line_images:
+            overlays.append((img_np, start, start + line_duration, (0, target_y)))
+            start += line_duration
+        return overlays
+
     def create_subtitle_clip(self, text: str, duration: float, video_size: tuple):
+        rendered = self._render_subtitle_lines(text, duration, video_size)
+        if not rendered:
+            return None
+        line_images, target_y = rendered
+        clips = [
+            ImageClip(img_np).set_duration(line_duration)
+            for img_np, line_duration in line_images
+        ]
+        final_clip = concatenate_videoclips(clips, method="compose")
+        return final_clip.set_position(("center", target_y))
+
+    def _render_subtitle_lines(self, text: str, duration: float, video_size: tuple):
+        """
+        栅格化带拼音的字幕行
+
+        Returns:
+            tuple: ([(rgba_array, line_duration), ...], target_y)；无字幕时返回 None
+        """
         W, H = video_size
         chars_per_line = 16
         lines = [text[i : i + chars_per_line] for i in range(0, len(text), chars_per_line)]
@@ -40,7 +73,7 @@ class GenericVideoAssembler(VideoAssemblerBase):
 
         outline_color = (0, 0, 0, 255)
         text_color = (255, 255, 255, 255)
-        clips = []
+        line_images = []
 
         for line in lines:
             line_len = len(line)
@@ -50,22 +83,8 @@ class GenericVideoAssembler(VideoAssemblerBase):
             img = Image.new("RGBA", (W, sub_height), (0, 0, 0, 0))
             draw = ImageDraw.Draw(img)
 
-            def draw_text(x, y, t, f, stroke=2):
-                draw.text((x, y), t, font=f, fill=text_color, stroke_width=stroke, stroke_fill=outline_color)
-
-            pinyin_list = pypinyin.pinyin(line, style=pypinyin.Style.TONE)
-            total_line_width = 0
-            char_data = []
-            
-            for i, char in enumerate(line):
-                bbox_c = draw.textbbox((0, 0), char, font=font_hanzi)
-                w_char = bbox_c[2] - bbox_c[0]
-                p_str = pinyin_list[i][0] if i < len(pinyin_list) else ""
-                bbox_p = draw.textbbox((0, 0), p_str, font=font_pinyin)
-                w_pin = bbox_p[2] - bbox_p[0]
-                cell_width = max(w_char, w_pin)
-                char_data.append({'char': char, 'w_char': w_char, 'p_str': p_str, 'w_pin': w_pin, 'cell_w': cell_width})
-                total_line_width += cell_width + 2
+            char_data = pinyin_service.cells(line, font_hanzi, font_pinyin)
+            total_line_width = sum(item.cell_width + 2 for item in char_data)
 
             start_x = (W - total_line_width) / 2
             current_x = start_x
@@ -88,18 +107,24 @@ class GenericVideoAssembler(VideoAssemblerBase):
                 fill=(0, 0, 0, 100),  # Semi-transparent black
             )
 
+            # 字形走图集缓存，直接混合进 NumPy 缓冲区
+            img_np = np.array(img)
+
+            def draw_text(x, y, t, f, stroke=2):
+                glyph_atlas.draw_text(
+                    img_np, (x, y), t, f, fill=text_color, stroke_width=stroke, stroke_fill=outline_color
+                )
+
             current_x = start_x
             for item in char_data:
-                x_hanzi = current_x + (item["cell_w"] - item["w_char"]) / 2
-                draw_text(x_hanzi, y_base_hanzi, item["char"], font_hanzi, stroke=3)
-                x_pin = current_x + (item["cell_w"] - item["w_pin"]) / 2
-                draw_text(x_pin, y_base_pinyin, item["p_str"], font_pinyin, stroke=2)
-                current_x += item["cell_w"] + 2
+                x_hanzi = current_x + (item.cell_width - item.w_char) / 2
+                draw_text(x_hanzi, y_base_hanzi, item.char, font_hanzi, stroke=3)
+                x_pin = current_x + (item.cell_width - item.w_pin) / 2
+                draw_text(x_pin, y_base_pinyin, item.pinyin, font_pinyin, stroke=2)
+                current_x += item.cell_width + 2
 
-            img_np = np.array(img)
-            clips.append(ImageClip(img_np).set_duration(line_duration))
+            line_images.append((img_np, line_duration))
 
-        if not clips: return None
-        final_clip = concatenate_videoclips(clips, method="compose")
+        if not line_images: return None
         target_y = int(H * 0.675 - sub_height / 2)
-        return final_clip.set_position(("center", target_y))
+        return line_images, target_y
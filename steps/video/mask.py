@@ -0,0 +1,99 @@
+import threading
+from functools import lru_cache
+from typing import Callable, Optional
+
+import numpy as np
+
+
+def _ease_out(p: float) -> float:
+    return 1 - (1 - p) ** 2
+
+
+@lru_cache(maxsize=16)
+def _distance_field(shape: str, w: int, h: int) -> np.ndarray:
+    """
+    以像素为单位的“距离场”：像素值 <= 阈值即为可见区域。
+    每种形状 + 分辨率只计算一次，结果只读共享。
+    """
+    xs = np.arange(w, dtype=np.float32)[None, :]
+    ys = np.arange(h, dtype=np.float32)[:, None]
+    cx, cy = w // 2, h // 2
+
+    if shape == "circle":
+        field = np.sqrt((xs - cx) ** 2 + (ys - cy) ** 2)
+    elif shape == "diamond":
+        field = np.abs(xs - cx) + np.abs(ys - cy)
+    elif shape == "rect":
+        # 按画面宽高比缩放，使矩形与画面同比例展开
+        field = np.maximum(np.abs(xs - cx) * (h / w), np.abs(ys - cy))
+    elif shape == "wipe_left":  # 从右向左擦入
+        field = (w - 1 - xs) + np.zeros_like(ys)
+    elif shape == "wipe_right":  # 从左向右擦入
+        field = xs + np.zeros_like(ys)
+    elif shape == "wipe_up":  # 从下向上擦入
+        field = (h - 1 - ys) + np.zeros_like(xs)
+    elif shape == "wipe_down":  # 从上向下擦入
+        field = ys + np.zeros_like(xs)
+    else:
+        raise ValueError(f"Unknown mask shape: {shape}")
+
+    field = np.ascontiguousarray(field, dtype=np.float32)
+    field.setflags(write=False)
+    return field
+
+
+# 项目转场类型 -> 遮罩形状；新增转场只需在此登记
+MASK_TRANSITIONS = {
+    "circle_open": "circle",
+    "diamond_open": "diamond",
+    "rect_open": "rect",
+    "wipe_left": "wipe_left",
+    "wipe_right": "wipe_right",
+    "wipe_up": "wipe_up",
+    "wipe_down": "wipe_down",
+}
+
+# 各形状完全展开所需的阈值（相对距离场最大值的倍数，圆形多留余量避免边角残留）
+_EXTENT_SCALE = {"circle": 1.2}
+
+
+class MaskTransition:
+    """
+    入场遮罩转场（iris / wipe）。
+
+    距离场按分辨率预计算一次，每帧只做一次比较写入复用的 float32 缓冲区；
+    转场结束后返回缓存的全 1 常量遮罩。
+    """
+
+    def __init__(
+        self,
+        w: int,
+        h: int,
+        duration: float,
+        shape: str = "circle",
+        easing: Optional[Callable[[float], float]] = _ease_out,
+    ):
+        self.w, self.h = w, h
+        self.duration = duration
+        self.easing = easing
+        self.field = _distance_field(shape, w, h)
+        self.max_extent = float(self.field.max()) * _EXTENT_SCALE.get(shape, 1.0)
+        self._full = np.ones((h, w), dtype=np.float32)
+        self._full.setflags(write=False)
+        self._local = threading.local()
+
+    def make_frame(self, t: float) -> np.ndarray:
+        if t >= self.duration:
+            return self._full
+
+        progress = max(0.0, t / self.duration)
+        if self.easing:
+            progress = self.easing(progress)
+        r = int(self.max_extent * progress)
+
+        # 缓冲区按线程复用（多线程流式写入时各生产者互不干扰）
+        buf = getattr(self._local, "buf", None)
+        if buf is None:
+            buf = self._local.buf = np.empty((self.h, self.w), dtype=np.float32)
+        np.less_equal(self.field, r, out=buf, casting="unsafe")
+        return buf
@@ -0,0 +1,185 @@
+import math
+import os
+import threading
+from typing import Optional, Union
+
+import numpy as np
+from moviepy.editor import VideoClip, VideoFileClip
+from PIL import Image
+
+from steps.video.writer import StreamingVideoWriter
+from util.logger import logger
+from util.utils import content_key, file_digest
+
+if hasattr(Image, "Resampling"):
+    _LANCZOS = Image.Resampling.LANCZOS
+else:
+    _LANCZOS = getattr(Image, "LANCZOS", getattr(Image, "ANTIALIAS", 1))
+
+# 投影/高光的最大宽度与强度
+SHADOW_MAX_W = 140
+SHADOW_MAX_ALPHA = 140
+HIGHLIGHT_MAX_W = 24
+HIGHLIGHT_MAX_ALPHA = 120
+
+# 渲染算法变化时递增，使旧的磁盘缓存失效
+PAGE_FLIP_CACHE_VERSION = 1
+PAGE_FLIP_FPS = 24
+
+
+def _ramp_alpha(width: int, max_alpha: float) -> np.ndarray:
+    """线性衰减的 alpha 渐变（与逐列画线的整数取整一致），返回 [0, 1] 的 float32"""
+    ramp = np.floor(max_alpha * (1 - np.arange(width) / width))
+    return (ramp / 255.0).astype(np.float32)
+
+
+class PageFlipRenderer:
+    """
+    “翻书/翻页”转场渲染（以左侧为书脊，右侧翻页）。
+
+    - 两页只解码一次，常驻为 float32 数组
+    - 投影/高光渐变按列计算为 NumPy ramp，整列广播做 alpha 混合
+    - 梯形页形 mask 由行列坐标比较生成，不再逐帧画多边形
+    """
+
+    def __init__(
+        self,
+        from_image: Union[str, Image.Image],
+        to_image: Union[str, Image.Image],
+        duration: float,
+    ):
+        img_page = Image.open(from_image) if isinstance(from_image, str) else from_image
+        img_next = Image.open(to_image) if isinstance(to_image, str) else to_image
+        img_page = img_page.convert("RGB")
+        img_next = img_next.convert("RGB")
+        if img_page.size != img_next.size:
+            img_next = img_next.resize(img_page.size)
+
+        self.image = img_page
+        self.w, self.h = img_page.size
+        self.duration = duration
+        self.next = np.asarray(img_next, dtype=np.float32)
+        self._rows = np.arange(self.h, dtype=np.float32)[:, None]
+
+    def render(self, t: float) -> np.ndarray:
+        w, h = self.w, self.h
+        p = 0.0 if self.duration <= 0 else max(0.0, min(1.0, t / self.duration))
+        theta = p * (math.pi / 2.0)  # 0 -> 90deg
+        cos_t = max(0.02, math.cos(theta))
+        sin_t = math.sin(theta)
+
+        # 页面可见宽度（以左侧为书脊）
+        page_w = max(1, int(w * cos_t))
+        # 透视倾斜幅度（越翻越明显）
+        skew = int(h * 0.06 * sin_t)
+
+        frame = self.next.copy()
+
+        # 右侧被翻开的区域投影（落在 next 页面上）
+        shadow_w = min(SHADOW_MAX_W, w - page_w)
+        if shadow_w > 0:
+            alpha = _ramp_alpha(shadow_w, int(SHADOW_MAX_ALPHA * sin_t))
+            frame[:, page_w : page_w + shadow_w] *= 1.0 - alpha[None, :, None]
+
+        # 页面主体：水平缩放，按梯形页形（右边缘上下分别向内偏移 skew）贴到书脊一侧
+        page = np.asarray(
+            self.image.resize((page_w, h), resample=_LANCZOS), dtype=np.float32
+        )
+        top = skew * np.arange(page_w, dtype=np.float32)[None, :] / page_w
+        inside = (self._rows >= top) & (self._rows <= h - top)
+        np.copyto(frame[:, :page_w], page, where=inside[..., None])
+
+        # 页边高光（右边缘一条白色渐变，整列覆盖）
+        hl_w = min(HIGHLIGHT_MAX_W, page_w)
+        if hl_w > 2:
+            alpha = _ramp_alpha(hl_w, int(HIGHLIGHT_MAX_ALPHA * sin_t))[::-1]
+            edge = frame[:, page_w - hl_w : page_w]
+            edge += (255.0 - edge) * alpha[None, :, None]
+
+        return np.rint(frame).astype(np.uint8)
+
+    def make_frame(self, t: float) -> np.ndarray:
+        """moviepy VideoClip 的 make_frame 回调"""
+        return self.render(t)
+
+
+def _cache_path(
+    cache_dir: str, from_image_path: str, to_image_path: str, duration: float
+) -> str:
+    """缓存文件路径：由两页图片内容哈希 + 时长决定"""
+    key = content_key(
+        PAGE_FLIP_CACHE_VERSION,
+        file_digest(from_image_path),
+        file_digest(to_image_path),
+        round(duration, 6),
+        PAGE_FLIP_FPS,
+    )
+    return os.path.join(cache_dir, "page_flip", f"{key}.mp4")
+
+
+def _locked_clip(path: str, duration: float) -> VideoClip:
+    """
+    从缓存文件构造翻页片段。VideoFileClip 的读取游标不是线程安全的，
+    这里加锁包装，使其可以和静态图片场景一起交给多线程流式写入器。
+    """
+    source = VideoFileClip(path, audio=False)
+    lock = threading.Lock()
+    last_t = max(0.0, source.duration - 1e-3)
+
+    def make_frame(t):
+        with lock:
+            return source.get_frame(min(t, last_t))
+
+    clip = VideoClip(make_frame=make_frame, duration=duration).set_fps(PAGE_FLIP_FPS)
+    # 关闭片段时一并结束读取进程，避免 ffmpeg 子进程残留到之后 fork 出的渲染进程中
+    clip.close = source.close
+    return clip
+
+
+def create_page_flip_clip(
+    from_image_path: str,
+    to_image_path: str,
+    duration: float,
+    cache_dir: Optional[str] = None,
+) -> VideoClip:
+    """
+    创建翻页转场片段。
+
+    指定 cache_dir 时，整段帧序列先渲染编码到 cache_dir/page_flip/<hash>.mp4，
+    之后同一对页面、同一时长的转场（重跑、分段渲染的各个进程）直接读取缓存文件。
+    """
+    if cache_dir:
+        path = _cache_path(cache_dir, from_image_path, to_image_path, duration)
+        # 先查缓存：命中时不解码、不准备两页图片
+        if os.path.exists(path):
+            logger.debug(f"♻️ Page flip cache hit: {os.path.basename(path)}")
+            return _locked_clip(path, duration)
+
+    renderer = PageFlipRenderer(from_image_path, to_image_path, duration)
+    if not cache_dir:
+        return VideoClip(make_frame=renderer.make_frame, duration=duration).set_fps(
+            PAGE_FLIP_FPS
+        )
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # 以进程 + 线程区分临时文件，并发渲染同一转场时互不覆盖
+    part_path = f"{path}.{os.getpid()}.{threading.get_ident()}.part.mp4"
+    n_frames = len(np.arange(0, duration, 1.0 / PAGE_FLIP_FPS))
+    try:
+        writer = StreamingVideoWriter(
+            part_path,
+            (renderer.w, renderer.h),
+            fps=PAGE_FLIP_FPS,
+            ffmpeg_params=["-crf", "12"],
+        )
+        writer.write(lambda i: renderer.render(i * (1.0 / PAGE_FLIP_FPS)), n_frames)
+        os.replace(part_path, path)
+    except Exception as e:
+        logger.warning(f"⚠️ Page flip cache write failed, rendering in memory: {e}")
+        if os.path.exists(part_path):
+            os.remove(part_path)
+        return VideoClip(make_frame=renderer.make_frame, duration=duration).set_fps(
+            PAGE_FLIP_FPS
+        )
+
+    return _locked_clip(path, duration)
@@ -0,0 +1,689 @@
+import math
+import os
+import shutil
+import subprocess
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+import moviepy.audio.fx.all as afx
+from moviepy.audio.AudioClip import CompositeAudioClip
+from moviepy.config import get_setting
+from moviepy.editor import AudioFileClip, CompositeVideoClip, VideoFileClip
+
+from config.config import C
+from model.models import Scene
+from util.logger import logger
+from util.utils import content_key, file_digest
+from steps.image.font import font_manager
+from steps.video.brand import brand_assets
+from steps.video.encoding import (
+    encode_renditions,
+    is_static_timeline,
+    rendition_outputs,
+    x264_params,
+)
+from steps.video.writer import StreamingVideoWriter
+
+AUDIO_FPS = 44100
+
+# 片段渲染逻辑变化时递增，使旧缓存失效
+SEGMENT_CACHE_VERSION = 1
+
+# 影响片段画面的配置项
+_RENDER_CONFIG_KEYS = (
+    "VIDEO_SIZE",
+    "VIDEO_FPS",
+    "VIDEO_PRESET",
+    "VIDEO_CRF",
+    "ENCODE_THREADS",
+    "VIDEO_TUNE",
+    "VIDEO_KEYINT",
+    "PREVIEW_MODE",
+    "PREVIEW_SOURCE_SIZE",
+    "ENABLE_ANIMATION",
+    "ENABLE_SUBTITLES",
+    "ENABLE_BILINGUAL_MODE",
+    "CAMERA_ENABLE_EASING",
+    "CAMERA_ENABLE_ROTATION",
+    "CAMERA_ROTATION_DEGREE",
+    "CAMERA_MOVEMENT_INTENSITY",
+    "CAMERA_RENDER_QUALITY",
+    "ENABLE_IMAGE_INGEST",
+)
+
+
+@dataclass
+class TimelineClip:
+    """
+    时间轴上的一个 clip。
+
+    kind: intro / cover / page_turn / scene / outro
+    ref:  intro -> 片头文件路径；cover -> 封面图片路径；
+          page_turn -> (前一场景下标, 当前场景下标)；scene -> 场景下标
+    """
+
+    kind: str
+    start: float
+    duration: float
+    ref: object = None
+    crossfadein: float = 0.0  # 片头叠化：主视频第一个 clip 需要额外淡入
+
+    @property
+    def end(self) -> float:
+        return self.start + self.duration
+
+
+@dataclass
+class SegmentTask:
+    """
+    交给子进程渲染的一段时间窗口：从 origin + offset 开始的 n_frames 帧。
+
+    origin 取窗口所属 clip 的起点，片段内容只取决于窗口内各 clip 的相对位置
+    与首帧偏移，与其在整条时间轴上的绝对位置无关，因此可以按内容哈希缓存。
+    """
+
+    index: int
+    origin: float
+    length: float  # 窗口的名义时长（到下一个 clip 起点）
+    offset: float  # 首帧相对 origin 的时间：clip 起点到全局帧网格下一帧的距离，不足一帧
+    n_frames: int
+    clips: List[TimelineClip]
+    output_path: str
+    assembler_cls: type
+    scenes: List[Scene]
+    trans_type: str
+    trans_duration: float
+    padding: float
+    static: bool = False  # 纯静态画面时间轴（tune=auto 时编码用 stillimage）
+    config: dict = field(default_factory=dict)
+
+
+def _build_clip(assembler, task: SegmentTask, tc: TimelineClip):
+    """在子进程中重建时间轴 clip（不含音频）"""
+    from steps.video.base import CAMERA_ACTION_MAP
+
+    if tc.kind == "intro":
+        clip = VideoFileClip(tc.ref, audio=False)
+    elif tc.kind == "cover":
+        clip = assembler._build_cover_clip(tc.ref, None, tc.duration)
+    elif tc.kind == "page_turn":
+        prev_i, i = tc.ref
+        clip = assembler.create_page_flip_transition(
+            task.scenes[prev_i].image_path,
+            task.scenes[i].image_path,
+            task.trans_duration,
+        )
+    elif tc.kind == "scene":
+        clips = assembler._build_scene_clips(
+            task.scenes[tc.ref],
+            tc.ref,
+            None,
+            CAMERA_ACTION_MAP,
+            task.trans_type,
+            task.trans_duration,
+            task.padding,
+        )
+        clip = clips[-1] if clips else None
+    elif tc.kind == "outro":
+        clip = assembler.create_brand_outro(duration=tc.duration)
+    else:
+        raise ValueError(f"Unknown timeline clip kind: {tc.kind}")
+
+    if clip is None:
+        raise RuntimeError(f"Failed to rebuild {tc.kind} clip ({tc.ref})")
+    if tc.crossfadein > 0:
+        clip = clip.crossfadein(tc.crossfadein)
+    return clip.without_audio()
+
+
+def render_segment(task: SegmentTask) -> Tuple[int, str, float]:
+    """
+    子进程入口：渲染一个片段。
+
+    片段内只重建与时间窗口相交的 clip（当前 clip 及被它叠化覆盖的前一个 clip 尾部）。
+    帧数与取帧时刻都按全局帧网格分配，拼接后逐帧与整段渲染一致。
+    """
+    start = time.perf_counter()
+    # spawn 模式下子进程会重新加载 config.yaml，这里以父进程的配置快照为准
+    if task.config:
+        C.__dict__.update(task.config)
+
+    assembler = task.assembler_cls()
+    layers = [
+        _build_clip(assembler, task, tc)
+        .set_start(tc.start - task.origin)
+        .set_position("center")
+        for tc in task.clips
+    ]
+    composite = CompositeVideoClip(layers, size=tuple(C.VIDEO_SIZE))
+
+    # 先写临时文件再改名，避免中断时留下不完整的缓存片段
+    tmp_path = f"{os.path.splitext(task.output_path)[0]}.part.mp4"
+    fps = C.VIDEO_FPS
+    writer = StreamingVideoWriter(
+        tmp_path,
+        tuple(C.VIDEO_SIZE),
+        fps,
+        ring_size=C.STREAM_WRITER_RING_SIZE,
+        preset=C.VIDEO_PRESET,
+        ffmpeg_params=x264_params(fps, task.static),
+    )
+    # 全局第 k 帧取 k / fps 时刻的画面（与 moviepy 整段写出一致），换算到窗口内的时间
+    last_t = max(0.0, task.length - 1e-3)
+    try:
+        writer.write(
+            lambda i: composite.get_frame(min(task.offset + i / fps, last_t)),
+            task.n_frames,
+        )
+    finally:
+        composite.close()
+        # CompositeVideoClip.close 不关闭子片段；图生视频帧源、片头等读取进程在这里结束
+        for layer in layers:
+            layer.close()
+    os.replace(tmp_path, task.output_path)
+
+    return task.index, task.output_path, time.perf_counter() - start
+
+
+class SegmentRenderer:
+    """
+    分段并行渲染。
+
+    1. 在父进程中规划时间轴（只探测时长，不构建画面）
+    2. 按 clip 切分时间窗口，每个窗口由 ProcessPoolExecutor 的一个子进程渲染为独立片段
+    3. 用 ffmpeg concat demuxer 无损拼接片段（-c copy）
+    4. 旁白与 BGM 单独混成一条音轨，最后一次封装进成片
+    """
+
+    def __init__(self, assembler):
+        self.assembler = assembler
+        # 本次片头对应的编译片段（片头未配音时才有）
+        self.brand_intro_path = None
+
+    def render(
+        self,
+        scenes: List[Scene],
+        output_filename: str = "final_video.mp4",
+        topic: str = "",
+        subtitle: str = "",
+        category: str = "",
+        intro_hook: str = "",
+    ) -> Optional[str]:
+        logger.info("Assembling video in segment mode...")
+        work_dir = os.path.join(C.OUTPUT_DIR, "segments")
+        os.makedirs(work_dir, exist_ok=True)
+
+        trans_type, trans_duration, padding = self.assembler._setup_transition_config(
+            category
+        )
+
+        profiler = self.assembler.profiler
+
+        # 1. 规划时间轴
+        with profiler.stage("cover"):
+            cover_path, cover_audio_path, cover_duration = (
+                self.assembler._prepare_cover_assets(scenes, topic, subtitle)
+            )
+        with profiler.stage("plan"):
+            timeline, audio_tracks, main_total = self._plan_main(
+                scenes, cover_path, cover_audio_path, cover_duration,
+                trans_type, trans_duration, padding,
+            )
+        if not timeline:
+            logger.error("No clips generated. Aborting video assembly.")
+            return None
+
+        with profiler.stage("intro"):
+            timeline, audio_tracks, total, bgm_start_time = self._plan_intro(
+                timeline, audio_tracks, main_total, intro_hook, work_dir
+            )
+
+        # 2. 并行渲染各片段
+        has_video_source = any(tc.kind == "intro" for tc in timeline) or any(
+            self._uses_video(scenes[tc.ref]) for tc in timeline if tc.kind == "scene"
+        )
+        static = is_static_timeline(scenes, has_video_source)
+        tasks = self._make_tasks(
+            timeline, total, scenes, trans_type, trans_duration, padding, work_dir
+        )
+        for task in tasks:
+            task.static = static
+        with profiler.stage("render_segments"):
+            segment_paths = self._render_tasks(
+                tasks, scenes, trans_type, trans_duration, padding
+            )
+
+        # 3. 混音
+        with profiler.stage("audio"):
+            audio_path = self._render_audio(
+                audio_tracks, total, category, bgm_start_time,
+                os.path.join(work_dir, "audio.m4a"),
+            )
+
+        # 4. 无损拼接并封装
+        output_path = os.path.join(C.OUTPUT_DIR, output_filename)
+        with profiler.stage("concat"):
+            self._concat(segment_paths, audio_path, total, output_path, work_dir)
+        # 片段已各自编码并无损拼接，额外输出从成片一次解码转出
+        with profiler.stage("renditions"):
+            encode_renditions(
+                output_path,
+                rendition_outputs(output_path, tuple(C.VIDEO_SIZE), C.VIDEO_FPS, static),
+                tuple(C.VIDEO_SIZE),
+            )
+        logger.info(f"Video saved to {output_path}")
+        return output_path
+
+    # ==================== 时间轴规划 ====================
+
+    def _plan_main(
+        self, scenes, cover_path, cover_audio_path, cover_duration,
+        trans_type, trans_duration, padding,
+    ):
+        """
+        规划主视频时间轴，与 concatenate_videoclips(method="compose", padding=padding)
+        的起止时间一致。
+
+        Returns:
+            tuple: (timeline, audio_tracks, main_total)，audio_tracks 为 [(audio_path, start, fadeout)]
+        """
+        items = []  # [(TimelineClip, audio_track or None)]
+        if cover_path:
+            items.append(
+                (
+                    TimelineClip("cover", 0.0, cover_duration, cover_path),
+                    (cover_audio_path, 0.0) if cover_audio_path else None,
+                )
+            )
+
+        prev_i = None
+        for i, scene in enumerate(scenes):
+            if not scene.audio_path:
+                continue
+            if not self._has_visual(scene):
+                logger.warning(f"   ⚠️ Scene {i}: no visual asset, skipped")
+                continue
+
+            if trans_type == "page_turn" and prev_i is not None and trans_duration > 0:
+                prev_image = scenes[prev_i].image_path
+                if (
+                    prev_image
+                    and scene.image_path
+                    and os.path.exists(prev_image)
+                    and os.path.exists(scene.image_path)
+                ):
+                    items.append(
+                        (TimelineClip("page_turn", 0.0, trans_duration, (prev_i, i)), None)
+                    )
+
+            duration = self.assembler._scene_audio_duration(scene) + 0.5
+            if padding < 0 and i > 0:
+                duration += abs(padding)
+            items.append(
+                (TimelineClip("scene", 0.0, duration, i), (scene.audio_path, 0.05))
+            )
+            prev_i = i
+
+        if not items:
+            return [], [], 0.0
+
+        if C.ENABLE_BRAND_OUTRO:
+            outro_clip = self.assembler.create_brand_outro(duration=4.0)
+            if outro_clip:
+                items.append((TimelineClip("outro", 0.0, outro_clip.duration), None))
+                outro_clip.close()
+
+        timeline, audio_tracks = [], []
+        t = 0.0
+        for k, (tc, audio) in enumerate(items):
+            tc.start = max(0.0, t + padding * k) if k else 0.0
+            t += tc.duration
+            timeline.append(tc)
+            if audio:
+                audio_tracks.append((audio[0], tc.start, audio[1]))
+        main_total = max(0.0, t + padding * len(items))
+        return timeline, audio_tracks, main_total
+
+    def _uses_video(self, scene: Scene) -> bool:
+        """场景使用图生视频素材"""
+        return bool(
+            C.ENABLE_ANIMATION and scene.video_path and os.path.exists(scene.video_path)
+        )
+
+    def _has_visual(self, scene: Scene) -> bool:
+        if self._uses_video(scene):
+            return True
+        return bool(scene.image_path and os.path.exists(scene.image_path))
+
+    def _plan_intro(self, timeline, audio_tracks, main_total, intro_hook, work_dir):
+        """片头在父进程中配音、缩放后落盘一次，子进程直接读取"""
+        intro_clip = self.assembler._load_custom_intro(intro_hook)
+        if not intro_clip:
+            return timeline, audio_tracks, main_total, 0.0
+
+        intro_duration = intro_clip.duration
+        intro_trans = getattr(C, "CUSTOM_INTRO_TRANSITION", "crossfade")
+        trans_dur = abs(float(getattr(C, "CUSTOM_INTRO_TRANSITION_DURATION", 0.8)))
+        crossfade = intro_trans == "crossfade" and trans_dur > 0
+        if crossfade:
+            intro_clip = self.assembler._extend_intro_with_freeze(intro_clip, trans_dur)
+
+        # 片头音轨单独落盘：定格帧部分不应带声音
+        intro_audio_path = None
+        if intro_clip.audio is not None:
+            intro_audio_path = os.path.join(work_dir, "intro_audio.m4a")
+            intro_clip.audio.set_duration(intro_duration).write_audiofile(
+                intro_audio_path, fps=AUDIO_FPS, codec="aac", logger=None
+            )
+
+        self.brand_intro_path = self.assembler.brand_intro_path
+        if self.brand_intro_path and not crossfade:
+            # 未配音、硬切：编译片头本身就是要拼接的画面，无需再落盘
+            intro_path = self.brand_intro_path
+        else:
+            intro_path = os.path.join(work_dir, "intro.mp4")
+            intro_clip.write_videofile(
+                intro_path,
+                fps=C.VIDEO_FPS,
+                codec="libx264",
+                audio=False,
+                preset=C.VIDEO_PRESET,
+                logger=None,
+            )
+        intro_clip.close()
+
+        for tc in timeline:
+            tc.start += intro_duration
+        if crossfade:
+            timeline[0].crossfadein = trans_dur
+        intro = TimelineClip("intro", 0.0, intro_clip.duration, intro_path)
+
+        audio_tracks = [(p, s + intro_duration, f) for p, s, f in audio_tracks]
+        if intro_audio_path:
+            audio_tracks.insert(0, (intro_audio_path, 0.0, 0.0))
+
+        total = intro_duration + main_total - (trans_dur if crossfade else 0.0)
+        return [intro] + timeline, audio_tracks, total, intro_duration
+
+    def _make_tasks(
+        self, timeline, total, scenes, trans_type, trans_duration, padding, work_dir
+    ):
+        """每个 clip 起点到下一个 clip 起点为一个时间窗口，帧数按全局帧网格分配"""
+        fps = C.VIDEO_FPS
+        n_frames = int(math.ceil(total * fps - 1e-6))
+        bounds = [int(math.ceil(tc.start * fps - 1e-6)) for tc in timeline]
+        bounds = [min(b, n_frames) for b in bounds] + [n_frames]
+
+        config = dict(vars(C))
+        tasks = []
+        for k in range(len(timeline)):
+            n = bounds[k + 1] - bounds[k]
+            if n <= 0:
+                continue
+            t0 = timeline[k].start
+            t1 = timeline[k + 1].start if k + 1 < len(timeline) else total
+            clips = [tc for tc in timeline if tc.start < t1 and tc.end > t0]
+            tasks.append(
+                SegmentTask(
+                    index=len(tasks),
+                    origin=t0,
+                    length=t1 - t0,
+                    offset=max(0.0, bounds[k] / fps - t0),
+                    n_frames=n,
+                    clips=clips,
+                    output_path=os.path.join(work_dir, f"segment_{len(tasks):03d}.mp4"),
+                    assembler_cls=type(self.assembler),
+                    scenes=scenes,
+                    trans_type=trans_type,
+                    trans_duration=trans_duration,
+                    padding=padding,
+                    config=config,
+                )
+            )
+        return tasks
+
+    # ==================== 渲染与拼接 ====================
+
+    def _render_tasks(
+        self, tasks: List[SegmentTask], scenes, trans_type, trans_duration, padding
+    ) -> List[str]:
+        paths = [task.output_path for task in tasks]
+        pending = []
+        for task in tasks:
+            compiled_path = self._compiled_segment(task)
+            if compiled_path:
+                task.output_path = paths[task.index] = compiled_path
+            else:
+                pending.append(task)
+        if len(pending) < len(tasks):
+            logger.info(f"🏷️ 品牌片段直接拼接 {len(tasks) - len(pending)}/{len(tasks)}")
+
+        if C.ENABLE_SEGMENT_CACHE:
+            cache_dir = os.path.join(C.CACHE_DIR, "segments")
+            os.makedirs(cache_dir, exist_ok=True)
+            tasks_to_check, pending = pending, []
+            for task in tasks_to_check:
+                key = self._segment_key(
+                    task, scenes, trans_type, trans_duration, padding
+                )
+                task.output_path = paths[task.index] = os.path.join(
+                    cache_dir, f"{key}.mp4"
+                )
+                if os.path.exists(task.output_path):
+                    # 修改时间记录最近使用时间，供按容量淘汰
+                    try:
+                        os.utime(task.output_path)
+                    except OSError:
+                        pass
+                else:
+                    pending.append(task)
+            logger.info(
+                f"🗃️ 片段缓存命中 {len(tasks_to_check) - len(pending)}/{len(tasks_to_check)}"
+            )
+
+        if not pending:
+            return paths
+
+        workers = C.SEGMENT_RENDER_WORKERS or os.cpu_count() or 1
+        workers = max(1, min(workers, len(pending)))
+        logger.info(f"🧩 渲染 {len(pending)} 个片段，{workers} 个进程并行")
+
+        # 长片段先提交，减少尾部等待
+        ordered = sorted(pending, key=lambda t: t.n_frames, reverse=True)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(render_segment, task) for task in ordered]
+            for future in as_completed(futures):
+                index, path, elapsed = future.result()
+                task = tasks[index]
+                self.assembler.profiler.add_render(
+                    self._task_label(task, scenes), elapsed, task.n_frames
+                )
+                logger.debug(f"   ✅ Segment {index} rendered in {elapsed:.2f}s: {path}")
+        if C.ENABLE_SEGMENT_CACHE:
+            self._evict_cache(paths)
+        return paths
+
+    def _compiled_segment(self, task: SegmentTask) -> Optional[str]:
+        """
+        窗口内只有一个从窗口起点开始、不叠化的片头或片尾时，直接返回品牌素材编译器的缓存片段
+        （编码参数与其它片段一致，可以 -c copy 拼接）；否则返回 None，照常渲染。
+        编译片段从素材第 0 帧开始，不随 offset 平移：片尾首帧比整段渲染早不到一帧。
+        """
+        if len(task.clips) != 1:
+            return None
+        tc = task.clips[0]
+        if abs(tc.start - task.origin) > 1e-6 or tc.crossfadein > 0:
+            return None
+        try:
+            if tc.kind == "outro":
+                return brand_assets.outro(
+                    self.assembler, task.n_frames, duration=tc.duration, static=task.static
+                )
+            if tc.kind == "intro" and self.brand_intro_path:
+                # 叠化时 tc 为带定格帧的 intro.mp4，只有定格之前的窗口可以用编译片头
+                if brand_assets.compiled_frames(self.brand_intro_path) == task.n_frames:
+                    return self.brand_intro_path
+        except Exception as e:
+            logger.warning(f"⚠️ Brand {tc.kind} compile failed, rendering segment: {e}")
+        return None
+
+    def _task_label(self, task: SegmentTask, scenes: List[Scene]) -> str:
+        """片段所属场景的名称（与整段渲染的剖析报告一致），翻页转场计入后一个场景"""
+        tc = task.clips[-1]
+        if tc.kind == "scene":
+            return f"scene {scenes[tc.ref].scene_id}"
+        if tc.kind == "page_turn":
+            return f"scene {scenes[tc.ref[1]].scene_id}"
+        return tc.kind
+
+    # ==================== 片段缓存 ====================
+
+    def _evict_cache(self, keep: List[str]):
+        """
+        片段缓存总大小超过 SEGMENT_CACHE_MAX_MB 时删除最久未使用的片段；
+        本次拼接要用的片段（keep）与其它进程正在写的 .part.mp4 不删。
+        """
+        root = os.path.join(C.CACHE_DIR, "segments")
+        max_bytes = int(C.SEGMENT_CACHE_MAX_MB * 1024 * 1024)
+        if max_bytes <= 0 or not os.path.isdir(root):
+            return
+        keep = {os.path.abspath(path) for path in keep}
+        entries = []
+        total = 0
+        for entry in os.scandir(root):
+            if not entry.name.endswith(".mp4") or entry.name.endswith(".part.mp4"):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            total += stat.st_size
+            if os.path.abspath(entry.path) not in keep:
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        if total <= max_bytes:
+            return
+        entries.sort()
+        for _, size, path in entries:
+            if total <= max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+        logger.debug(f"🗃️ Segment cache evicted to {total / 1e6:.1f} MB")
+
+    def _segment_key(self, task, scenes, trans_type, trans_duration, padding) -> str:
+        """片段内容哈希：窗口内各 clip 的输入指纹 + 相对位置 + 影响画面的配置"""
+        assembler_cls = type(self.assembler)
+        config = {key: getattr(C, key, None) for key in _RENDER_CONFIG_KEYS}
+        clips = [
+            (
+                self._clip_fingerprint(tc, scenes),
+                round(tc.start - task.origin, 6),
+                round(tc.duration, 6),
+                round(tc.crossfadein, 6),
+            )
+            for tc in task.clips
+        ]
+        # 字幕与片尾文字实际使用的字体文件（换 C.FONTS 或替换字体文件都会换键）
+        fonts = {
+            font_type: file_digest(font_manager.resolve_path(font_type))
+            for font_type in ("chinese", "english")
+        }
+        return content_key(
+            SEGMENT_CACHE_VERSION,
+            f"{assembler_cls.__module__}.{assembler_cls.__qualname__}",
+            config,
+            fonts,
+            (trans_type, trans_duration, padding),
+            round(task.length, 6),
+            round(task.offset, 6),
+            task.n_frames,
+            task.static,
+            clips,
+        )
+
+    def _clip_fingerprint(self, tc: TimelineClip, scenes: List[Scene]):
+        if tc.kind in ("intro", "cover"):
+            return tc.kind, file_digest(tc.ref)
+        if tc.kind == "page_turn":
+            prev_i, i = tc.ref
+            return (
+                tc.kind,
+                file_digest(scenes[prev_i].image_path),
+                file_digest(scenes[i].image_path),
+            )
+        if tc.kind == "scene":
+            from steps.video.base import CAMERA_ACTION_MAP
+
+            scene = scenes[tc.ref]
+            use_video = self._uses_video(scene)
+            raw_action = getattr(scene, "camera_action", "zoom_in")
+            return (
+                tc.kind,
+                tc.ref > 0,  # 首个场景没有重叠转场
+                file_digest(scene.video_path if use_video else scene.image_path),
+                file_digest(scene.audio_path),
+                CAMERA_ACTION_MAP.get(raw_action, "zoom_in"),
+                scene.narration,
+                getattr(scene, "narration_cn", "") or "",
+            )
+        if tc.kind == "outro":
+            return (
+                tc.kind,
+                file_digest(os.path.join(C.ASSETS_DIR, "image", "logo.png")),
+                self.assembler._outro_text_key(),
+            )
+        return (tc.kind,)
+
+    def _render_audio(self, audio_tracks, total, category, bgm_start_time, audio_path):
+        """旁白/封面朗读/片头配音 + BGM 混成一条音轨"""
+        clips = []
+        for path, start, fadeout in audio_tracks:
+            clip = AudioFileClip(path)
+            if fadeout > 0:
+                clip = clip.fx(afx.audio_fadeout, fadeout)
+            clips.append(clip.set_start(start))
+
+        bgm_clip = self.assembler._create_bgm_track(category, total, bgm_start_time)
+        if bgm_clip:
+            clips.append(bgm_clip)
+
+        if not clips:
+            return None
+        audio = CompositeAudioClip(clips).set_duration(total)
+        audio.write_audiofile(audio_path, fps=AUDIO_FPS, codec="aac", logger=None)
+        audio.close()
+        return audio_path
+
+    def _concat(self, segment_paths, audio_path, total, output_path, work_dir):
+        list_path = os.path.join(work_dir, "segments.txt")
+        with open(list_path, "w", encoding="utf-8") as f:
+            for path in segment_paths:
+                f.write(f"file '{os.path.abspath(path)}'\n")
+
+        cmd = [
+            get_setting("FFMPEG_BINARY"),
+            "-y",
+            "-hide_banner",
+            "-loglevel",
+            "error",
+            "-f",
+            "concat",
+            "-safe",
+            "0",
+            "-i",
+            list_path,
+        ]
+        if audio_path:
+            cmd += ["-i", audio_path, "-map", "0:v", "-map", "1:a", "-c:a", "copy"]
+        cmd += ["-c:v", "copy", "-t", f"{total:.3f}", output_path]
+
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip()[-2000:])
+
+        shutil.rmtree(work_dir, ignore_errors=True)
@@ -0,0 +1,355 @@
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from steps.image.font import font_manager
+from steps.image.glyph import fill_rectangle, glyph_atlas
+from steps.image.pinyin import pinyin_service
+
+BOX_FILL = (0, 0, 0, 140)
+EN_FILL = (255, 255, 255, 255)
+HANZI_FILL = (255, 255, 255, 255)
+HANZI_HIGHLIGHT_FILL = (255, 230, 0, 255)
+PINYIN_FILL = (200, 200, 200, 255)
+
+
+# ==================== 布局树 ====================
+
+
+@dataclass
+class LayoutBox:
+    box: list
+    fill: tuple = BOX_FILL
+    radius: int = 0
+
+
+@dataclass
+class LayoutText:
+    xy: Tuple[float, float]
+    text: str
+    font: object
+    fill: tuple
+
+
+@dataclass
+class LayoutCell:
+    """一个拼音单元格：可选的单元格底色 + 按绘制顺序排列的拼音/汉字"""
+
+    texts: List[LayoutText]
+    box: Optional[LayoutBox] = None
+
+
+@dataclass
+class TextLayout:
+    """
+    一次测量得到的布局树：圆角背景框、英文行、拼音单元格。
+    绘制顺序固定为 boxes -> lines -> cells。
+    """
+
+    boxes: List[LayoutBox] = field(default_factory=list)
+    lines: List[LayoutText] = field(default_factory=list)
+    cells: List[LayoutCell] = field(default_factory=list)
+
+
+# ==================== 测量 ====================
+
+
+def wrap_words(text: str, font, max_width: float) -> List[str]:
+    """
+    英文贪心折行，结果与“逐词追加、每次测量整行 textbbox”完全一致。
+
+    每个单词的前进宽度只测一次并做前缀和，用来直接估计每行的断点；
+    再用整行 textbbox 校正估计值（通常只需 1~2 次测量），总体为线性复杂度。
+    """
+    words = text.split()
+    if not words:
+        return []
+
+    space = font.getlength(" ")
+    prefix = [0.0]
+    for word in words:
+        prefix.append(prefix[-1] + font.getlength(word))
+
+    def fits(start: int, end: int) -> bool:
+        line = " ".join(words[start:end])
+        return glyph_atlas.bbox(line, font)[2] <= max_width
+
+    lines = []
+    start = 0
+    while start < len(words):
+        # 前缀和估计：words[start:end] 的宽度 ≈ 单词宽度之和 + 空格
+        end = start + 1
+        while (
+            end < len(words)
+            and prefix[end + 1] - prefix[start] + space * (end - start) <= max_width
+        ):
+            end += 1
+        # 用真实整行宽度校正（首词单独超宽时也独占一行）
+        while end < len(words) and fits(start, end + 1):
+            end += 1
+        while end - start > 1 and not fits(start, end):
+            end -= 1
+        lines.append(" ".join(words[start:end]))
+        start = end
+    return lines
+
+
+def _pinyin_rows(cells, max_width: float, spacing: int) -> list:
+    """按宽度把拼音单元格折成多行"""
+    rows = []
+    current_row = []
+    current_row_width = 0
+    for cell in cells:
+        if current_row_width + cell.cell_width > max_width:
+            rows.append(current_row)
+            current_row = []
+            current_row_width = 0
+        current_row.append(cell)
+        current_row_width += cell.cell_width + spacing
+    if current_row:
+        rows.append(current_row)
+    return rows
+
+
+# ==================== 布局引擎 ====================
+
+
+class BookTextLayoutEngine:
+    """
+    图书布局的文本排版引擎：先一次性测量生成布局树，再从布局树绘制。
+
+    布局结果按 (模式, 文本, 中文字幕, 视频尺寸, 布局参数) 做 LRU 缓存，
+    分段渲染、预览重跑时同一场景不再重复测量。
+    """
+
+    def __init__(self, max_layouts: int = 256):
+        self.max_layouts = max_layouts
+        self._layouts = OrderedDict()
+
+    def layout(
+        self,
+        mode: str,
+        text: str,
+        subtitle_cn: str,
+        video_size: tuple,
+        params: dict,
+    ) -> TextLayout:
+        """
+        Args:
+            mode: bilingual / english / chinese
+            params: BookVideoAssembler._calculate_text_layout_params 的结果
+        """
+        key = (mode, text, subtitle_cn, tuple(video_size), tuple(sorted(params.items())))
+        result = self._layouts.get(key)
+        if result is not None:
+            self._layouts.move_to_end(key)
+            return result
+
+        if mode == "bilingual":
+            result = self._layout_bilingual(text, subtitle_cn, video_size, params)
+        elif mode == "english":
+            result = self._layout_english(text, video_size, params)
+        else:
+            result = self._layout_chinese(text, video_size, params)
+
+        self._layouts[key] = result
+        if len(self._layouts) > self.max_layouts:
+            self._layouts.popitem(last=False)
+        return result
+
+    def render(self, layout: TextLayout, video_size: tuple) -> np.ndarray:
+        """按布局树绘制整帧大小的透明文本图层，返回 (H, W, 4) RGBA"""
+        img = Image.new("RGBA", tuple(video_size), (0, 0, 0, 0))
+        draw = ImageDraw.Draw(img)
+        for box in layout.boxes:
+            if box.radius:
+                draw.rounded_rectangle(box.box, radius=box.radius, fill=box.fill)
+            else:
+                draw.rectangle(box.box, fill=box.fill)
+        for line in layout.lines:
+            draw.text(line.xy, line.text, font=line.font, fill=line.fill)
+
+        # 拼音单元格走字形图集，直接混合进 NumPy 缓冲区
+        buf = np.array(img)
+        for cell in layout.cells:
+            if cell.box is not None:
+                fill_rectangle(buf, cell.box.box, cell.box.fill)
+            for t in cell.texts:
+                glyph_atlas.draw_text(buf, t.xy, t.text, t.font, fill=t.fill)
+        return buf
+
+    # ==================== 各模式排版 ====================
+
+    def _english_lines(self, result, lines, font, start_y, line_height, params):
+        current_y = start_y
+        for line in lines:
+            w_line = glyph_atlas.bbox(line, font)[2]
+            x_line = params["text_start_x"] + (params["text_area_w"] - w_line) / 2
+            result.lines.append(LayoutText((x_line, current_y), line, font, EN_FILL))
+            current_y += line_height
+        return current_y
+
+    def _layout_bilingual(self, text_en, text_cn, video_size, params) -> TextLayout:
+        """双语：英文行 + 可折行的中文拼音，共用一个圆角背景框"""
+        W, H = video_size
+        result = TextLayout()
+        base_font_size = int(W * 0.05)
+        font_en = font_manager.get_font("english", base_font_size)
+        lines = wrap_words(text_en, font_en, params["text_area_w"])
+        line_height = int(base_font_size * 1.3)
+        total_text_h = len(lines) * line_height + 40
+
+        fs_hanzi = int(base_font_size * 0.8)
+        fs_pinyin = int(fs_hanzi * 0.6)
+        font_hanzi = font_manager.get_font("chinese", fs_hanzi)
+        font_pinyin = font_manager.get_font("chinese", fs_pinyin)
+        spacing = 4
+        rows = _pinyin_rows(
+            pinyin_service.cells(text_cn, font_hanzi, font_pinyin),
+            params["text_area_w"],
+            spacing,
+        )
+        row_height = fs_hanzi + fs_pinyin + 10
+        chinese_h = len(rows) * row_height
+
+        total_content_h = total_text_h + chinese_h + 20  # 20是间距
+        box_pad = 15
+        result.boxes.append(
+            LayoutBox(
+                [
+                    params["pane_x_margin"],
+                    params["text_start_y"] - box_pad,
+                    W - params["pane_x_margin"],
+                    params["text_start_y"] + total_content_h + box_pad,
+                ],
+                radius=10,
+            )
+        )
+
+        current_y = self._english_lines(
+            result, lines, font_en, params["text_start_y"], line_height, params
+        )
+        current_y += 20  # 间距
+
+        for row in rows:
+            row_width = sum(d.cell_width + spacing for d in row) - spacing
+            curr_x = params["text_start_x"] + (params["text_area_w"] - row_width) / 2
+            y_pinyin = current_y
+            y_hanzi = y_pinyin + fs_pinyin + 2
+            for item in row:
+                x_p = curr_x + (item.cell_width - item.w_pin) / 2
+                x_c = curr_x + (item.cell_width - item.w_char) / 2
+                result.cells.append(
+                    LayoutCell(
+                        [
+                            LayoutText((x_p, y_pinyin), item.pinyin, font_pinyin, PINYIN_FILL),
+                            LayoutText((x_c, y_hanzi), item.char, font_hanzi, HANZI_HIGHLIGHT_FILL),
+                        ]
+                    )
+                )
+                curr_x += item.cell_width + spacing
+            current_y += row_height
+        return result
+
+    def _layout_english(self, text, video_size, params) -> TextLayout:
+        """纯英文：行数过多时逐步缩小字号"""
+        W, H = video_size
+        result = TextLayout()
+        base_font_size = int(W * 0.06)
+        font = font_manager.get_font("english", base_font_size)
+        lines = wrap_words(text, font, params["text_area_w"])
+
+        max_lines = 4
+        while len(lines) > max_lines and base_font_size > 20:
+            base_font_size = int(base_font_size * 0.9)
+            font = font_manager.get_font("english", base_font_size)
+            lines = wrap_words(text, font, params["text_area_w"])
+
+        line_height = int(base_font_size * 1.4)
+        total_h = len(lines) * line_height
+        start_y = (
+            params["text_start_y"]
+            + (params.get("text_area_h", H * 0.35 - W * 0.08) - total_h) / 2
+        )
+
+        box_pad = 15
+        result.boxes.append(
+            LayoutBox(
+                [
+                    params["text_start_x"] - box_pad,
+                    start_y - box_pad,
+                    params["text_start_x"] + params["text_area_w"] + box_pad,
+                    start_y + total_h + box_pad,
+                ],
+                radius=10,
+            )
+        )
+        self._english_lines(result, lines, font, start_y, line_height, params)
+        return result
+
+    def _layout_chinese(self, text, video_size, params) -> TextLayout:
+        """纯中文：按固定字数分行，每个单元格单独铺底色"""
+        W, H = video_size
+        result = TextLayout()
+        text_area_w = params["text_area_w"]
+        text_area_h = params.get("text_area_h", int(H * 0.35) - 2 * int(W * 0.04))
+
+        fs_w = text_area_w / 20
+        fs_h = text_area_h / 5
+        font_size_hanzi = max(int(min(fs_w, fs_h)), 24)
+        font_size_pinyin = int(font_size_hanzi * 0.6)
+        font_hanzi = font_manager.get_font("chinese", font_size_hanzi)
+        font_pinyin = font_manager.get_font("chinese", font_size_pinyin)
+
+        chars_per_line = max(int(text_area_w / font_size_hanzi), 8)
+        lines = [
+            text[i : i + chars_per_line] for i in range(0, len(text), chars_per_line)
+        ]
+
+        line_height = font_size_hanzi + font_size_pinyin + int(font_size_hanzi * 0.4)
+        total_content_h = len(lines) * line_height
+        start_y_offset = (text_area_h - total_content_h) / 2
+        current_y = params["text_start_y"] + max(start_y_offset, 0)
+
+        for line in lines:
+            char_data = pinyin_service.cells(line, font_hanzi, font_pinyin)
+            total_line_width = sum(item.cell_width + 4 for item in char_data)
+            current_x = params["text_start_x"] + (text_area_w - total_line_width) / 2
+            y_p = current_y
+            y_h = y_p + font_size_pinyin + 3
+            cell_h = (y_h + font_size_hanzi) - y_p + 4
+
+            for item in char_data:
+                cw = item.cell_width
+                result.cells.append(
+                    LayoutCell(
+                        [
+                            LayoutText(
+                                (current_x + (cw - item.w_char) / 2, y_h),
+                                item.char,
+                                font_hanzi,
+                                HANZI_FILL,
+                            ),
+                            LayoutText(
+                                (current_x + (cw - item.w_pin) / 2, y_p),
+                                item.pinyin,
+                                font_pinyin,
+                                PINYIN_FILL,
+                            ),
+                        ],
+                        box=LayoutBox(
+                            [current_x - 2, y_p - 2, current_x + cw + 2, y_p + cell_h + 2]
+                        ),
+                    )
+                )
+                current_x += cw + 4
+
+            current_y += line_height
+        return result
+
+
+# 全局实例
+book_text_layout = BookTextLayoutEngine()
@@ -0,0 +1,215 @@
+import queue
+import subprocess
+import threading
+import time
+from typing import Callable, List, Optional
+
+import numpy as np
+from moviepy.config import get_setting
+
+from steps.video.encoding import EncodeOutput, output_args
+from util.logger import logger
+
+
+class StreamingVideoWriter:
+    """
+    流式视频写入器。
+
+    生产者线程把帧渲染进一组预分配的 uint8 环形缓冲区，消费者按帧序把缓冲区直接写入
+    常驻 ffmpeg 进程的 stdin。渲染与编码互相解耦，内存占用只取决于 ring_size，与视频时长无关。
+
+    threads > 1 时多个生产者并发调用 frame_fn，要求帧源线程安全（静态图片场景满足；
+    VideoFileClip 等带读取游标的源不满足，应使用单线程）。
+
+    extra_outputs 非空时，同一帧流在一次编码中额外输出其它版本（split + 各自缩放/编码）。
+    """
+
+    def __init__(
+        self,
+        output_path: str,
+        size: tuple,
+        fps: int = 24,
+        threads: int = 1,
+        ring_size: int = 8,
+        codec: str = "libx264",
+        preset: str = "medium",
+        audio_path: Optional[str] = None,
+        ffmpeg_params: Optional[list] = None,
+        extra_outputs: Optional[List[EncodeOutput]] = None,
+    ):
+        self.output_path = output_path
+        self.w, self.h = size
+        self.fps = fps
+        self.threads = max(1, int(threads))
+        self.ring_size = max(self.threads + 1, int(ring_size))
+        self.codec = codec
+        self.preset = preset
+        self.audio_path = audio_path
+        self.ffmpeg_params = ffmpeg_params or []
+        self.extra_outputs = extra_outputs or []
+
+        self._ring = np.empty((self.ring_size, self.h, self.w, 3), dtype=np.uint8)
+        self._free = queue.Queue()
+        self._ready = {}
+        self._cond = threading.Condition()
+        self._next_index = 0
+        self._error = None
+
+        self.metrics = {
+            "frames": 0,
+            "queue_depth_avg": 0.0,
+            "queue_depth_max": 0,
+            "producer_stall_s": 0.0,  # 生产者等待空闲缓冲区（编码跟不上）
+            "consumer_stall_s": 0.0,  # 编码端等待下一帧（渲染跟不上）
+            "pipe_write_s": 0.0,
+            "elapsed_s": 0.0,
+        }
+
+    def _command(self) -> list:
+        cmd = [
+            get_setting("FFMPEG_BINARY"),
+            "-y",
+            "-loglevel",
+            "error",
+            "-f",
+            "rawvideo",
+            "-vcodec",
+            "rawvideo",
+            "-s",
+            f"{self.w}x{self.h}",
+            "-pix_fmt",
+            "rgb24",
+            "-r",
+            f"{self.fps:.02f}",
+            "-an",
+            "-i",
+            "-",
+        ]
+        if self.extra_outputs:
+            if self.audio_path:
+                cmd += ["-i", self.audio_path]
+            master = EncodeOutput(
+                self.output_path, (self.w, self.h), self.preset, self.ffmpeg_params
+            )
+            return cmd + output_args(
+                [master] + self.extra_outputs,
+                "0:v",
+                (self.w, self.h),
+                audio="1:a" if self.audio_path else None,
+            )
+        if self.audio_path:
+            cmd += ["-i", self.audio_path, "-acodec", "copy"]
+        cmd += ["-vcodec", self.codec, "-preset", self.preset]
+        if self.codec == "libx264" and self.w % 2 == 0 and self.h % 2 == 0:
+            cmd += ["-pix_fmt", "yuv420p"]
+        cmd += self.ffmpeg_params
+        cmd.append(self.output_path)
+        return cmd
+
+    def _produce(self, frame_fn: Callable[[int], np.ndarray], n_frames: int):
+        try:
+            while True:
+                t0 = time.perf_counter()
+                slot = self._free.get()
+                stall = time.perf_counter() - t0
+
+                with self._cond:
+                    self.metrics["producer_stall_s"] += stall
+                    if self._error is not None or self._next_index >= n_frames:
+                        self._free.put(slot)
+                        return
+                    index = self._next_index
+                    self._next_index += 1
+
+                frame = frame_fn(index)
+                np.copyto(self._ring[slot], frame[..., :3], casting="unsafe")
+
+                with self._cond:
+                    self._ready[index] = slot
+                    self._cond.notify_all()
+        except BaseException as e:
+            with self._cond:
+                self._error = e
+                self._cond.notify_all()
+
+    def write(self, frame_fn: Callable[[int], np.ndarray], n_frames: int) -> dict:
+        """
+        渲染并编码 n_frames 帧，frame_fn(i) 返回第 i 帧 (H, W, 3)。
+
+        Returns:
+            dict: 本次写入的性能指标
+        """
+        start = time.perf_counter()
+        for slot in range(self.ring_size):
+            self._free.put(slot)
+
+        proc = subprocess.Popen(
+            self._command(),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+        )
+        producers = [
+            threading.Thread(
+                target=self._produce, args=(frame_fn, n_frames), daemon=True
+            )
+            for _ in range(self.threads)
+        ]
+        for p in producers:
+            p.start()
+
+        depth_total = 0
+        try:
+            for index in range(n_frames):
+                t0 = time.perf_counter()
+                with self._cond:
+                    while index not in self._ready and self._error is None:
+                        self._cond.wait()
+                    if self._error is not None:
+                        raise self._error
+                    depth = len(self._ready)
+                    slot = self._ready.pop(index)
+                self.metrics["consumer_stall_s"] += time.perf_counter() - t0
+                depth_total += depth
+                self.metrics["queue_depth_max"] = max(
+                    self.metrics["queue_depth_max"], depth
+                )
+
+                t0 = time.perf_counter()
+                proc.stdin.write(memoryview(self._ring[slot]).cast("B"))
+                self.metrics["pipe_write_s"] += time.perf_counter() - t0
+                self._free.put(slot)
+        except (BrokenPipeError, OSError) as e:
+            proc.kill()
+            stderr = proc.stderr.read().decode(errors="ignore")
+            raise RuntimeError(f"ffmpeg pipe error: {e}\n{stderr[-2000:]}") from e
+        except BaseException:
+            proc.kill()
+            raise
+        finally:
+            with self._cond:
+                if self._error is None:
+                    self._next_index = n_frames
+                self._cond.notify_all()
+            # 唤醒可能阻塞在空闲队列上的生产者
+            for _ in producers:
+                self._free.put(0)
+            for p in producers:
+                p.join()
+
+        proc.stdin.close()
+        stderr = proc.stderr.read().decode(errors="ignore")
+        if proc.wait() != 0:
+            raise RuntimeError(f"ffmpeg encode failed: {stderr[-2000:]}")
+
+        self.metrics["frames"] = n_frames
+        self.metrics["queue_depth_avg"] = depth_total / n_frames if n_frames else 0.0
+        self.metrics["elapsed_s"] = time.perf_counter() - start
+        logger.debug(
+            "🎞️ Stream writer: {frames} frames in {elapsed_s:.2f}s, "
+            "queue depth avg {queue_depth_avg:.1f} / max {queue_depth_max}, "
+            "producer stall {producer_stall_s:.2f}s, consumer stall {consumer_stall_s:.2f}s".format(
+                **self.metrics
+            )
+        )
+        return self.metrics
@@ -0,0 +1,44 @@
+import os
+import sys
+
+import edge_tts
+import pytest
+
+sys.path.append(os.getcwd())
+
+from config.config import C
+
+
+@pytest.fixture
+def config(monkeypatch):
+    """
+    临时修改全局配置：config(OUTPUT_DIR=..., VIDEO_FPS=...)，测试结束后全部还原。
+    测试中途改配置也走这里；会被被测代码改写的配置项（如 apply_preview）需先在这里设置一次。
+    """
+
+    def set_config(**values):
+        for key, value in values.items():
+            monkeypatch.setattr(C, key, value, raising=False)
+
+    return set_config
+
+
+@pytest.fixture
+def fake_edge_tts(monkeypatch):
+    """
+    替换 edge_tts.Communicate：不联网，把待合成文本原样写入目标文件。
+    返回按调用顺序记录的已合成文本列表。
+    """
+    texts = []
+
+    class FakeCommunicate:
+        def __init__(self, text, voice, rate=None, pitch=None):
+            self.text = text
+
+        async def save(self, path):
+            texts.append(self.text)
+            with open(path, "wb") as f:
+                f.write(self.text.encode("utf-8"))
+
+    monkeypatch.setattr(edge_tts, "Communicate", FakeCommunicate)
+    return texts
@@ -0,0 +1,111 @@
+import asyncio
+import os
+import subprocess
+import sys
+
+import edge_tts
+from moviepy.config import get_setting
+
+sys.path.append(os.getcwd())
+
+from model.models import Scene
+from steps.audio import generic
+from steps.audio.concat import concat_audio
+from steps.audio.probe import stream_info
+
+
+def _tone(path, duration, rate=24000, channels=1, freq=440):
+    subprocess.run(
+        [
+            get_setting("FFMPEG_BINARY"),
+            "-y",
+            "-loglevel",
+            "error",
+            "-f",
+            "lavfi",
+            "-i",
+            f"sine=f={freq}:r={rate}:d={duration}",
+            "-ac",
+            str(channels),
+            "-b:a",
+            "48k",
+            path,
+        ],
+        check=True,
+    )
+    return path
+
+
+def _duration(path):
+    from moviepy.editor import AudioFileClip
+
+    clip = AudioFileClip(path)
+    try:
+        return clip.duration
+    finally:
+        clip.close()
+
+
+def test_concat_copy(tmp_path):
+    en = _tone(str(tmp_path / "en.mp3"), 1.0)
+    cn = _tone(str(tmp_path / "cn.mp3"), 1.5, freq=660)
+    out = str(tmp_path / "out.mp3")
+    # 目标文件是硬链接时，原文件不受影响
+    os.link(en, out)
+
+    concat_audio([en, cn], out, gap=0.8)
+    info = stream_info(out)
+    # 拷贝码流：保持原采样率/声道，不被重采样为 44100 立体声
+    assert (info["codec"], info["sample_rate"], info["channels"], info["bitrate"]) == ("mp3", 24000, 1, 48)
+    # 每段 mp3 自带几十毫秒的编码器延迟/补齐，拷贝拼接时保留
+    assert abs(_duration(out) - 3.3) < 0.25
+    assert abs(_duration(en) - 1.0) < 0.1
+    assert sorted(os.listdir(tmp_path)) == ["cn.mp3", "en.mp3", "out.mp3"]
+
+
+def test_concat_mismatch_reencodes(tmp_path):
+    a = _tone(str(tmp_path / "a.mp3"), 1.0)
+    b = _tone(str(tmp_path / "b.mp3"), 1.0, rate=44100, channels=2)
+    c = _tone(str(tmp_path / "c.mp3"), 0.5)
+    out = str(tmp_path / "out.mp3")
+
+    concat_audio([a, b, c], out, gap=0.5)
+    info = stream_info(out)
+    assert (info["sample_rate"], info["channels"]) == (24000, 1)
+    assert abs(_duration(out) - 3.5) < 0.25
+
+
+class _ToneCommunicate:
+    """模拟 edge-tts：英文 1 秒、中文 1.5 秒的 mp3，记录同时在途的请求数"""
+
+    in_flight = 0
+    max_in_flight = 0
+
+    def __init__(self, text, voice, rate=None, pitch=None):
+        self.duration = 1.0 if text.isascii() else 1.5
+
+    async def save(self, path):
+        cls = _ToneCommunicate
+        cls.in_flight += 1
+        cls.max_in_flight = max(cls.max_in_flight, cls.in_flight)
+        await asyncio.sleep(0.05)
+        cls.in_flight -= 1
+        _tone(path, self.duration)
+
+
+def test_bilingual_scene(tmp_path, config, monkeypatch):
+    monkeypatch.setattr(edge_tts, "Communicate", _ToneCommunicate)
+    config(
+        OUTPUT_DIR=str(tmp_path),
+        ENABLE_TTS_CACHE=False,
+        ENABLE_BILINGUAL_MODE=True,
+        CURRENT_CATEGORY="英语绘本",
+        BILINGUAL_AUDIO_PAUSE=1.0,
+    )
+    scene = Scene(scene_id=1, narration="Hello", narration_cn="你好", image_prompt="")
+    asyncio.run(generic.GenericAudioStudio()._generate_one_audio(scene))
+    # EN / CN 同时合成
+    assert _ToneCommunicate.max_in_flight == 2
+    assert scene.audio_path == str(tmp_path / "scene_1.mp3")
+    assert abs(_duration(scene.audio_path) - 3.5) < 0.25
+    assert os.listdir(tmp_path) == ["scene_1.mp3"]
@@ -0,0 +1,82 @@
+import os
+import subprocess
+import sys
+
+from moviepy.config import get_setting
+from moviepy.editor import AudioFileClip
+from PIL import Image
+
+sys.path.append(os.getcwd())
+
+from model.models import Scene, VideoScript
+from steps.audio.probe import probe_audio, probe_scene_audio
+from steps.video.base import CAMERA_ACTION_MAP
+from steps.video.generic import GenericVideoAssembler
+
+
+def _encode(path, source, duration, channels=1):
+    subprocess.run(
+        [
+            get_setting("FFMPEG_BINARY"),
+            "-y",
+            "-loglevel",
+            "error",
+            "-f",
+            "lavfi",
+            "-i",
+            source,
+            "-t",
+            str(duration),
+            "-ac",
+            str(channels),
+            path,
+        ],
+        check=True,
+    )
+    return path
+
+
+def test_probe_audio(tmp_path):
+    tone = _encode(str(tmp_path / "tone.mp3"), "sine=f=440:r=44100", 1.2, channels=2)
+    info = probe_audio(tone)
+    assert (info["sample_rate"], info["channels"]) == (44100, 2)
+    # 与 moviepy 读到的时长一致
+    clip = AudioFileClip(tone)
+    assert info["duration"] == clip.duration
+    clip.close()
+    assert -30 < info["loudness"] < -10
+
+    silence = _encode(str(tmp_path / "silence.mp3"), "anullsrc=r=24000", 0.5)
+    assert probe_audio(silence)["loudness"] is None
+
+    broken = tmp_path / "broken.mp3"
+    broken.write_bytes(b"not audio")
+    assert probe_audio(str(broken)) is None
+
+
+def test_scene_metadata_roundtrip(tmp_path):
+    tone = _encode(str(tmp_path / "scene_1.mp3"), "sine=f=440:r=24000", 1.2)
+    scene = Scene(scene_id=1, narration="旁白", image_prompt="", audio_path=tone)
+    assert probe_scene_audio(scene)
+    assert (scene.audio_sample_rate, scene.audio_channels) == (24000, 1)
+
+    path = str(tmp_path / "script.json")
+    VideoScript(topic="t", scenes=[scene]).to_json(path)
+    loaded = VideoScript.from_json(path).scenes[0]
+    assert loaded == scene
+
+    # 视频步骤直接使用元数据，规划时间轴不再打开音频
+    assembler = GenericVideoAssembler()
+    os.remove(tone)
+    assert assembler._scene_audio_duration(loaded) == scene.duration_seconds
+    loaded.image_path = str(tmp_path / "scene_1.png")
+    Image.new("RGB", (90, 160), (90, 140, 200)).save(loaded.image_path)
+    audio_path, visual_clip, duration = assembler._load_scene_assets(
+        loaded, CAMERA_ACTION_MAP, 0, 0.0
+    )
+    assert (audio_path, duration) == (tone, scene.duration_seconds + 0.5)
+    visual_clip.close()
+
+    # 探测失败时清掉旧元数据
+    assert not probe_scene_audio(loaded)
+    assert loaded.duration_seconds == 0.0 and loaded.audio_loudness is None
@@ -0,0 +1,117 @@
+import asyncio
+import ctypes
+import os
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+sys.path.append(os.getcwd())
+
+from config.config import C
+from model.models import Scene
+from steps.audio import azure
+from steps.audio.base import TTSThrottledError
+
+
+class _FakeSDK:
+    """模拟 Speech SDK：合成阻塞 50ms，音频分块读出；文本为 THROTTLE 时返回限流错误"""
+
+    ResultReason = SimpleNamespace(Canceled="canceled", SynthesizingAudioStarted="started")
+    CancellationReason = SimpleNamespace(Error="error")
+    StreamStatus = SimpleNamespace(Canceled="canceled", AllData="all")
+    created = 0
+    threads = set()
+
+    class SpeechConfig:
+        def __init__(self, subscription, region):
+            pass
+
+    class Connection:
+        @staticmethod
+        def from_speech_synthesizer(synthesizer):
+            return SimpleNamespace(open=lambda for_continuous: None)
+
+    class SpeechSynthesizer:
+        def __init__(self, speech_config, audio_config):
+            assert audio_config is None
+            _FakeSDK.created += 1
+            self.busy = False
+
+        def start_speaking_ssml_async(self, ssml):
+            assert not self.busy
+            _FakeSDK.threads.add(threading.get_ident())
+            text = ssml.split('<prosody rate="+0%">')[1].split("</prosody>")[0]
+            if text == "THROTTLE":
+                details = SimpleNamespace(reason="error", error_details="429 Too Many Requests")
+                result = SimpleNamespace(reason="canceled", cancellation_details=details)
+            else:
+                self.busy = True
+                time.sleep(0.05)
+                self.busy = False
+                result = SimpleNamespace(reason="started", audio=text.encode() * 3)
+            return SimpleNamespace(get=lambda: result)
+
+    class AudioDataStream:
+        def __init__(self, result):
+            self.data = result.audio
+            self.status = "all"
+
+        def read_data(self, buffer):
+            n = min(4, len(self.data))
+            # 与 SDK 一致：写入调用方预分配的 bytes
+            ctypes.memmove(buffer, self.data[:n], n)
+            self.data = self.data[n:]
+            return n
+
+
+def test_azure_pool(tmp_path, config, monkeypatch):
+    monkeypatch.setattr(azure, "speechsdk", _FakeSDK)
+    monkeypatch.setattr(azure, "_CHUNK_SIZE", 4)
+    monkeypatch.setattr(type(C), "get_speech_rate", lambda self, category: "+0%")
+    config(
+        OUTPUT_DIR=str(tmp_path),
+        ENABLE_TTS_CACHE=False,
+        AZURE_TTS_KEY="key",
+        ENABLE_EMOTIONAL_TTS=False,
+        TTS_LIMITS={"azure": {"concurrency": 3, "rate": 0, "retries": 0}},
+    )
+    studio = azure.AzureAudioStudio()
+    scenes = [Scene(scene_id=i, narration=f"第{i}句", image_prompt="") for i in range(6)]
+
+    async def run():
+        # 合成期间事件循环照常调度
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.005)
+
+        task = asyncio.ensure_future(ticker())
+        start = time.monotonic()
+        await studio.generate_audio(scenes)
+        elapsed = time.monotonic() - start
+        task.cancel()
+        return ticks, elapsed
+
+    ticks, elapsed = asyncio.run(run())
+    assert ticks >= 10
+    # 6 个场景、3 个线程并行：约两轮
+    assert elapsed < 0.25
+    # 合成器在场景间复用，个数不超过并发数
+    assert _FakeSDK.created <= 3 and len(_FakeSDK.threads) <= 3
+    for scene in scenes:
+        with open(scene.audio_path, "rb") as f:
+            assert f.read() == scene.narration.encode() * 3
+    assert sorted(os.listdir(tmp_path)) == sorted(f"scene_{i}.mp3" for i in range(6))
+
+    # 取消详情里的限流错误转为 TTSThrottledError，失败时不留下临时文件
+    try:
+        asyncio.run(studio.generate_tts("THROTTLE", str(tmp_path / "scene_9.mp3")))
+        assert False, "expected TTSThrottledError"
+    except TTSThrottledError:
+        pass
+    assert "scene_9.mp3" not in os.listdir(tmp_path)
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".part")]
@@ -0,0 +1,46 @@
+import os
+import sys
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+sys.path.append(os.getcwd())
+
+from steps.image.background import linear_gradient, noise, radial_gradient, vignette
+
+
+def test_linear_gradient_matches_line_loop():
+    width, height = 120, 213
+    top, bottom = (224, 247, 255), (255, 240, 245)
+    img = Image.new("RGB", (width, height))
+    draw = ImageDraw.Draw(img)
+    for y in range(height):
+        ratio = y / height
+        draw.line(
+            [(0, y), (width, y)],
+            fill=tuple(int(a + (b - a) * ratio) for a, b in zip(top, bottom)),
+        )
+    frame = linear_gradient((width, height), top, bottom)
+    assert np.array_equal(np.asarray(img), frame)
+
+    # 按尺寸和配色缓存，结果只读
+    assert linear_gradient((width, height), top, bottom) is frame
+    assert not frame.flags.writeable
+
+    # endpoint=True 时两端各取到起止色；RGBA 配色输出 4 通道
+    row = linear_gradient((50, 2), (0, 0, 0, 255), (255, 100, 0, 0), horizontal=True, endpoint=True)
+    assert row.shape == (2, 50, 4)
+    assert tuple(row[0, 0]) == (0, 0, 0, 255) and tuple(row[1, -1]) == (255, 100, 0, 0)
+
+
+def test_radial_vignette_noise():
+    glow = radial_gradient((64, 48), (20, 10), 30, (0, 242, 234, 85), 1.8)
+    assert tuple(glow[10, 20]) == (0, 242, 234, 85)
+    assert glow[47, 63, 3] == 0 and tuple(glow[47, 63, :3]) == (0, 0, 0)
+
+    shade = vignette((64, 48), strength=120)
+    assert shade[24, 32, 3] == 0 and shade[0, 0, 3] > 100
+
+    grain = noise((64, 48), amount=10, seed=3)
+    assert np.array_equal(grain, noise.__wrapped__((64, 48), amount=10, seed=3))
+    assert (grain[..., 3] == 10).all()
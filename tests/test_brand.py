@@ -0,0 +1,82 @@
+import os
+import sys
+
+import numpy as np
+from moviepy.editor import VideoClip, VideoFileClip
+
+sys.path.append(os.getcwd())
+
+from config.config import C
+from steps.video.brand import brand_assets
+from steps.video.generic import GenericVideoAssembler
+
+
+def _write_intro(path):
+    clip = VideoClip(
+        make_frame=lambda t: np.full((120, 160, 3), int(t * 100) % 256, dtype=np.uint8),
+        duration=1.0,
+    )
+    clip.write_videofile(path, fps=12, codec="libx264", audio=False, logger=None)
+
+
+def test_brand_assets(tmp_path, config):
+    config(
+        OUTPUT_DIR=str(tmp_path / "out"),
+        CACHE_DIR=str(tmp_path / "cache"),
+        VIDEO_SIZE=(90, 160),
+        VIDEO_FPS=12,
+        ENABLE_BRAND_CACHE=True,
+    )
+    os.makedirs(C.OUTPUT_DIR)
+    _check_intro(tmp_path)
+    _check_outro(config)
+
+
+def _check_intro(tmp_path):
+    intro_path = str(tmp_path / "intro.mp4")
+    _write_intro(intro_path)
+    assembler = GenericVideoAssembler()
+
+    path = brand_assets.intro(assembler, intro_path)
+    assert brand_assets.compiled_frames(path) == 12
+    # 片头没有音轨时不生成 .m4a
+    assert not os.path.exists(brand_assets.intro_audio_path(path))
+    clip = VideoFileClip(path)
+    try:
+        assert tuple(clip.size) == (90, 160)
+    finally:
+        clip.close()
+
+    # 第二次直接命中缓存，不再编码
+    mtime = os.stat(path).st_mtime_ns
+    assert brand_assets.intro(assembler, intro_path) == path
+    assert os.stat(path).st_mtime_ns == mtime
+    # 源文件不是编译产物
+    assert brand_assets.compiled_frames(intro_path) is None
+
+
+def _check_outro(config):
+    assembler = GenericVideoAssembler()
+    built = []
+    create_brand_outro = assembler.create_brand_outro
+
+    def counting_create_brand_outro(**kwargs):
+        built.append(kwargs["platform"])
+        return create_brand_outro(**kwargs)
+
+    assembler.create_brand_outro = counting_create_brand_outro
+
+    path = brand_assets.outro(assembler, 6, duration=0.5)
+    assert brand_assets.compiled_frames(path) == 6
+    assert brand_assets.outro(assembler, 6, duration=0.5) == path
+    assert built == ["general"]
+
+    # 编码参数变化时重新编译，平台不同的片尾各自缓存
+    config(VIDEO_CRF=C.VIDEO_CRF + 1)
+    assert brand_assets.outro(assembler, 6, duration=0.5) != path
+    assert brand_assets.outro(assembler, 6, duration=0.5, platform="douyin") != path
+    assert built == ["general", "general", "douyin"]
+
+    config(ENABLE_BRAND_CACHE=False)
+    assert brand_assets.outro(assembler, 6, duration=0.5) is None
+
@@ -0,0 +1,48 @@
+import os
+import sys
+import numpy as np
+from PIL import Image
+
+sys.path.append(os.getcwd())
+
+from steps.video.camera import KenBurnsRenderer, ease_in_out_cubic
+
+
+def _reference_frame(img, t, duration, scale_factor, action):
+    """旧实现：逐帧 crop + LANCZOS resize"""
+    h, w = img.shape[:2]
+    p = float(ease_in_out_cubic(t / duration))
+    if action == "zoom_in":
+        scale = 1.0 + (scale_factor - 1.0) * p
+        crop_w, crop_h = w / scale, h / scale
+        x1, y1 = (w - crop_w) / 2, (h - crop_h) / 2
+    else:  # pan_right
+        crop_w, crop_h = w / scale_factor, h / scale_factor
+        x1, y1 = (w - crop_w) * p, (h - crop_h) / 2
+    cropped = Image.fromarray(img).crop((x1, y1, x1 + crop_w, y1 + crop_h))
+    return np.asarray(cropped.resize((w, h), Image.LANCZOS)).astype(int)
+
+
+def test_camera_matches_legacy_render():
+    w, h = 360, 640
+    img = (np.linspace(0, 255, w)[None, :, None] * np.ones((h, 1, 3))).astype(
+        np.uint8
+    )
+    img[::40] = 255
+
+    for action in ("zoom_in", "pan_right"):
+        for quality in ("lanczos", "bilinear"):
+            renderer = KenBurnsRenderer(img, 3.0, action, 1.25, quality=quality)
+            for t in (0.0, 1.0, 2.0, 2.95):
+                frame = renderer.render(t)
+                assert frame.shape == (h, w, 3)
+                ref = _reference_frame(img, t, 3.0, 1.25, action)
+                diff = np.abs(frame.astype(int) - ref).mean()
+                assert diff < 3.0, f"{action}/{quality} t={t}: diff={diff:.2f}"
+
+
+def test_camera_static_action_returns_source():
+    img = np.full((64, 32, 3), 120, dtype=np.uint8)
+    renderer = KenBurnsRenderer(img, 2.0, "static")
+    assert renderer.is_static
+    assert np.array_equal(renderer.render(1.0), img)
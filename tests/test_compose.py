@@ -0,0 +1,31 @@
+import os
+import sys
+
+import numpy as np
+from moviepy.editor import CompositeVideoClip, ImageClip, VideoClip
+
+sys.path.append(os.getcwd())
+
+from steps.video.compose import StaticOverlayClip, composite_layers
+
+
+def test_composite_layers_fast_path():
+    w, h = 64, 48
+    rng = np.random.default_rng(0)
+    pattern = rng.integers(0, 256, (h, w, 3)).astype(np.uint8)
+    visual = VideoClip(lambda t: np.roll(pattern, int(t * 10), axis=1), duration=1.0)
+    rgba = np.zeros((h, w, 4), dtype=np.uint8)
+    rgba[30:40, 8:50] = (255, 230, 0, 140)
+    rgba[34:36, 10:20, 3] = 255
+    text = ImageClip(rgba).set_duration(1.0)
+    bg = ImageClip(np.zeros((h, w, 3), dtype=np.uint8)).set_duration(1.0)
+
+    fast = composite_layers([bg, visual, text], (w, h))
+    assert isinstance(fast, StaticOverlayClip)
+    slow = CompositeVideoClip([bg, visual, text], size=(w, h))
+    for t in (0.0, 0.35, 0.9):
+        assert np.array_equal(fast.get_frame(t), slow.get_frame(t))
+
+    # 底图不铺满画面时回退
+    small = visual.resize((32, 24)).set_position(("center", "center"))
+    assert isinstance(composite_layers([bg, small, text], (w, h)), CompositeVideoClip)
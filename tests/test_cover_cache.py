@@ -0,0 +1,54 @@
+import os
+import shutil
+import sys
+
+from PIL import Image
+
+sys.path.append(os.getcwd())
+
+from config.config import C
+from model.models import Scene
+from steps.video.generic import GenericVideoAssembler
+
+
+def test_cover_cache(tmp_path, config, fake_edge_tts):
+    config(OUTPUT_DIR=str(tmp_path / "out"), CACHE_DIR=str(tmp_path / "cache"))
+    os.makedirs(C.OUTPUT_DIR)
+    _check_cover_cache(tmp_path, fake_edge_tts)
+
+
+def _check_cover_cache(tmp_path, dubbed):
+    image_path = str(tmp_path / "scene.png")
+    Image.new("RGB", (180, 320), (50, 50, 150)).save(image_path)
+    scenes = [Scene(scene_id=1, narration="", image_prompt="", image_path=image_path)]
+
+    assembler = GenericVideoAssembler()
+    generated = []
+    generate_cover = assembler.generate_cover
+
+    def counting_generate_cover(**kwargs):
+        generated.append(kwargs["title"])
+        return generate_cover(**kwargs)
+
+    assembler.generate_cover = counting_generate_cover
+    assembler._probe_audio_duration = lambda path: 1.0
+
+    def prepare(title):
+        cover_path, _, _ = assembler._prepare_cover_assets(scenes, title, "")
+        return Image.open(cover_path).tobytes()
+
+    first = prepare("守株待兔")
+    # 重跑：封面图与朗读音频都命中缓存
+    assert prepare("守株待兔") == first
+    assert generated == ["守株待兔"] and dubbed == ["守株待兔"]
+
+    # 修改标题后重新生成，不会留下旧封面
+    assert prepare("画蛇添足") != first
+    assert generated == ["守株待兔", "画蛇添足"] and dubbed == ["守株待兔", "画蛇添足"]
+
+    # 缓存在输出目录被清空后依然有效
+    shutil.rmtree(C.OUTPUT_DIR)
+    os.makedirs(C.OUTPUT_DIR)
+    assert prepare("守株待兔") == first
+    assert len(generated) == 2 and len(dubbed) == 2
+
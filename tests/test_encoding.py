@@ -0,0 +1,62 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.getcwd())
+
+from moviepy.editor import VideoFileClip
+from model.models import Scene
+from steps.video.encoding import (
+    is_static_timeline,
+    output_args,
+    rendition_outputs,
+    x264_params,
+)
+from steps.video.writer import StreamingVideoWriter
+
+
+def test_encoding_profile(config):
+    config(VIDEO_TUNE="auto", VIDEO_KEYINT=2)
+    static = [Scene(scene_id=1, narration="", image_prompt="", audio_path="a.mp3", camera_action="static")]
+    moving = [Scene(scene_id=1, narration="", image_prompt="", audio_path="a.mp3", camera_action="zoom_in")]
+    assert is_static_timeline(static) and not is_static_timeline(moving)
+    assert not is_static_timeline(static, has_video_source=True)
+
+    params = x264_params(24, static=True)
+    assert params[params.index("-tune") + 1] == "stillimage"
+    assert params[params.index("-g") + 1] == "48"
+    assert "-tune" not in x264_params(24, static=False)
+
+    config(VIDEO_RENDITIONS={"share": {"scale": 0.5, "crf": 30}})
+    (share,) = rendition_outputs("/out/final_video.mp4", (270, 480), 24)
+    assert share.path == "/out/final_video_share.mp4" and share.size == (134, 240)
+    assert share.params[share.params.index("-crf") + 1] == "30"
+
+    # 单路输出不经过滤镜；滤镜图中的音频 pad 多路输出时先 asplit
+    assert output_args([share], "0:v", (134, 240))[:2] == ["-map", "0:v"]
+    filters = []
+    args = output_args([share, share], "v9", (270, 480), audio="[a3]", filters=filters)
+    assert "-filter_complex" not in args
+    assert filters[0] == "[v9]split=2[enc0][enc1]" and "[a3]asplit=2[aenc0][aenc1]" in filters
+
+
+def test_stream_writer_renditions(tmp_path, config):
+    w, h, n = 64, 48, 12
+    output = str(tmp_path / "master.mp4")
+    config(VIDEO_RENDITIONS={"share": {"scale": 0.5}})
+    extra = rendition_outputs(output, (w, h), 24)
+
+    writer = StreamingVideoWriter(
+        output, (w, h), fps=24, ffmpeg_params=x264_params(24), extra_outputs=extra
+    )
+    writer.write(lambda i: np.full((h, w, 3), i * 16, dtype=np.uint8), n)
+
+    # 一次编码同时写出两路，画面内容一致
+    for path, size in ((output, [w, h]), (extra[0].path, [w // 2, h // 2])):
+        clip = VideoFileClip(path)
+        try:
+            assert clip.size == size
+            assert abs(clip.get_frame(5 / 24 + 0.001).mean() - 80) < 4
+        finally:
+            clip.close()
@@ -0,0 +1,136 @@
+import os
+import subprocess
+import sys
+
+import numpy as np
+from moviepy.config import get_setting
+from moviepy.editor import VideoFileClip
+from PIL import Image
+
+sys.path.append(os.getcwd())
+
+from config.config import C
+from model.models import Scene
+from steps.video import filtergraph
+from steps.video.filtergraph import FilterGraphVideoAssembler
+from steps.video.generic import GenericVideoAssembler
+
+_CATEGORY = "滤镜图测试"
+
+
+def _setup(tmp_path, config, transition, fps=30):
+    config(
+        OUTPUT_DIR=str(tmp_path / "out"),
+        CACHE_DIR=str(tmp_path / "cache"),
+        VIDEO_SIZE=(90, 160),
+        VIDEO_FPS=fps,
+        CATEGORY_TRANSITIONS={_CATEGORY: transition},
+        ENABLE_BRAND_OUTRO=True,
+        ENABLE_CUSTOM_INTRO=False,
+        ENABLE_SEGMENT_RENDER=False,
+        # 只比较时间轴：字幕图层由两条路径各自合成，像素上本就有差异
+        ENABLE_SUBTITLES=False,
+        CURRENT_CATEGORY=_CATEGORY,
+    )
+    os.makedirs(C.OUTPUT_DIR)
+
+
+def _scenes(tmp_path, count=3):
+    scenes = []
+    colors = [(200, 80, 80), (80, 200, 80), (80, 80, 200)]
+    for i, color in enumerate(colors[:count], start=1):
+        image_path = str(tmp_path / f"scene_{i}.png")
+        Image.new("RGB", (90, 160), color).save(image_path)
+        audio_path = str(tmp_path / f"scene_{i}.mp3")
+        # 时长不是帧长的整数倍，各段起点落在两帧之间
+        subprocess.run(
+            [
+                get_setting("FFMPEG_BINARY"),
+                "-y",
+                "-loglevel",
+                "error",
+                "-f",
+                "lavfi",
+                "-i",
+                f"sine=f=440:r=24000:d={1.0 + 0.21 * i}",
+                audio_path,
+            ],
+            check=True,
+        )
+        scenes.append(
+            Scene(
+                scene_id=i,
+                narration=f"第{i}段旁白",
+                image_prompt="",
+                image_path=image_path,
+                audio_path=audio_path,
+                camera_action="static",
+            )
+        )
+    return scenes
+
+
+def _frames(path):
+    clip = VideoFileClip(path)
+    try:
+        return np.array([f.astype(np.float32) for f in clip.iter_frames()]), clip.duration
+    finally:
+        clip.close()
+
+
+def test_frame_parity(tmp_path, config):
+    _setup(tmp_path, config, "crossfade")
+    scenes = _scenes(tmp_path)
+
+    default_frames, default_duration = _frames(
+        GenericVideoAssembler().assemble_video(
+            scenes, output_filename="default.mp4", category=_CATEGORY
+        )
+    )
+    assembler = FilterGraphVideoAssembler(GenericVideoAssembler())
+    assert assembler._unsupported_reason(scenes, "crossfade") is None
+    ffmpeg_frames, ffmpeg_duration = _frames(
+        assembler.assemble_video(scenes, output_filename="ffmpeg.mp4", category=_CATEGORY)
+    )
+
+    assert len(ffmpeg_frames) == len(default_frames)
+    assert abs(ffmpeg_duration - default_duration) < 1e-6
+    # 逐帧比较：切换、叠化与片尾淡入都落在同一帧上（只允许编码与缩放误差）
+    diffs = np.abs(ffmpeg_frames - default_frames).mean(axis=(1, 2, 3))
+    assert diffs.max() < 8, diffs
+
+
+class _RecordingLayout(GenericVideoAssembler):
+    """记录回退调用的版式装配器"""
+
+    def __init__(self):
+        super().__init__()
+        self.calls = []
+
+    def assemble_video(self, scenes, output_filename="final_video.mp4", **kwargs):
+        self.calls.append((output_filename, kwargs["category"]))
+        return os.path.join(C.OUTPUT_DIR, output_filename)
+
+
+def test_fallback(tmp_path, config, monkeypatch):
+    _setup(tmp_path, config, "page_turn", fps=12)
+    config(ENABLE_BRAND_OUTRO=False)
+    scenes = _scenes(tmp_path, count=2)
+
+    # 不支持的转场：不调用 ffmpeg，直接交给版式装配器
+    layout = _RecordingLayout()
+    assembler = FilterGraphVideoAssembler(layout)
+    assert assembler._unsupported_reason(scenes, "page_turn")
+    output_path = assembler.assemble_video(scenes, output_filename="a.mp4", category=_CATEGORY)
+    assert layout.calls == [("a.mp4", _CATEGORY)]
+    assert output_path == os.path.join(C.OUTPUT_DIR, "a.mp4")
+
+    # ffmpeg 执行失败
+    config(CATEGORY_TRANSITIONS={_CATEGORY: "crossfade"})
+    monkeypatch.setattr(filtergraph, "get_setting", lambda name: "false")
+    layout = _RecordingLayout()
+    assembler = FilterGraphVideoAssembler(layout)
+    assert assembler._unsupported_reason(scenes, "crossfade") is None
+    assembler.assemble_video(scenes, output_filename="b.mp4", category=_CATEGORY)
+    assert layout.calls == [("b.mp4", _CATEGORY)]
+    assert not os.path.exists(os.path.join(C.OUTPUT_DIR, "b.mp4"))
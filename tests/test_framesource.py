@@ -0,0 +1,65 @@
+import os
+import sys
+
+import numpy as np
+from moviepy.editor import ImageSequenceClip, VideoFileClip
+import moviepy.video.fx.all as vfx
+
+sys.path.append(os.getcwd())
+
+from steps.video.framesource import FrameCache, VideoFrameSource
+
+
+def _make_video(path):
+    rng = np.random.default_rng(0)
+    frames = [rng.integers(0, 256, (48, 64, 3), dtype=np.uint8) for _ in range(12)]
+    ImageSequenceClip(frames, fps=12).write_videofile(path, codec="libx264", audio=False, logger=None)
+
+
+def test_frame_source_loop(tmp_path):
+    path = str(tmp_path / "clip.mp4")
+    _make_video(path)
+
+    # 循环结果与 VideoFileClip + vfx.loop 逐帧一致
+    cache = FrameCache(max_bytes=64 * 1024 * 1024)
+    source = VideoFrameSource(path, cache)
+    duration = source.duration * 2.5
+    ref_clip = VideoFileClip(path)
+    ref = vfx.loop(ref_clip, duration=duration)
+    clip = source.clip(duration)
+    for i in range(int(duration * 12)):
+        t = i / 12
+        assert np.array_equal(clip.get_frame(t), ref.get_frame(t))
+    ref_clip.close()
+
+    # 每帧只解码一次，循环部分全部命中缓存
+    assert cache.misses == 12
+    assert cache.hits > 0
+    assert not clip.get_frame(0).flags.writeable
+
+    # 同一文件的新帧源共享已缓存的帧
+    misses = cache.misses
+    shared = VideoFrameSource(path, cache).clip(duration)
+    shared.get_frame(0.5)
+    assert cache.misses == misses
+    shared.close()
+
+    source.close()
+
+    # 关闭片段即结束帧源的 ffmpeg 读取进程（只解码了首帧，进程仍在等待输出）
+    fresh = VideoFrameSource(path, FrameCache(max_bytes=64 * 1024 * 1024))
+    clip = fresh.clip(duration)
+    clip.get_frame(0)
+    proc = fresh.reader.proc
+    assert proc.poll() is None
+    clip.close()
+    assert proc.poll() is not None and fresh.reader.proc is None
+
+
+def test_frame_cache_bound():
+    frame = np.zeros((10, 10, 3), dtype=np.uint8)
+    cache = FrameCache(max_bytes=frame.nbytes * 3)
+    for i in range(5):
+        cache.put(i, frame.copy())
+    assert cache.nbytes <= frame.nbytes * 3
+    assert cache.get(0) is None and cache.get(4) is not None
@@ -0,0 +1,32 @@
+import os
+import sys
+
+import numpy as np
+from moviepy.editor import VideoClip
+
+sys.path.append(os.getcwd())
+
+from steps.video.framestore import FrameStore
+
+
+def test_frame_store_phase(tmp_path):
+    rng = np.random.default_rng(0)
+    pattern = rng.integers(0, 256, (24, 32, 3)).astype(np.uint8)
+    clip = VideoClip(lambda t: np.roll(pattern, int(t * 100), axis=1), duration=1.3)
+
+    store = FrameStore(str(tmp_path), fps=10)
+    stored = store.put("scene_1", clip)
+    # 片段起点不在帧网格上：编码器按 0.375 + k / 10 取帧，与原 clip 逐帧一致
+    for k in range(13):
+        t = 0.375 + k / 10 - 0.4
+        if 0 <= t < 1.3:
+            assert np.array_equal(stored.get_frame(t), clip.get_frame(t))
+    # 不在网格上的时刻回退到原 clip
+    assert np.array_equal(stored.get_frame(0.555), clip.get_frame(0.555))
+
+    # 落盘文件可离线读取，帧为内存映射上的只读视图
+    frames = store.open("scene_1")
+    assert abs(frames.phase - 0.075) < 1e-9 and len(frames) == 13
+    assert np.array_equal(frames.frame(3), clip.get_frame(0.375))
+    assert not frames.frame(0).flags.writeable
+    assert np.array_equal(np.load(frames.path, mmap_mode="r")[5], frames.frames(4, 6)[1])
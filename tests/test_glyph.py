@@ -0,0 +1,52 @@
+import os
+import sys
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+sys.path.append(os.getcwd())
+
+from steps.image.glyph import GlyphAtlas, fill_rectangle
+
+
+def _font(size):
+    try:
+        return ImageFont.load_default(size)
+    except TypeError:  # 旧版 Pillow 只有位图默认字体
+        return ImageFont.load_default()
+
+
+def test_glyph_atlas_matches_pil():
+    atlas = GlyphAtlas()
+    font = _font(28)
+    ops = [
+        ((10.5, 8.25), "ni hao", (255, 255, 255, 255), 3, (0, 0, 0, 255)),
+        ((40.0, 30.75), "hǎo", (200, 200, 200, 255), 0, None),
+        ((-6.4, 50.0), "edge", (255, 230, 0, 255), 2, (0, 0, 0, 255)),
+        ((10.5, 8.25), "ni hao", (255, 255, 255, 255), 3, (0, 0, 0, 255)),
+    ]
+
+    img = Image.new("RGBA", (160, 90), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(img)
+    draw.rounded_rectangle([(4, 4), (150, 80)], radius=8, fill=(0, 0, 0, 100))
+    buf = np.array(img)
+    for xy, text, fill, stroke, stroke_fill in ops:
+        draw.text(xy, text, font=font, fill=fill, stroke_width=stroke, stroke_fill=stroke_fill)
+        atlas.draw_text(buf, xy, text, font, fill=fill, stroke_width=stroke, stroke_fill=stroke_fill)
+    draw.rectangle([20.7, 60, 60, 95], fill=(0, 0, 0, 140))
+    fill_rectangle(buf, [20.7, 60, 60, 95], (0, 0, 0, 140))
+
+    assert np.array_equal(buf, np.array(img))
+    # 重复的字形命中缓存
+    assert atlas.hits > 0
+    assert atlas.width("hǎo", font) == draw.textbbox((0, 0), "hǎo", font=font)[2]
+
+
+def test_metrics_bounded():
+    atlas = GlyphAtlas(max_metrics=4)
+    font = _font(20)
+    for i in range(10):
+        atlas.width(f"第{i}行字幕", font)
+    atlas.width("第6行字幕", font)  # 命中后移到队尾
+    atlas.width("新的一行", font)
+    assert len(atlas._metrics) == 4
+    assert [key[1] for key in atlas._metrics] == ["第8行字幕", "第9行字幕", "第6行字幕", "新的一行"]
@@ -0,0 +1,27 @@
+import os
+import sys
+
+import numpy as np
+from PIL import Image
+
+sys.path.append(os.getcwd())
+
+from steps.image.ingest import ImageIngest, aspect_fill, render_ready_size
+
+
+def test_image_ingest(tmp_path, config):
+    src = str(tmp_path / "scene.png")
+    Image.fromarray(np.random.default_rng(0).integers(0, 256, (400, 300, 3), dtype=np.uint8)).save(src)
+
+    # 镜头放大倍率受源图细节限制；源图不够大时不预放大
+    assert render_ready_size((300, 400), (90, 160), 1.2) == (108, 192)
+    assert render_ready_size((90, 160), (90, 160), 1.2) == (90, 160)
+    assert aspect_fill(Image.open(src), (90, 160)).size == (90, 160)
+
+    config(CACHE_DIR=str(tmp_path / "cache"))
+    ingest = ImageIngest()
+    frame = ingest.load(src, (90, 160), 1.2)
+    assert frame.shape == (192, 108, 3) and frame.dtype == np.uint8
+    cached = os.listdir(tmp_path / "cache" / "ingest")
+    assert len(cached) == 1 and cached[0].endswith(".npy")
+    assert np.array_equal(ingest.load(src, (90, 160), 1.2), frame)
@@ -0,0 +1,23 @@
+import os
+import sys
+import numpy as np
+
+sys.path.append(os.getcwd())
+
+from steps.video.mask import MASK_TRANSITIONS, MaskTransition
+
+
+def test_mask_transition_progress():
+    w, h = 48, 80
+    for shape in set(MASK_TRANSITIONS.values()):
+        mask = MaskTransition(w, h, 1.0, shape=shape)
+        areas = [float(mask.make_frame(t).mean()) for t in (0.1, 0.4, 0.8)]
+        assert areas == sorted(areas), shape
+        # 转场结束后返回全 1 常量遮罩
+        done = mask.make_frame(1.0)
+        assert done.dtype == np.float32 and done.min() == 1.0
+        assert mask.make_frame(2.0) is done
+
+    # 从右向左擦入：先露出右侧
+    frame = MaskTransition(w, h, 1.0, shape="wipe_left").make_frame(0.3)
+    assert frame[:, -1].all() and not frame[:, 0].any()
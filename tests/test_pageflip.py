@@ -0,0 +1,42 @@
+import os
+import sys
+import numpy as np
+from PIL import Image
+
+sys.path.append(os.getcwd())
+
+from steps.video import pageflip
+from steps.video.pageflip import PageFlipRenderer, create_page_flip_clip
+
+
+def test_page_flip_cache(tmp_path, monkeypatch):
+    w, h = 64, 96
+    page = str(tmp_path / "page.png")
+    nxt = str(tmp_path / "next.png")
+    Image.new("RGB", (w, h), (200, 40, 40)).save(page)
+    Image.new("RGB", (w, h), (40, 40, 200)).save(nxt)
+
+    renderer = PageFlipRenderer(page, nxt, 0.5)
+    # 起始帧为当前页；翻到底时画面几乎全是下一页
+    assert np.abs(renderer.render(0).astype(int) - (200, 40, 40)).max() <= 1
+    assert renderer.render(0.5)[:, w // 2 :, 2].mean() > 150
+
+    cache_dir = str(tmp_path / "cache")
+    clip = create_page_flip_clip(page, nxt, 0.5, cache_dir=cache_dir)
+    files = os.listdir(os.path.join(cache_dir, "page_flip"))
+    assert len(files) == 1 and files[0].endswith(".mp4")
+
+    # 第二次命中缓存，不再新增文件，也不再构造渲染器（不解码两页图片）
+    def _no_renderer(*args, **kwargs):
+        raise AssertionError("renderer built on cache hit")
+
+    with monkeypatch.context() as m:
+        m.setattr(pageflip, "PageFlipRenderer", _no_renderer)
+        cached = create_page_flip_clip(page, nxt, 0.5, cache_dir=cache_dir)
+    assert os.listdir(os.path.join(cache_dir, "page_flip")) == files
+    t = 6 / 24
+    diff = np.abs(cached.get_frame(t).astype(int) - renderer.render(t).astype(int))
+    assert diff.mean() < 4
+    assert clip.duration == cached.duration == 0.5
+    clip.close()
+    cached.close()
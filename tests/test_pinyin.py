@@ -0,0 +1,29 @@
+import json
+import os
+import sys
+
+from PIL import ImageFont
+
+sys.path.append(os.getcwd())
+
+from steps.image.pinyin import PinyinService
+
+
+def test_pinyin_service(tmp_path, config):
+    config(CACHE_DIR=str(tmp_path))
+    service = PinyinService()
+    # 读音与文本逐字对齐，非汉字为字符本身
+    readings = service.readings("2024年你好，AI")
+    assert readings == ("2", "0", "2", "4", "nián", "nǐ", "hǎo", "，", "A", "I")
+    assert service.readings("2024年你好，AI") is readings
+
+    font = ImageFont.load_default()
+    cells = service.cells("你好", font, font)
+    assert [c.pinyin for c in cells] == ["nǐ", "hǎo"]
+    assert all(c.cell_width == max(c.w_char, c.w_pin) for c in cells)
+
+    # 持久化查询写入磁盘，新实例直接读取
+    service.readings("画蛇添足", persist=True)
+    data = json.load(open(tmp_path / "pinyin.json", encoding="utf-8"))
+    assert len(data["entries"]) == 1
+    assert PinyinService().readings("画蛇添足", persist=True)[0] == "huà"
@@ -0,0 +1,105 @@
+import asyncio
+import os
+import subprocess
+import sys
+
+from moviepy.config import get_setting
+from moviepy.editor import VideoFileClip
+from PIL import Image
+
+sys.path.append(os.getcwd())
+
+from config.config import C
+from model.models import Scene, VideoScript
+from steps import step
+
+
+def test_apply_preview(config):
+    # apply_preview 会改写的配置项都先经 config 设置，测试结束后还原
+    config(
+        PREVIEW_MODE=False,
+        PREVIEW_SOURCE_SIZE=None,
+        VIDEO_SIZE=(1081, 1921),
+        VIDEO_FPS=30,
+        VIDEO_PRESET="medium",
+        PREVIEW_SCALE=0.33,
+        PREVIEW_FPS=12,
+        PREVIEW_PRESET="ultrafast",
+    )
+
+    C.apply_preview()
+    w, h = C.VIDEO_SIZE
+    # yuv420p 要求宽高为偶数
+    assert w % 2 == 0 and h % 2 == 0
+    assert (w, h) == (356, 632)
+    assert C.PREVIEW_SOURCE_SIZE == (1081, 1921)
+    assert (C.VIDEO_FPS, C.VIDEO_PRESET, C.PREVIEW_MODE) == (12, "ultrafast", True)
+
+    # 重复调用不会再次缩小
+    C.apply_preview()
+    assert C.VIDEO_SIZE == (356, 632)
+    assert C.PREVIEW_SOURCE_SIZE == (1081, 1921)
+
+
+def _write_scene(tmp_path):
+    image_path = str(tmp_path / "scene_1.png")
+    Image.new("RGB", (360, 640), (90, 140, 200)).save(image_path)
+    audio_path = str(tmp_path / "scene_1.mp3")
+    subprocess.run(
+        [
+            get_setting("FFMPEG_BINARY"),
+            "-y",
+            "-loglevel",
+            "error",
+            "-f",
+            "lavfi",
+            "-i",
+            "sine=f=440:r=24000:d=0.6",
+            audio_path,
+        ],
+        check=True,
+    )
+    scene = Scene(
+        scene_id=1,
+        narration="预览",
+        image_prompt="",
+        image_path=image_path,
+        audio_path=audio_path,
+        camera_action="zoom_in",
+    )
+    VideoScript(topic="", scenes=[scene]).to_json(str(tmp_path / "script.json"))
+
+
+def test_preview_output(tmp_path, config):
+    config(
+        OUTPUT_DIR=str(tmp_path),
+        CACHE_DIR=str(tmp_path / "cache"),
+        VIDEO_SIZE=(180, 320),
+        VIDEO_FPS=24,
+        VIDEO_PRESET=C.VIDEO_PRESET,
+        PREVIEW_MODE=False,
+        PREVIEW_SOURCE_SIZE=None,
+        PREVIEW_SCALE=0.5,
+        PREVIEW_FPS=12,
+        ENABLE_BRAND_OUTRO=False,
+        ENABLE_CUSTOM_INTRO=False,
+        ENABLE_SEGMENT_RENDER=False,
+        CURRENT_CATEGORY="",
+    )
+    _write_scene(tmp_path)
+
+    final_path = tmp_path / "final_video.mp4"
+    final_path.write_bytes(b"existing final video")
+
+    C.apply_preview()
+    asyncio.run(step.run_step_video(topic=""))
+
+    # 预览产物单独命名，成片不被覆盖
+    assert final_path.read_bytes() == b"existing final video"
+    preview_path = str(tmp_path / step.PREVIEW_FILENAME)
+    clip = VideoFileClip(preview_path)
+    try:
+        assert tuple(clip.size) == (90, 160)
+        assert clip.fps == 12
+    finally:
+        clip.close()
@@ -0,0 +1,35 @@
+import json
+import os
+import sys
+
+sys.path.append(os.getcwd())
+
+from util.profiler import RenderProfiler
+
+
+def test_render_profiler_report(tmp_path):
+    profiler = RenderProfiler()
+    for _ in range(2):
+        with profiler.stage("scenes", scene="scene 1"):
+            sum(range(10000))
+    profiler.set_timeline([("cover", 0.0, 2.0), ("scene 1", 1.5, 4.0)])
+    profiler.record_frame(1.0, 0.01)
+    profiler.record_frame(1.8, 0.02)  # 叠化区归属后一个 clip
+    profiler.record_frame(9.0, 0.03)  # 时间轴外忽略
+
+    path = profiler.save(str(tmp_path / "render_profile.json"))
+    report = json.load(open(path, encoding="utf-8"))
+
+    stage = report["stages"][0]
+    assert stage["name"] == "scenes" and stage["calls"] == 2
+    scenes = {s["name"]: s for s in report["scenes"]}
+    assert scenes["cover"]["frames"] == 1
+    assert scenes["scene 1"]["frames"] == 1
+    assert scenes["scene 1"]["build_wall_s"] > 0
+
+    # 关闭时为空操作
+    disabled = RenderProfiler(enabled=False)
+    with disabled.stage("x"):
+        pass
+    assert disabled.save(str(tmp_path / "none.json")) is None
+    assert not os.path.exists(tmp_path / "none.json")
@@ -0,0 +1,127 @@
+import os
+import subprocess
+import sys
+
+from moviepy.config import get_setting
+from PIL import Image, ImageFont
+
+sys.path.append(os.getcwd())
+
+from config.config import C
+from model.models import Scene
+from steps.video.generic import GenericVideoAssembler
+from steps.video.segment import SegmentRenderer
+
+_CATEGORY = "片段缓存测试"
+
+
+def _tone(path, freq):
+    subprocess.run(
+        [
+            get_setting("FFMPEG_BINARY"),
+            "-y",
+            "-loglevel",
+            "error",
+            "-f",
+            "lavfi",
+            "-i",
+            f"sine=f={freq}:r=24000:d=1.2",
+            path,
+        ],
+        check=True,
+    )
+    return path
+
+
+def _write_font(path, padding=b""):
+    """PIL 内置的 TrueType 字体；末尾补字节得到内容不同、同样可用的字体文件"""
+    with open(path, "wb") as f:
+        f.write(ImageFont.load_default(size=10).path.getvalue() + padding)
+    return path
+
+
+def _scenes(tmp_path):
+    scenes = []
+    for i, color in enumerate([(200, 80, 80), (80, 200, 80), (80, 80, 200)], start=1):
+        image_path = str(tmp_path / f"scene_{i}.png")
+        Image.new("RGB", (90, 160), color).save(image_path)
+        scenes.append(
+            Scene(
+                scene_id=i,
+                narration=f"第{i}段旁白",
+                image_prompt="",
+                image_path=image_path,
+                audio_path=_tone(str(tmp_path / f"scene_{i}.mp3"), 300 + 100 * i),
+                camera_action="zoom_in",
+            )
+        )
+    return scenes
+
+
+def _render(scenes, monkeypatch):
+    """渲染一次，按片段顺序返回各片段是否命中缓存（片段键计算时缓存文件已存在）"""
+    hits = []
+    segment_key = SegmentRenderer._segment_key
+
+    def recording_segment_key(self, *args, **kwargs):
+        key = segment_key(self, *args, **kwargs)
+        hits.append(os.path.exists(os.path.join(C.CACHE_DIR, "segments", f"{key}.mp4")))
+        return key
+
+    with monkeypatch.context() as m:
+        m.setattr(SegmentRenderer, "_segment_key", recording_segment_key)
+        output_path = GenericVideoAssembler().assemble_video(scenes, category=_CATEGORY)
+    assert output_path and os.path.exists(output_path)
+    return hits
+
+
+def test_segment_cache(tmp_path, config, monkeypatch):
+    config(
+        OUTPUT_DIR=str(tmp_path / "out"),
+        CACHE_DIR=str(tmp_path / "cache"),
+        VIDEO_SIZE=(90, 160),
+        VIDEO_FPS=12,
+        FONTS={"chinese": [_write_font(str(tmp_path / "font_a.ttf"))]},
+        CATEGORY_TRANSITIONS={_CATEGORY: "crossfade"},
+        ENABLE_BRAND_OUTRO=True,
+        ENABLE_CUSTOM_INTRO=False,
+        ENABLE_SEGMENT_RENDER=True,
+        ENABLE_SEGMENT_CACHE=True,
+        SEGMENT_RENDER_WORKERS=2,
+        CURRENT_CATEGORY=_CATEGORY,
+    )
+    os.makedirs(C.OUTPUT_DIR)
+    scenes = _scenes(tmp_path)
+
+    def render():
+        return _render(scenes, monkeypatch)
+
+    # 封面、3 个场景、片尾；叠化时每个片段还含前一个 clip 的尾部
+    assert render() == [False] * 5
+    assert render() == [True] * 5
+
+    # 旁白变化：该场景及叠化到下一场景的片段
+    scenes[1].narration = "改过的旁白"
+    assert render() == [True, True, False, False, True]
+
+    # 同名音频文件内容变化（时长不变）：最后一个场景及叠化到片尾的片段
+    _tone(scenes[2].audio_path, 880)
+    assert render() == [True, True, True, False, False]
+
+    # 影响画面的配置
+    config(CAMERA_MOVEMENT_INTENSITY=C.CAMERA_MOVEMENT_INTENSITY * 2)
+    assert render() == [False] * 5
+    assert render() == [True] * 5
+
+    # 换字体（字幕、封面、片尾文字都会变）
+    config(FONTS={"chinese": [_write_font(str(tmp_path / "font_b.ttf"), b"\0" * 16)]})
+    assert render() == [False] * 5
+
+    # 超出容量上限：淘汰旧片段，本次拼接用到的片段保留
+    segment_dir = os.path.join(C.CACHE_DIR, "segments")
+    assert len(os.listdir(segment_dir)) > 5
+    config(SEGMENT_CACHE_MAX_MB=1e-6)
+    scenes[0].narration = "又改过的旁白"
+    assert render() == [True, False, False, True, True]
+    assert len(os.listdir(segment_dir)) == 5
+    assert render() == [True] * 5
@@ -0,0 +1,111 @@
+import os
+import subprocess
+import sys
+
+import numpy as np
+from moviepy.config import get_setting
+from moviepy.editor import VideoFileClip
+from PIL import Image
+
+sys.path.append(os.getcwd())
+
+from config.config import C
+from model.models import Scene
+from steps.video.generic import GenericVideoAssembler
+from steps.video.segment import SegmentRenderer
+
+_CATEGORY = "分段渲染测试"
+
+
+def _scenes(tmp_path):
+    scenes = []
+    for i, color in enumerate([(200, 80, 80), (80, 200, 80), (80, 80, 200)], start=1):
+        image_path = str(tmp_path / f"scene_{i}.png")
+        Image.new("RGB", (90, 160), color).save(image_path)
+        audio_path = str(tmp_path / f"scene_{i}.mp3")
+        # 时长不是帧长的整数倍，片段边界落在两帧之间
+        subprocess.run(
+            [
+                get_setting("FFMPEG_BINARY"),
+                "-y",
+                "-loglevel",
+                "error",
+                "-f",
+                "lavfi",
+                "-i",
+                f"sine=f=440:r=24000:d={1.0 + 0.13 * i}",
+                audio_path,
+            ],
+            check=True,
+        )
+        scenes.append(
+            Scene(
+                scene_id=i,
+                narration=f"第{i}段旁白",
+                image_prompt="",
+                image_path=image_path,
+                audio_path=audio_path,
+                camera_action="zoom_in",
+            )
+        )
+    return scenes
+
+
+def _render(scenes, segment, filename, config, monkeypatch):
+    """渲染并解码全部帧；分段渲染失败会静默回退到整段渲染，这里确认走到了片段拼接"""
+    config(ENABLE_SEGMENT_RENDER=segment)
+    concatenated = []
+    concat = SegmentRenderer._concat
+
+    def recording_concat(self, *args, **kwargs):
+        concatenated.append(args[3])
+        return concat(self, *args, **kwargs)
+
+    with monkeypatch.context() as m:
+        m.setattr(SegmentRenderer, "_concat", recording_concat)
+        output_path = GenericVideoAssembler().assemble_video(
+            scenes, output_filename=filename, category=_CATEGORY
+        )
+    assert concatenated == ([output_path] if segment else [])
+    clip = VideoFileClip(output_path)
+    try:
+        frames = np.array([f.astype(np.float32) for f in clip.iter_frames()])
+        return frames, clip.duration
+    finally:
+        clip.close()
+
+
+def test_segment_matches_default(tmp_path, config, monkeypatch):
+    config(
+        OUTPUT_DIR=str(tmp_path / "out"),
+        CACHE_DIR=str(tmp_path / "cache"),
+        VIDEO_SIZE=(90, 160),
+        VIDEO_FPS=12,
+        CATEGORY_TRANSITIONS={_CATEGORY: "crossfade"},
+        ENABLE_BRAND_OUTRO=True,
+        ENABLE_CUSTOM_INTRO=False,
+        ENABLE_SEGMENT_CACHE=False,
+        SEGMENT_RENDER_WORKERS=2,
+        CURRENT_CATEGORY=_CATEGORY,
+    )
+    os.makedirs(C.OUTPUT_DIR)
+    scenes = _scenes(tmp_path)
+
+    default_frames, default_duration = _render(
+        scenes, False, "default.mp4", config, monkeypatch
+    )
+    segment_frames, segment_duration = _render(
+        scenes, True, "segment.mp4", config, monkeypatch
+    )
+
+    assert len(segment_frames) == len(default_frames)
+    assert abs(segment_duration - default_duration) < 1e-6
+
+    # 转场（含叠化进片尾）的起止帧一致
+    def moving(frames):
+        return np.abs(np.diff(frames, axis=0)).mean(axis=(1, 2, 3)) > 1
+
+    assert (moving(segment_frames) == moving(default_frames)).all()
+    # 逐帧比较，包括片段边界两侧（只允许编码误差）
+    diffs = np.abs(segment_frames - default_frames).mean(axis=(1, 2, 3))
+    assert diffs.max() < 3, diffs
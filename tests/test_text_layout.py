@@ -0,0 +1,47 @@
+import os
+import sys
+
+from PIL import Image, ImageDraw, ImageFont
+
+sys.path.append(os.getcwd())
+
+from steps.video.text_layout import BookTextLayoutEngine, wrap_words
+
+
+def _greedy_wrap(text, font, max_width):
+    draw = ImageDraw.Draw(Image.new("RGBA", (1, 1)))
+    lines, current = [], []
+    for word in text.split():
+        if draw.textbbox((0, 0), " ".join(current + [word]), font=font)[2] <= max_width:
+            current.append(word)
+        else:
+            if current:
+                lines.append(" ".join(current))
+            current = [word]
+    if current:
+        lines.append(" ".join(current))
+    return lines
+
+
+def test_wrap_words_matches_greedy():
+    try:
+        font = ImageFont.load_default(22)
+    except TypeError:  # 旧版 Pillow 只有位图默认字体
+        font = ImageFont.load_default()
+    text = (
+        "Once upon a time a supercalifragilisticexpialidocious word was far too long "
+        "for any line in this tiny book, and the story went on and on."
+    )
+    for max_width in (40, 120, 260, 600):
+        assert wrap_words(text, font, max_width) == _greedy_wrap(text, font, max_width)
+    assert wrap_words("   ", font, 100) == []
+
+
+def test_layout_cache():
+    engine = BookTextLayoutEngine(max_layouts=2)
+    params = {"text_area_w": 400, "text_area_h": 200, "text_start_x": 40, "text_start_y": 500}
+    layout = engine.layout("chinese", "你好世界", "", (540, 960), params)
+    assert len(layout.cells) == 4 and all(c.box is not None for c in layout.cells)
+    assert engine.layout("chinese", "你好世界", "", (540, 960), params) is layout
+    buf = engine.render(layout, (540, 960))
+    assert buf.shape == (960, 540, 4) and buf[..., 3].any()
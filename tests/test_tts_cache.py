@@ -0,0 +1,102 @@
+import asyncio
+import os
+import sys
+import time
+
+import edge_tts
+
+sys.path.append(os.getcwd())
+
+from config.config import C
+from model.models import Scene
+from steps.audio import generic
+from steps.audio.cache import tts_cache
+
+
+class _BrokenCommunicate:
+    """写出一半后断流"""
+
+    def __init__(self, text, voice, rate=None, pitch=None):
+        pass
+
+    async def save(self, path):
+        with open(path, "wb") as f:
+            f.write(b"truncated")
+        raise ConnectionError("stream cut")
+
+
+def test_tts_cache(tmp_path, config, fake_edge_tts, monkeypatch):
+    config(
+        CACHE_DIR=str(tmp_path / "cache"),
+        ENABLE_TTS_CACHE=True,
+        TTS_CACHE_MAX_MB=100,
+        PRONUNCIATION_FIXES={"长大": "涨大"},
+        ENABLE_BILINGUAL_MODE=False,
+    )
+    _check_studio(tmp_path, config, fake_edge_tts)
+    _check_failed_dub(tmp_path, monkeypatch)
+    _check_eviction(config)
+
+
+def _generate(config, project_dir, narrations, force=False):
+    config(OUTPUT_DIR=str(project_dir))
+    os.makedirs(C.OUTPUT_DIR, exist_ok=True)
+    scenes = [
+        Scene(scene_id=i + 1, narration=text, image_prompt="")
+        for i, text in enumerate(narrations)
+    ]
+    asyncio.run(generic.GenericAudioStudio().generate_audio(scenes, force=force))
+    return scenes
+
+
+def _check_studio(tmp_path, config, texts):
+    scenes = _generate(config, tmp_path / "a", ["小树长大了", "第二句"])
+    # 缓存键与合成文本都是发音修正后的文本
+    assert sorted(texts) == sorted(["小树涨大了", "第二句"])
+
+    # --force、换项目、场景重新编号：都直接命中缓存
+    _generate(config, tmp_path / "a", ["小树长大了", "第二句"], force=True)
+    other = _generate(config, tmp_path / "b", ["第二句", "小树涨大了"])
+    assert len(texts) == 2
+    with open(other[1].audio_path, encoding="utf-8") as f:
+        assert f.read() == "小树涨大了"
+    # 命中以硬链接提供
+    assert os.path.samefile(scenes[1].audio_path, other[0].audio_path)
+
+    # 文本变化后重新合成，写入前先断开硬链接，缓存里的旧条目不受影响
+    _generate(config, tmp_path / "b", ["第三句"], force=True)
+    assert texts[-1] == "第三句"
+    with open(scenes[1].audio_path, encoding="utf-8") as f:
+        assert f.read() == "第二句"
+
+
+def _check_failed_dub(tmp_path, monkeypatch):
+    from steps.video.generic import GenericVideoAssembler
+
+    monkeypatch.setattr(edge_tts, "Communicate", _BrokenCommunicate)
+    output_path = str(tmp_path / "cover_title.mp3")
+    assembler = GenericVideoAssembler()
+    assert not assembler._generate_intro_dub_sync("封面标题", output_path)
+    # 残缺文件被删除，也没有进入缓存
+    assert not os.path.exists(output_path)
+    key = tts_cache.key("edge", C.TTS_VOICE, "-10%", "+0Hz", None, "封面标题")
+    assert not os.path.exists(tts_cache.path(key))
+
+
+def _check_eviction(config):
+    root = tts_cache.root
+    for name in os.listdir(root):
+        os.remove(os.path.join(root, name))
+    config(TTS_CACHE_MAX_MB=2.5 / 1024)  # 2.5 KB
+    src = os.path.join(C.OUTPUT_DIR, "src.mp3")
+    for i in range(3):
+        with open(src, "wb") as f:
+            f.write(bytes(1024))
+        tts_cache.store(f"k{i}", src)
+        # 访问 k0，使 k1 成为最久未使用
+        if i == 1:
+            time.sleep(0.01)
+            assert tts_cache.fetch("k0", os.path.join(C.OUTPUT_DIR, "hit.mp3"))
+            time.sleep(0.01)
+    assert sorted(os.listdir(root)) == ["k0.mp3", "k2.mp3"]
+
@@ -0,0 +1,81 @@
+import asyncio
+import os
+import sys
+
+sys.path.append(os.getcwd())
+
+from config.config import C
+from model.models import Scene
+from steps.audio.base import AudioStudioBase, TTSThrottledError, is_throttling_error
+
+
+class _FakeStudio(AudioStudioBase):
+    provider = "fake"
+
+    def __init__(self, throttle_first: int = 0):
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.calls = 0
+        self.throttle_first = throttle_first
+        self.finished = []
+
+    async def generate_tts(self, text, output_path, emotion=None) -> bool:
+        self.calls += 1
+        if self.calls <= self.throttle_first:
+            raise TTSThrottledError("429 Too Many Requests")
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            # 前面的场景更慢：完成顺序与场景顺序相反
+            await asyncio.sleep(0.01 * (10 - int(text)))
+            with open(output_path, "w") as f:
+                f.write(text)
+        finally:
+            self.in_flight -= 1
+        return True
+
+    async def _generate_one_audio(self, scene, force=False):
+        output_path = os.path.join(C.OUTPUT_DIR, f"scene_{scene.scene_id}.mp3")
+        await self._synthesize(scene.narration, output_path)
+        self.finished.append(scene.scene_id)
+        scene.audio_path = output_path
+
+
+def _scenes(n):
+    return [Scene(scene_id=i, narration=str(i), image_prompt="") for i in range(n)]
+
+
+def test_tts_scheduler(tmp_path, config):
+    config(
+        OUTPUT_DIR=str(tmp_path),
+        TTS_LIMITS={
+            "fake": {"concurrency": 3, "rate": 0, "retries": 2, "backoff": 0.01, "backoff_max": 0.02}
+        },
+    )
+    # 并发不超过上限；audio_path 与完成顺序无关
+    studio = _FakeStudio()
+    scenes = _scenes(8)
+    asyncio.run(studio.generate_audio(scenes))
+    assert studio.max_in_flight == 3
+    assert studio.finished != sorted(studio.finished)
+    for scene in scenes:
+        assert scene.audio_path == os.path.join(C.OUTPUT_DIR, f"scene_{scene.scene_id}.mp3")
+        with open(scene.audio_path) as f:
+            assert f.read() == str(scene.scene_id)
+
+    # 被限流时退避重试
+    studio = _FakeStudio(throttle_first=2)
+    asyncio.run(studio.generate_audio(_scenes(1)))
+    assert studio.calls == 3
+
+    # 超过重试次数后抛出
+    studio = _FakeStudio(throttle_first=5)
+    try:
+        asyncio.run(studio.generate_audio(_scenes(1)))
+        assert False, "expected TTSThrottledError"
+    except TTSThrottledError:
+        pass
+    assert studio.calls == 3
+
+    assert is_throttling_error(Exception("TTS Generation failed: 429, message='Invalid response status'"))
+    assert not is_throttling_error(ValueError("bad voice"))
@@ -0,0 +1,97 @@
+import asyncio
+import base64
+import io
+import json
+import os
+import sys
+
+from aiohttp import web
+
+sys.path.append(os.getcwd())
+
+from steps.audio.base import TTSThrottledError
+from steps.audio.volc import VolcAudioStudio, _Base64Sink
+
+AUDIO = bytes(range(256)) * 40
+
+
+def _body(data=AUDIO, code=3000):
+    # 与服务端一致：base64 中的 "/" 被转义为 "\/"
+    payload = {"reqid": "r", "code": code, "message": "Success", "data": "@@", "addition": {"duration": "1"}}
+    encoded = base64.b64encode(data).decode().replace("/", "\\/") if data else ""
+    return json.dumps(payload).replace("@@", encoded).encode()
+
+
+def test_sink_chunked():
+    body = _body()
+    for size in (1, 3, 7, 4096, len(body)):
+        f = io.BytesIO()
+        sink = _Base64Sink(f)
+        for i in range(0, len(body), size):
+            sink.feed(body[i : i + size])
+        assert f.getvalue() == AUDIO and sink.nbytes == len(AUDIO)
+        meta = sink.payload()
+        assert meta["code"] == 3000 and meta["data"] == "" and meta["addition"] == {"duration": "1"}
+
+    # 错误响应没有音频字段
+    sink = _Base64Sink(io.BytesIO())
+    sink.feed(b'{"code": 3010, "message": "text too long"}')
+    assert sink.nbytes == 0 and sink.payload()["code"] == 3010
+
+
+async def _serve(responses, check):
+    async def handler(request):
+        responses["requests"].append(await request.json())
+        status, body = responses["queue"].pop(0)
+        return web.Response(status=status, body=body, content_type="application/json")
+
+    app = web.Application()
+    app.router.add_post("/api/v1/tts", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    try:
+        await check(f"http://127.0.0.1:{port}/api/v1/tts")
+    finally:
+        await runner.cleanup()
+
+
+def test_volc_request(tmp_path, config):
+    config(VOLC_TTS_APPID="app", VOLC_TTS_TOKEN="token", ENABLE_TTS_CACHE=False)
+    responses = {
+        "requests": [],
+        "queue": [
+            (200, _body()),
+            (200, _body(data=None, code=3010)),
+            (429, b'{"code": 3003, "message": "concurrency exceeded"}'),
+        ],
+    }
+    output_path = str(tmp_path / "a.mp3")
+
+    async def check(url):
+        studio = VolcAudioStudio()
+        studio.api_url = url
+        try:
+            assert await studio.generate_tts("你好", output_path)
+            with open(output_path, "rb") as f:
+                assert f.read() == AUDIO
+            session = studio._session
+
+            # 失败时不留下半成品，也不覆盖已有文件
+            assert not await studio.generate_tts("你好", output_path)
+            try:
+                await studio.generate_tts("你好", output_path)
+                assert False, "expected TTSThrottledError"
+            except TTSThrottledError:
+                pass
+            # 同一事件循环内复用会话
+            assert studio._session is session
+            assert sorted(os.listdir(tmp_path)) == ["a.mp3"]
+        finally:
+            await studio.aclose()
+        assert session.closed
+
+    asyncio.run(_serve(responses, check))
+    assert responses["requests"][0]["request"]["text"] == "你好"
@@ -0,0 +1,30 @@
+import os
+import sys
+import numpy as np
+
+sys.path.append(os.getcwd())
+
+from moviepy.editor import VideoFileClip
+from steps.video.writer import StreamingVideoWriter
+
+
+def test_stream_writer_keeps_frame_order(tmp_path):
+    w, h, n = 64, 48, 30
+    output = str(tmp_path / "stream.mp4")
+
+    def frame_fn(i):
+        return np.full((h, w, 3), i * 8, dtype=np.uint8)
+
+    writer = StreamingVideoWriter(output, (w, h), fps=24, threads=3, ring_size=4)
+    metrics = writer.write(frame_fn, n)
+
+    assert metrics["frames"] == n
+    assert metrics["queue_depth_max"] <= 4
+
+    clip = VideoFileClip(output)
+    try:
+        for i in (0, 10, 29):
+            value = clip.get_frame(i / 24 + 0.001).mean()
+            assert abs(value - i * 8) < 4, f"frame {i}: {value}"
+    finally:
+        clip.close()
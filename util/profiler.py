@@ -0,0 +1,182 @@
+import json
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import List, Optional, Tuple
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from util.logger import logger
+
+
+def _cpu_seconds() -> float:
+    """本进程 + 已回收子进程（ffmpeg 等）的 CPU 时间"""
+    if resource is None:
+        return time.process_time()
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+
+def _peak_rss_mb() -> Optional[float]:
+    """本进程的峰值 RSS（MB）；平台不支持时返回 None"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 单位为 KB，macOS 为字节
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class RenderProfiler:
+    """
+    渲染性能剖析器。
+
+    - stage(name)：记录一个流水线阶段的墙钟时间、CPU 时间与阶段结束时的峰值 RSS，同名阶段累加
+    - set_timeline / record_frame：编码阶段按帧时间把取帧耗时归属到对应场景
+    - save：输出机器可读的 JSON 报告；summary：打印汇总表
+
+    enabled=False 时所有方法为空操作，可以无条件调用。
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.stages = {}
+        self.scenes = {}
+        self.extra = {}
+        self._timeline: List[Tuple[str, float, float]] = []
+        self._lock = threading.Lock()
+        self._start_wall = time.perf_counter()
+        self._start_cpu = _cpu_seconds()
+
+    @contextmanager
+    def stage(self, name: str, scene: Optional[str] = None):
+        """
+        记录一个阶段。指定 scene 时同时计入该场景的构建耗时。
+        """
+        if not self.enabled:
+            yield
+            return
+
+        wall0, cpu0 = time.perf_counter(), _cpu_seconds()
+        try:
+            yield
+        finally:
+            wall, cpu = time.perf_counter() - wall0, _cpu_seconds() - cpu0
+            peak = _peak_rss_mb()
+            with self._lock:
+                entry = self.stages.setdefault(
+                    name, {"calls": 0, "wall_s": 0.0, "cpu_s": 0.0}
+                )
+                entry["calls"] += 1
+                entry["wall_s"] += wall
+                entry["cpu_s"] += cpu
+                entry["peak_rss_mb"] = peak
+                if scene is not None:
+                    s = self._scene(scene)
+                    s["build_wall_s"] += wall
+                    s["build_cpu_s"] += cpu
+                    s["peak_rss_mb"] = peak
+
+    def _scene(self, label: str) -> dict:
+        return self.scenes.setdefault(
+            label,
+            {
+                "build_wall_s": 0.0,
+                "build_cpu_s": 0.0,
+                "render_wall_s": 0.0,
+                "frames": 0,
+                "peak_rss_mb": None,
+            },
+        )
+
+    def set_timeline(self, windows: List[Tuple[str, float, float]]):
+        """设置成片时间轴 [(label, start, end)]，叠化重叠区归属到后一个 clip"""
+        if self.enabled:
+            self._timeline = list(windows)
+
+    def record_frame(self, t: float, wall_s: float):
+        """记录成片 t 时刻一帧的取帧耗时"""
+        if not self.enabled or not self._timeline:
+            return
+        label = None
+        for name, start, end in self._timeline:
+            if start <= t < end:
+                label = name
+        if label is not None:
+            self.add_render(label, wall_s, 1)
+
+    def add_render(self, label: str, wall_s: float, frames: int):
+        """直接计入某个场景的渲染耗时（如分段渲染中一个片段的子进程耗时）"""
+        if not self.enabled:
+            return
+        with self._lock:
+            s = self._scene(label)
+            s["render_wall_s"] += wall_s
+            s["frames"] += frames
+
+    def report(self, output_path: str = "") -> dict:
+        def rounded(d: dict) -> dict:
+            return {
+                k: round(v, 4) if isinstance(v, float) else v for k, v in d.items()
+            }
+
+        return {
+            "output": output_path,
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "total": rounded(
+                {
+                    "wall_s": time.perf_counter() - self._start_wall,
+                    "cpu_s": _cpu_seconds() - self._start_cpu,
+                    "peak_rss_mb": _peak_rss_mb(),
+                }
+            ),
+            "stages": [dict(name=k, **rounded(v)) for k, v in self.stages.items()],
+            "scenes": [dict(name=k, **rounded(v)) for k, v in self.scenes.items()],
+            **self.extra,
+        }
+
+    def save(self, path: str, output_path: str = "") -> Optional[str]:
+        """写出 JSON 报告并打印汇总表；失败只告警，不影响出片"""
+        if not self.enabled:
+            return None
+        report = self.report(output_path)
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+        except OSError as e:
+            logger.warning(f"⚠️ Failed to write render profile: {e}")
+            return None
+        logger.info(f"⏱️ Render profile saved to {path}\n{self.summary(report)}")
+        return path
+
+    def summary(self, report: Optional[dict] = None) -> str:
+        report = report or self.report()
+
+        def fmt(v, spec):
+            return f"{'-':>10}" if v is None else format(v, spec)
+
+        lines = [f"{'stage':<28}{'calls':>6}{'wall(s)':>10}{'cpu(s)':>10}{'rss(MB)':>10}"]
+        for s in report["stages"]:
+            lines.append(
+                f"{s['name']:<28}{s['calls']:>6}{s['wall_s']:>10.2f}{s['cpu_s']:>10.2f}"
+                f"{fmt(s.get('peak_rss_mb'), '>10.0f')}"
+            )
+        if report["scenes"]:
+            lines.append(
+                f"{'scene/clip':<28}{'frames':>6}{'build(s)':>10}{'render(s)':>10}{'rss(MB)':>10}"
+            )
+            for s in report["scenes"]:
+                lines.append(
+                    f"{s['name']:<28}{s['frames']:>6}{s['build_wall_s']:>10.2f}"
+                    f"{s['render_wall_s']:>10.2f}{fmt(s.get('peak_rss_mb'), '>10.0f')}"
+                )
+        total = report["total"]
+        lines.append(
+            f"{'total':<28}{'':>6}{total['wall_s']:>10.2f}{total['cpu_s']:>10.2f}"
+            f"{fmt(total.get('peak_rss_mb'), '>10.0f')}"
+        )
+        return "\n".join(lines)
@@ -1,3 +1,6 @@
+import hashlib
+import json
+import os
 import re
 
 
@@ -86,3 +89,32 @@ def format_cover_subtitle_from_chapter(num: str, chapter_title: str) -> str:
     if title and len(title) <= 14:
         title = title.replace("的", "")
     return f"{cn_num}、{title}" if title else f"{cn_num}、"
+
+
+_FILE_DIGESTS = {}
+
+
+def file_digest(path: str) -> str:
+    """
+    计算文件内容的 sha256（按路径+mtime+大小缓存，同一文件在一次运行中只读一遍）。
+    文件不存在时返回空字符串。
+    """
+    if not path or not os.path.exists(path):
+        return ""
+    stat = os.stat(path)
+    memo_key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+    digest = _FILE_DIGESTS.get(memo_key)
+    if digest is None:
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        digest = h.hexdigest()
+        _FILE_DIGESTS[memo_key] = digest
+    return digest
+
+
+def content_key(*parts) -> str:
+    """将若干可 JSON 序列化的部分组合为稳定的内容哈希，用作缓存键"""
+    payload = json.dumps(parts, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()